@@ -1,52 +1,265 @@
 import streamlit as st
-import google.generativeai as genai
 import time 
-import razorpay
-import re
-from groq import Groq
-import hashlib
-from supabase import create_client, Client
 
-# app.py ke upar ye hona chahiye
-from knowledge_base import PYQ_DATA, PYQ_DATA_SEM2
-
-# 1. Gemini Client Setup
-genai.configure(api_key=st.secrets.get("GEMINI_API_KEY") or st.secrets.get("GOOGLE_API_KEY"))
-gemini_model = genai.GenerativeModel('models/gemini-1.5-flash')
-
-# 2. DeepSeek Client Setup
-deepseek_client = Groq(
-    api_key=st.secrets["DEEPSEEK_API_KEY"],
-    base_url="https://api.deepseek.com"
-)
+# Rerun ka total script time (startup_profiler.py report karta hai)
+from startup_profiler import RERUNS
+RERUNS.start()
+
+from prompts import PREDICT_PROMPT_VERSION, RESEARCH_PROMPT_VERSION, build_predict_prompt, build_research_prompt
+from llm_cache import ResponseCache, normalize_subject
+from streaming import SectionStreamParser, render_stream, stream_chat
+from hedging import HedgingExecutor
+from single_flight import SingleFlight, prompt_key
+from profile_service import ProfileService
+from clients import ClientRegistry
+from evidence_ranker import DEFAULT_TOKEN_BUDGET
+from knowledge import Knowledge
+from pyq_search import PastPaperSearch
+from metrics import METRICS, start_metrics_server
+from output_parser import PREDICT_END_TOKENS, parse_prediction, parse_research
+from router import ProviderRouter
+from admission import AdmissionController, estimate_tokens
+from topic_cache import TopicCache
+from job_pool import DONE, FAILED, JobLimit, JobPool
+from result_store import ResultStore
+from pdf_export import PDFExporter, export_key
+from session_tokens import TOKEN_PARAM, SessionTokens
+
+# 1. Provider clients: process me ek baar, lazily, shared keep-alive pools ke saath
+@st.cache_resource
+def init_clients():
+    return ClientRegistry(st.secrets)
 
-# 3. Master dictionary merge
-ALL_SUBJECTS = {**PYQ_DATA, **PYQ_DATA_SEM2}
+clients = init_clients()
 
 # --- 1. CONFIGURATION ---
 st.set_page_config(page_title="TopperGPT Dashboard", layout="wide", page_icon="🚀")
 
-# Groq Client Setup
-if "groq_client" not in st.session_state or st.session_state.groq_client is None:
-    api_key_groq = st.secrets.get("GROQ_API_KEY")
-    if api_key_groq:
-        st.session_state.groq_client = Groq(api_key=api_key_groq)
-
-groq_client = st.session_state.get("groq_client")
-
 # --- SUPABASE INITIALIZATION ---
 @st.cache_resource
 def init_supabase():
+    from supabase import create_client  # heavy SDK, sirf pehli baar chahiye
     url = st.secrets["SUPABASE_URL"]
     key = st.secrets["SUPABASE_KEY"]
     return create_client(url, key)
 
 supabase = init_supabase()
 
+# Profiles: sirf zaroori columns + short TTL cache, trial deduction write-behind
+@st.cache_resource
+def init_profile_service():
+    return ProfileService(supabase)
+
+profile_service = init_profile_service()
+
+# Signed session token (URL ?s=...): refresh / reconnect pe login bina profiles query ke. Secret nahi => band.
+# URL me hai isliye chhota TTL, aur login ke MAX_DAYS baad dobara login chahiye hi
+@st.cache_resource
+def init_session_tokens():
+    secret = st.secrets.get("SESSION_TOKEN_SECRET")
+    if not secret:
+        return None
+    return SessionTokens(secret, ttl_seconds=float(st.secrets.get("SESSION_TOKEN_HOURS", 24)) * 3600,
+                         max_age_seconds=float(st.secrets.get("SESSION_TOKEN_MAX_DAYS", 14)) * 24 * 3600)
+
+session_tokens = init_session_tokens()
+
+# --- RESPONSE CACHE (process-wide, disk backed) ---
+@st.cache_resource
+def init_response_cache():
+    return ResponseCache()
+
+response_cache = init_response_cache()
+
+# tab7: "PN Diode" / "p-n junction diode" / "pn-diode working" sab ek hi cached report
+@st.cache_resource
+def init_topic_cache():
+    return TopicCache(response_cache, RESEARCH_PROMPT_VERSION)
+
+topic_cache = init_topic_cache()
+
+# --- KNOWLEDGE (data/knowledge.sqlite: subject resolver + evidence ranker, naya paper aaya toh hot reload) ---
+@st.cache_resource
+def init_knowledge():
+    return Knowledge()
+
+knowledge = init_knowledge()
+kb = knowledge.current()
+subject_resolver = kb.resolver
+evidence_ranker = kb.ranker
+evidence_budget = int(st.secrets.get("EVIDENCE_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+
+# --- PAST PAPER SEARCH (knowledge file ka FTS5 index; koi LLM call / trial nahi) ---
+@st.cache_resource
+def init_past_paper_search():
+    return PastPaperSearch(knowledge.path)
+
+past_papers = init_past_paper_search()
+
+# --- HEDGED PROVIDER CALLS (shared by tab1 + tab7) ---
+@st.cache_resource
+def init_hedger():
+    return HedgingExecutor(hedge_delay=float(st.secrets.get("HEDGE_DELAY_SECONDS", 4.0)))
+
+hedger = init_hedger()
+
+# Provider order har request pe: EWMA latency + circuit breakers (ROUTES secret se tab-wise config)
+@st.cache_resource
+def init_router():
+    return ProviderRouter(st.secrets.get("ROUTES"))
+
+router = init_router()
+
+# Provider RPM/TPM ke andar rehne ke liye token buckets + fair queue (RATE_LIMITS secret)
+@st.cache_resource
+def init_admission():
+    return AdmissionController(st.secrets.get("RATE_LIMITS"))
+
+admission = init_admission()
+
+# Same prompt ki parallel calls (alag sessions se) ek hi provider call share karti hain
+@st.cache_resource
+def init_single_flight():
+    return SingleFlight()
+
+single_flight = init_single_flight()
+
+# LLM generations script run ke bahar chalti hain; session sirf job id rakhta hai aur poll karta hai
+@st.cache_resource
+def init_job_pool():
+    return JobPool(max_workers=int(st.secrets.get("JOB_WORKERS", 16)), per_user=int(st.secrets.get("JOBS_PER_USER", 3)))
+
+job_pool = init_job_pool()
+JOB_POLL_SECONDS = float(st.secrets.get("JOB_POLL_SECONDS", 1.0))
+JOB_RESTORE_SECONDS = 3600
+
+# Plan / report ka text process me ek hi copy (content hash), sessions sirf key rakhte hain
+@st.cache_resource
+def init_result_store():
+    return ResultStore(max_bytes=int(st.secrets.get("RESULT_STORE_MB", 64)) * 1024 * 1024)
+
+results = init_result_store()
+
+# Plan / report ka PDF job pool pe render, content hash pe disk cache (ek baar render, sabko wahi file)
+@st.cache_resource
+def init_pdf_exporter():
+    return PDFExporter()
+
+pdf_exporter = init_pdf_exporter()
+
+# --- METRICS (Prometheus text on METRICS_PORT, JSONL on METRICS_LOG_PATH) ---
+@st.cache_resource
+def init_metrics():
+    METRICS.register("hedger", hedger.stats)
+    METRICS.register("router", router.stats)
+    METRICS.register("admission", admission.stats)
+    METRICS.register("single_flight", single_flight.stats)
+    METRICS.register("jobs", job_pool.stats)
+    METRICS.register("results", results.stats)
+    METRICS.register("pdf_export", pdf_exporter.stats)
+    METRICS.register("response_cache", response_cache.stats)
+    METRICS.register("topic_cache", topic_cache.stats)
+    METRICS.register("knowledge", knowledge.stats)
+    METRICS.register("pyq_search", past_papers.stats)
+    METRICS.register("profiles", profile_service.stats)
+    if session_tokens is not None:
+        METRICS.register("session_tokens", session_tokens.stats)
+    METRICS.register("clients", clients.stats)
+    METRICS.register("reruns", RERUNS.stats)
+    if st.secrets.get("METRICS_LOG_PATH"):
+        METRICS.log_to(st.secrets["METRICS_LOG_PATH"])
+    port = st.secrets.get("METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return start_metrics_server(METRICS, int(port))
+    except OSError as e:
+        # Port busy (doosra worker) => app chalti rahe, bas endpoint nahi
+        METRICS.event("metrics_server_error", detail=str(e))
+        return None
+
+init_metrics()
+
+def provider_stream(prompt):
+    # router.attempts() har choice ke liye factory maangta hai; key nahi hai toh provider skip
+    def make(choice):
+        client = clients.get(choice.provider)
+        if client is None:
+            return None
+        kwargs = {"timeout": choice.timeout}
+        if choice.provider == "deepseek":
+            # DeepSeek usage tabhi bhejta hai jab maanga jaye; Groq x_groq.usage khud bhejta hai
+            kwargs["extra_body"] = {"stream_options": {"include_usage": True}}
+        return lambda: stream_chat(client, choice.model, prompt, **kwargs)
+    return make
+
+def admitted_stream(route, prompt, email, on_wait):
+    # Bucket me jagah milne tak queue me (position + ETA on_wait ko), phir hedged stream.
+    # Fair queue ka slot user + tab: predict aur research ek saath chal sakte hain
+    attempts = router.attempts(route, provider_stream(prompt))
+    tokens = estimate_tokens(prompt, route)
+    usable = [name for name, _ in attempts if not router.is_open(route, name)] or [name for name, _ in attempts]
+    admitted = admission.acquire(f"{email}:{route}", usable, tokens, on_wait=on_wait)
+    return hedger.stream(admission.guard(attempts, admitted, tokens))
+
+def generation_job(route, prompt, flight_key, markers, end_tokens, user, on_result):
+    # Job pool ke worker thread pe chalta hai: yahan koi st.* nahi (session_state / widgets script thread ke hain)
+    email, is_pro, trials = user["email"], user.get("is_pro", False), user.get("free_trials_left", 10)
+
+    def run(job):
+        def generate():
+            # Router abhi ka sabse tez healthy provider pehle deta hai; slow hai toh hedger doosra bhi race me
+            parser = SectionStreamParser(markers, end_tokens)
+            out = render_stream(
+                admitted_stream(route, prompt, email, lambda pos, eta: job.notify(
+                    f"⏳ Rush hai! Queue me aapka number #{pos} hai, approx {eta:.0f}s wait.")),
+                parser, lambda p, touched: job.progress(p.sections), tab=route
+            )
+            on_result(out)
+            return out
+
+        out, _ = single_flight.do(flight_key, generate)
+        # Trial sirf tab kate jab answer sach me mila; browser refresh ho gaya ho tab bhi answer persisted hai
+        if not is_pro:
+            profile_service.deduct_trial(email, trials)
+        return out
+    return run
+
 # --- AUTH ENGINE (WITH TRIAL & PRO LOGIC) ---
+def remember_session(profile):
+    # Re-issue / profile refresh pe bhi session ka asli login time hi token me (max age yahin se)
+    if session_tokens is not None:
+        auth_time = st.session_state.setdefault("session_auth", time.time())
+        st.query_params[TOKEN_PARAM] = session_tokens.issue(profile, auth_time=auth_time)
+
+def end_session():
+    # Token URL me reh gaya toh agla rerun phir se login kar dega
+    st.session_state.clear()
+    st.query_params.clear()
+    st.rerun()
+
+def restore_session():
+    # Refresh / naya tab: URL ka signed token locally verify => user_data bina DB query ke;
+    # pro / trials status background me refresh hota hai (profile_stale tak token wala data)
+    token = st.query_params.get(TOKEN_PARAM)
+    if not token or session_tokens is None:
+        return None
+    restored = session_tokens.verify(token)
+    if restored is None:
+        del st.query_params[TOKEN_PARAM]
+        return None
+    profile, issued_at, auth_time = restored
+    profile_service.refresh_async(profile["email"])
+    st.session_state.profile_stale = True
+    st.session_state.session_auth = auth_time
+    if time.time() - issued_at > session_tokens.ttl_seconds / 2:
+        # Aadha TTL nikal gaya: roz aane wale student ko har hafte login na karna pade
+        remember_session(profile)
+    return profile
+
 def clean_email_auth():
     if "user_data" not in st.session_state:
-        st.session_state.user_data = None
+        st.session_state.user_data = restore_session()
 
     if st.session_state.user_data is None:
         st.markdown("""
@@ -67,9 +280,11 @@ def clean_email_auth():
                     l_email = st.text_input("Enter Registered Email", key="l_email_quick").strip().lower()
                     if st.form_submit_button("ENTER DASHBOARD 🚀", use_container_width=True):
                         if l_email:
-                            prof = supabase.table("profiles").select("*").eq("email", l_email).execute()
-                            if prof.data:
-                                st.session_state.user_data = prof.data[0]
+                            # Fresh: logout ke baad cache me purana session_gen na ho
+                            prof = profile_service.get(l_email, fresh=True)
+                            if prof:
+                                st.session_state.user_data = prof
+                                remember_session(prof)
                                 st.success("Pehchan liya bhai! Khul raha hai dashboard...")
                                 time.sleep(1)
                                 st.rerun()
@@ -88,19 +303,13 @@ def clean_email_auth():
                     if st.form_submit_button("CREATE & ENTER 🔥", use_container_width=True):
                         if s_name and s_email:
                             try:
-                                check = supabase.table("profiles").select("*").eq("email", s_email).execute()
-                                if check.data:
+                                if profile_service.get(s_email):
                                     st.warning("Account pehle se hai! Login tab use karo.")
                                 else:
-                                    new_u = {
-                                        "email": s_email, 
-                                        "full_name": s_name, 
-                                        "free_trials_left": 10,
-                                        "is_pro": False
-                                    }
-                                    ins = supabase.table("profiles").insert(new_u).execute()
-                                    if ins.data:
-                                        st.session_state.user_data = ins.data[0]
+                                    created = profile_service.create(s_email, s_name)
+                                    if created:
+                                        st.session_state.user_data = created
+                                        remember_session(created)
                                         st.success(f"Welcome {s_name}! Setup complete.")
                                         st.rerun()
                             except Exception as e:
@@ -110,7 +319,26 @@ def clean_email_auth():
         st.stop()
 
 # --- TRIAL & PRO ACCESS HANDLERS ---
+def sync_profile(wait=False):
+    # Token se aaya session: background refresh aa gaya toh asli pro / trials merge karo.
+    # wait=True (paid action se pehle) => abhi tak nahi aaya toh khud fetch
+    if not st.session_state.get("profile_stale"):
+        return
+    email = st.session_state.user_data["email"]
+    fresh = profile_service.peek(email)
+    if fresh is None and wait:
+        fresh = profile_service.get(email)
+    if fresh and "session_gen" in fresh and (fresh["session_gen"] or 0) != (st.session_state.user_data.get("session_gen") or 0):
+        # Token ke baad Logout ho chuka (generation badla): copied / purana link ab kaam nahi karega
+        session_tokens.count("revoked")
+        end_session()
+    if fresh:
+        st.session_state.user_data.update(fresh)
+        del st.session_state.profile_stale
+        remember_session(st.session_state.user_data)
+
 def check_access():
+    sync_profile(wait=True)
     user = st.session_state.get("user_data", {})
     if user.get("is_pro", False):
         return True
@@ -119,13 +347,9 @@ def check_access():
 def deduct_trial():
     user = st.session_state.get("user_data", {})
     if not user.get("is_pro", False):
-        curr = user.get("free_trials_left", 10)
-        new_val = max(0, curr - 1)
+        # DB write background me atomic RPC se; LLM call iska wait nahi karti
+        new_val = profile_service.deduct_trial(user["email"], user.get("free_trials_left", 10))
         st.session_state.user_data["free_trials_left"] = new_val
-        try:
-            supabase.table("profiles").update({"free_trials_left": new_val}).eq("email", user["email"]).execute()
-        except Exception:
-            pass  # DB column missing hone par bhi app crash nahi hoga
 
 def show_paywall():
     st.error("🚨 Free Trials Khatam! Upgrade to TopperGPT PRO.")
@@ -151,6 +375,94 @@ def show_paywall():
 
 # Run Auth
 clean_email_auth()
+sync_profile()
+
+# --- BACKGROUND JOBS ---
+def finish_prediction(job):
+    st.session_state.prediction_key = results.put(job.result)
+    st.session_state.p_subj_pro_final = job.title
+    st.balloons()
+
+def finish_research(job):
+    st.session_state.research_key = results.put(job.result)
+    st.session_state.research_query = job.title
+
+def stored_result(state_key, parse):
+    # Session ke paas sirf key; store ne memory cap pe evict kar diya toh key hata ke bata do
+    parsed = results.parsed(st.session_state[state_key], parse)
+    if parsed is None:
+        del st.session_state[state_key]
+        st.info("Ye result server memory se hat gaya hai. Dobara generate kar lo.")
+    return parsed
+
+JOB_STATES = {"predict": ("predict_job", finish_prediction), "research": ("research_job", finish_research)}
+
+# Refresh / reconnect: pichhle session me submit kiya job (chal raha ya complete) wapas utha lo
+if "jobs_restored" not in st.session_state:
+    st.session_state.jobs_restored = True
+    for kind, (state_key, _) in JOB_STATES.items():
+        job = job_pool.latest(st.session_state.user_data["email"], kind, max_age=JOB_RESTORE_SECONDS)
+        if job is not None and job.status != FAILED and state_key not in st.session_state:
+            st.session_state[state_key] = job.id
+
+# Complete hua job: result session me, trials ka naya count profile cache se (sidebar se pehle)
+for state_key, on_done in JOB_STATES.values():
+    if state_key not in st.session_state:
+        continue
+    job = job_pool.get(st.session_state[state_key])
+    if job is not None and job.active:
+        continue
+    del st.session_state[state_key]
+    if job is not None and job.status == DONE:
+        on_done(job)
+        prof = profile_service.get(job.user)
+        if prof:
+            st.session_state.user_data.update(prof)
+    elif job is not None:
+        st.session_state[f"{state_key}_error"] = job.error
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_progress(state_key, render_live):
+    # Sirf ye fragment har second rerun hota hai; job khatam => poora app rerun, upar wala block result uthata hai
+    job = job_pool.get(st.session_state.get(state_key))
+    if job is None or not job.active:
+        st.rerun()
+    position = job_pool.position(job.id)
+    if position is not None:
+        # Saare workers busy: provider queue (job.note) tak abhi pahuncha hi nahi
+        st.info(f"⏳ Rush hai! Server queue me aapka number #{position} hai, worker free hote hi shuru hoga.")
+    else:
+        st.info(job.note or f"⚙️ '{job.title}' generate ho raha hai... tab tak doosra tab use kar sakte ho.")
+    render_live(job)
+
+def pdf_export(kind, title, subtitle, sections, file_name):
+    # Pehle se bana (kisi bhi student ka) PDF turant; warna job pool pe render, tab tak session free
+    key = export_key(kind, title, subtitle, sections)
+    ready_key, job_key = f"pdf_{kind}", f"pdf_{kind}_job"
+    if job_key in st.session_state:
+        job = job_pool.get(st.session_state[job_key])
+        if job is not None and job.active:
+            job_progress(job_key, lambda job: None)
+            return
+        del st.session_state[job_key]
+        if job is None or job.status == FAILED:
+            st.error(f"⚠️ PDF export fail ho gaya: {job.error if job else 'job nahi mila'}")
+    data = pdf_exporter.peek(key) if st.session_state.get(ready_key) == key else None
+    if data is not None:
+        st.download_button("📥 Download PDF", data, file_name=file_name, mime="application/pdf", key=f"pdf_{kind}_download")
+    elif st.button("📄 Export PDF", key=f"pdf_{kind}_export"):
+        if pdf_exporter.lookup(key, kind) is None:
+            try:
+                job = job_pool.submit(
+                    st.session_state.user_data["email"], "pdf", key, f"{title} PDF",
+                    lambda job: pdf_exporter.export(key, kind, title, subtitle, sections),
+                )
+            except JobLimit as e:
+                st.warning(str(e))
+                return
+            st.session_state[job_key] = job.id
+        st.session_state[ready_key] = key
+        st.rerun()
 
 # UI STYLES
 st.markdown("""
@@ -162,6 +474,36 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def section_box(color, text):
+    return f"<div style='border-left:6px solid {color}; padding:15px; background:#1e1e1e; border-radius:12px; line-height:2.2; color:white; white-space: pre-wrap;'>{text}</div>"
+
+def heatmap_table(sessions, rows):
+    # Topic x session, cell jitna gehra utne zyada marks us session me
+    peak = max((m for _, per_session, _ in rows for m in per_session), default=0) or 1
+    head = "".join(f"<th style='padding:6px 10px; color:#8b949e;'>{s}</th>" for s in sessions)
+    body = ""
+    for label, per_session, total in rows:
+        cells = "".join(
+            f"<td style='padding:6px 10px; text-align:center; background:rgba(33,150,243,{0.15 + 0.85 * m / peak:.2f});'>{m}M</td>"
+            if m else "<td style='padding:6px 10px; text-align:center; color:#30363d;'>-</td>"
+            for m in per_session
+        )
+        body += f"<tr><td style='padding:6px 10px;'>{label.title()}</td>{cells}<td style='padding:6px 10px; text-align:center; font-weight:bold;'>{total}M</td></tr>"
+    return f"""
+            <table style="width:100%; border-collapse:collapse; background:#1e1e1e; color:white; border-radius:12px; font-size:14px;">
+                <tr><th style='padding:6px 10px; text-align:left; color:#8b949e;'>Topic</th>{head}<th style='padding:6px 10px; color:#8b949e;'>Total</th></tr>
+                {body}
+            </table>
+            """
+
+def topic_card(color, heading, text):
+    return f"""
+            <div class="card-box" style="border-left: 4px solid {color};">
+                <h4 style="color:{color}; margin-top:0;">{heading}</h4>
+                <p style="font-size:14px; line-height:1.6;">{text}</p>
+            </div>
+            """
+
 # --- SIDEBAR ---
 with st.sidebar:
     st.markdown("<h2 style='text-align:center; color:#4CAF50;'>TopperGPT</h2>", unsafe_allow_html=True)
@@ -182,16 +524,20 @@ with st.sidebar:
             <p style="margin:0; font-size:11px;">FREE TRIALS LEFT</p>
         </div>''', unsafe_allow_html=True)
 
+    if st.secrets.get("SHOW_PERF_STATS"):
+        st.caption(f"Reruns: {RERUNS.stats()} | Clients: {clients.stats()} | Hedger: {hedger.stats()} | Router: {router.stats()} | Cache: {response_cache.stats()} | Topics: {topic_cache.stats()} | Jobs: {job_pool.stats()} | Results: {results.stats()}")
+
     st.divider()
     if st.button("🔓 Logout", use_container_width=True):
-        st.session_state.clear()
-        st.rerun()
+        # Is email ke saare session tokens (history / copied link wale bhi) revoke, phir local session saaf
+        profile_service.revoke_sessions(st.session_state.user_data["email"])
+        end_session()
 
 # Welcome Header
 st.markdown(f"### Welcome back, {st.session_state.user_data.get('full_name', 'Student')}! 🎓")
 
 # --- MAIN FEATURES TABS ---
-tab1, tab7 = st.tabs(["🔮 Predict Questions", "🔍 Streamlined Topic Search"])
+tab1, tab7, tab8 = st.tabs(["🔮 Predict Questions", "🔍 Streamlined Topic Search", "📚 Search Past Papers"])
 
 # ==================================================
 # --- TAB 1: PREDICT MY NEXT QUESTION ---
@@ -205,73 +551,121 @@ with tab1:
     with c2:
         p_uni = st.selectbox("University Pattern", ["Mumbai University (MU)"], key="uni_v2600_final")
 
+    ui_sections = {
+        "🎯 Sureshot Predictions (Confidence Verified)": ("START_SURESHOT", "#4CAF50"),
+        # Model nahi likhta: knowledge base se exact count / sessions / marks (pyq_analytics), turant
+        "📊 Most Repeated PYQs (Source Proof)": (None, "#2196F3"),
+        "🛡️ Pass Hone Ka Jugaad": ("START_JUGAAD", "#FF9800"),
+        "📅 3-Day Battle Roadmap": ("START_PLAN", "#9C27B0")
+    }
+    predict_markers = [start for start, _ in ui_sections.values() if start]
+
     if st.button("⚡ GENERATE BATTLE PLAN", use_container_width=True):
+        choices = subject_resolver.ambiguous(user_subj) if user_subj.strip() else []
         if not user_subj.strip():
             st.warning("Pehle subject ka naam dalo bhai!")
+        elif choices:
+            # Near-tie: galat paper pe trial + LLM call se behtar poochh lo
+            st.warning(f"'{user_subj}' se kaunsa subject? {' ya '.join(c.title() for c in choices)} — poora naam likho.")
         elif not check_access():
             show_paywall()
         else:
-            deduct_trial()
             with st.spinner(f"Analyzing {user_subj} Exam Patterns..."):
                 try:
-                    raw_in = user_subj.lower().strip()
-                    search_key = raw_in
-                    if any(x in raw_in for x in ["ds", "data structure", "dsa"]): search_key = "data structure"
-                    elif any(x in raw_in for x in ["math", "m2"]): search_key = "applied mathematics 2"
-                    elif any(x in raw_in for x in ["graphics", "eg"]): search_key = "engineering graphics"
-                    elif "physics" in raw_in: search_key = "applied physics"
+                    resolved = subject_resolver.resolve(user_subj)
+                    search_key = resolved or normalize_subject(user_subj)
+                    if resolved is None:
+                        close = [s.title() for s, score in subject_resolver.candidates(user_subj, limit=3) if score >= 0.4]
+                        hint = f" Closest matches: {', '.join(close)}." if close else ""
+                        st.info(f"'{user_subj}' ka PYQ data nahi hai, standard MU pattern use ho raha hai.{hint}")
                     
-                    evidence = ALL_SUBJECTS.get(search_key, "MU Engineering Standard Pattern.")
+                    # Poora blob nahi, sirf budget ke andar sabse kaam ke PYQs
+                    evidence = evidence_ranker.build_evidence(
+                        search_key, evidence_budget,
+                        fallback="MU Engineering Standard Pattern."
+                    )
 
-                    prompt = f"""
-                    Role: Senior MU Paper Setter. Target: {user_subj} | Data: {evidence}
-                    MISSION: Predict 12 high-probability questions for WRITTEN EXAM.
-                    
-                    STRICT DYNAMIC RULES:
-                    1. IF DRAWING (EG): 10M-15M Drafting problems only. No theory/CAD.
-                    2. IF MATHS/NUMERICAL: Provide actual numericals with specific values.
-                    3. SURESHOT: Add | Confidence: [85-99]% | Marks: [X]M.
-                    4. REPEATED: Mention MU Exam Year (e.g. MAY 2024). NO Confidence %.
-                    
-                    STRUCTURE: START_SURESHOT [12 Qs] END_SURESHOT. START_REPEATED [6 PYQs] END_REPEATED. START_JUGAAD [5 Topics] END_JUGAAD. START_PLAN [Roadmap] END_PLAN.
-                    """
-
-                    try:
-                        res = deepseek_client.chat.completions.create(
-                            model="deepseek-chat", messages=[{"role": "user", "content": prompt}], timeout=15 
-                        )
-                        raw_out = res.choices[0].message.content.strip()
-                    except:
-                        res_f = groq_client.chat.completions.create(
-                            model="llama-3.3-70b-versatile", messages=[{"role": "user", "content": prompt}]
-                        )
-                        raw_out = res_f.choices[0].message.content.strip()
-
-                    st.session_state.prediction_pro_out = raw_out
-                    st.session_state.p_subj_pro_final = user_subj
-                    st.balloons()
-                    st.rerun()
+                    # Same subject + same evidence => disk cache se turant answer
+                    raw_out = response_cache.get("predict", search_key, evidence, PREDICT_PROMPT_VERSION)
+                    if raw_out is not None:
+                        # Trial sirf tab kate jab answer sach me mila
+                        deduct_trial()
+                        st.session_state.prediction_key = results.put(raw_out)
+                        st.session_state.p_subj_pro_final = user_subj
+                        st.balloons()
+                        st.rerun()
+
+                    # Cache miss: background job, session free rehta hai (tokens aate hi expanders bharte hain)
+                    prompt = build_predict_prompt(search_key, evidence)
+                    key = prompt_key("predict", prompt)
+                    job = job_pool.submit(
+                        st.session_state.user_data["email"], "predict", key, user_subj,
+                        generation_job(
+                            "predict", prompt, key, predict_markers, PREDICT_END_TOKENS, st.session_state.user_data,
+                            lambda out: response_cache.put("predict", search_key, evidence, PREDICT_PROMPT_VERSION, out),
+                        ),
+                    )
+                    st.session_state.predict_job = job.id
 
+                except JobLimit as e:
+                    st.warning(str(e))
                 except Exception as e:
+                    METRICS.event("ui_error", detail=str(e)[:300], tab="predict", reason=type(e).__name__)
                     st.error(f"⚠️ Stability Alert: {str(e)}")
 
-    if "prediction_pro_out" in st.session_state:
-        out_text = st.session_state.prediction_pro_out
+    def repeated_pyqs(subject_text):
+        resolved = subject_resolver.resolve(subject_text)
+        analytics = kb.analytics.subject(resolved) if resolved else None
+        if analytics is None:
+            return None, f"'{subject_text}' ka PYQ data abhi knowledge base me nahi hai."
+        repeats = analytics.most_repeated()
+        lines = repeats or [f"Koi sawal exact repeat nahi hua ({', '.join(analytics.sessions)} ke papers)."]
+        topics = analytics.recurring_topics()
+        if topics:
+            lines += ["", "Same topic, alag sawal (repeat nahi, har sawal ke asli marks):"] + topics
+        return analytics, "\n".join(lines)
+
+    def show_repeated(title, color, subject_text, expanded):
+        analytics, text = repeated_pyqs(subject_text)
+        with st.expander(title, expanded=expanded):
+            st.markdown(section_box(color, text), unsafe_allow_html=True)
+            if analytics is not None and analytics.topics:
+                st.caption("🔥 Topic Heat Map: har exam session me kitne marks ka aaya")
+                st.markdown(heatmap_table(*analytics.heatmap()), unsafe_allow_html=True)
+
+    def show_live_prediction(job):
+        for title, (start, color) in ui_sections.items():
+            if start is None:
+                show_repeated(title, color, job.title, expanded=True)
+                continue
+            with st.expander(title, expanded=True):
+                st.markdown(section_box(color, job.sections.get(start, "")), unsafe_allow_html=True)
+
+    if "predict_job" in st.session_state:
+        job_progress("predict_job", show_live_prediction)
+    if "predict_job_error" in st.session_state:
+        st.error(f"⚠️ Stability Alert: {st.session_state.pop('predict_job_error')}")
+
+    parsed = stored_result("prediction_key", parse_prediction) if "prediction_key" in st.session_state else None
+    if parsed is not None:
+        # Parsed result store entry ke saath cached: reruns pe dobara parse nahi hota
         st.success(f"✅ Pattern Verified for {st.session_state.p_subj_pro_final.upper()}")
         
-        ui_sections = {
-            "🎯 Sureshot Predictions (Confidence Verified)": ("START_SURESHOT", "START_REPEATED", "#4CAF50"),
-            "📊 Most Repeated PYQs (Source Proof)": ("START_REPEATED", "START_JUGAAD", "#2196F3"),
-            "🛡️ Pass Hone Ka Jugaad": ("START_JUGAAD", "START_PLAN", "#FF9800"),
-            "📅 3-Day Battle Roadmap": ("START_PLAN", "END_PLAN", "#9C27B0")
-        }
-        
-        for title, (start, end, color) in ui_sections.items():
-            if start in out_text:
-                content = out_text.split(start)[1].split(end)[0] if end in out_text else out_text.split(start)[1]
-                display_content = content.replace("END_SURESHOT", "").replace("END_REPEATED", "").replace("END_JUGAAD", "").replace("END_PLAN", "").strip()
-                with st.expander(title, expanded=(start == "START_SURESHOT")):
-                    st.markdown(f"<div style='border-left:6px solid {color}; padding:15px; background:#1e1e1e; border-radius:12px; line-height:2.2; color:white; white-space: pre-wrap;'>{display_content}</div>", unsafe_allow_html=True)
+        with METRICS.span("final_render_seconds", tab="predict"):
+            for title, (start, color) in ui_sections.items():
+                if start is None:
+                    show_repeated(title, color, st.session_state.p_subj_pro_final, expanded=False)
+                elif parsed.has(start):
+                    with st.expander(title, expanded=(start == "START_SURESHOT")):
+                        st.markdown(section_box(color, parsed.section(start)), unsafe_allow_html=True)
+
+        subj = st.session_state.p_subj_pro_final
+        pdf_sections = [
+            (title, repeated_pyqs(subj)[1] if start is None else parsed.section(start), color)
+            for title, (start, color) in ui_sections.items() if start is None or parsed.has(start)
+        ]
+        pdf_export("predict", f"MU Battle Plan: {subj.title()}", f"{p_uni} | TopperGPT", pdf_sections,
+                   f"TopperGPT_{normalize_subject(subj).replace(' ', '_')}_battle_plan.pdf")
 
 # ==================================================
 # --- TAB 7: STREAMLINED TOPIC SEARCH ---
@@ -281,6 +675,12 @@ with tab7:
     st.caption("Instant 3-Card Breakdown: University Definition, Technical Breakdown, and Working Principle.")
     
     query = st.text_input("Enter Engineering Topic (e.g. Transformer, PN Diode, Virtual Memory):", key="search_final_absolute_v1")
+
+    research_cards = [
+        ("[1_DEF]", "1. University Standard Definition", "#4CAF50"),
+        ("[2_BRK]", "2. Technical Breakdown", "#00F2FE"),
+        ("[3_WRK]", "3. Working Principle", "#FFD700"),
+    ]
     
     if st.button("Deep Research", key="btn_absolute_v1"):
         if not query.strip():
@@ -288,79 +688,87 @@ with tab7:
         elif not check_access():
             show_paywall()
         else:
-            deduct_trial()
             with st.spinner(f"PhD Mentor is analyzing '{query}'..."):
-                prompt = f"""
-                Act as a PhD Engineering Professor for Mumbai University curriculum.
-                Provide an academically accurate and high-scoring report for: '{query}'.
-                
-                OUTPUT FORMAT STRICTLY USING THESE 3 HEADERS ONLY:
-                [1_DEF]
-                Exact University Standard 2-Mark definition as expected in MU marking rubrics.
-                
-                [2_BRK]
-                Technical Breakdown: Architecture, internal equations, core components, and diagram notes.
-                
-                [3_WRK]
-                Working Principle: Step-by-step operational logic and mechanism.
-                """
                 try:
-                    res = groq_client.chat.completions.create(
-                        model="llama-3.3-70b-versatile", 
-                        messages=[{"role": "user", "content": prompt}]
+                    # Pregenerated / pehle pucha gaya topic => cache se
+                    research_out, topic = topic_cache.get(query)
+                    if research_out is not None:
+                        deduct_trial()
+                        st.session_state.research_key = results.put(research_out)
+                        st.session_state.research_query = query
+                        st.rerun()
+
+                    # Cache miss: background job; teeno cards live bharte hain jaise hi tokens aate hain
+                    key = prompt_key("research", topic)
+                    job = job_pool.submit(
+                        st.session_state.user_data["email"], "research", key, query,
+                        generation_job(
+                            "research", build_research_prompt(query), key, [tag for tag, _, _ in research_cards], (),
+                            st.session_state.user_data, lambda out: topic_cache.put(query, out),
+                        ),
                     )
-                    st.session_state.research_data = res.choices[0].message.content
-                    st.session_state.research_query = query
-                    st.rerun()
-                except Exception as e: 
+                    st.session_state.research_job = job.id
+                except JobLimit as e:
+                    st.warning(str(e))
+                except Exception as e:
+                    METRICS.event("ui_error", detail=str(e)[:300], tab="research", reason=type(e).__name__)
                     st.error(f"System Busy. Error: {e}")
 
-    if "research_data" in st.session_state and st.session_state.research_data:
-        out = st.session_state.research_data
-        q_name = st.session_state.research_query
+    def show_live_research(job):
+        for col, (tag, heading, color) in zip(st.columns(3), research_cards):
+            with col:
+                st.markdown(topic_card(color, heading, job.sections.get(tag, "")), unsafe_allow_html=True)
 
-        def extract_block(start_tag, end_tag=None):
-            try:
-                if start_tag not in out:
-                    return "Details being formulated..."
-                content = out.split(start_tag)[1]
-                if end_tag and end_tag in content:
-                    content = content.split(end_tag)[0]
-                return content.strip()
-            except:
-                return "Section parsing error."
-
-        def_text = extract_block("[1_DEF]", "[2_BRK]")
-        brk_text = extract_block("[2_BRK]", "[3_WRK]")
-        wrk_text = extract_block("[3_WRK]")
+    if "research_job" in st.session_state:
+        job_progress("research_job", show_live_research)
+    if "research_job_error" in st.session_state:
+        st.error(f"System Busy. Error: {st.session_state.pop('research_job_error')}")
+
+    parsed = stored_result("research_key", parse_research) if st.session_state.get("research_key") else None
+    if parsed is not None:
+        q_name = st.session_state.research_query
 
         st.markdown(f"## 📘 Technical Report: {q_name}")
         
-        c1, c2, c3 = st.columns(3)
-        with c1:
-            st.markdown(f"""
-            <div class="card-box" style="border-left: 4px solid #4CAF50;">
-                <h4 style="color:#4CAF50; margin-top:0;">1. University Standard Definition</h4>
-                <p style="font-size:14px; line-height:1.6;">{def_text}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with c2:
-            st.markdown(f"""
-            <div class="card-box" style="border-left: 4px solid #00F2FE;">
-                <h4 style="color:#00F2FE; margin-top:0;">2. Technical Breakdown</h4>
-                <p style="font-size:14px; line-height:1.6;">{brk_text}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with c3:
-            st.markdown(f"""
-            <div class="card-box" style="border-left: 4px solid #FFD700;">
-                <h4 style="color:#FFD700; margin-top:0;">3. Working Principle</h4>
-                <p style="font-size:14px; line-height:1.6;">{wrk_text}</p>
-            </div>
-            """, unsafe_allow_html=True)
+        for col, (tag, heading, color) in zip(st.columns(3), research_cards):
+            with col:
+                st.markdown(topic_card(color, heading, parsed.section(tag, "Details being formulated...")), unsafe_allow_html=True)
+
+        pdf_export("research", f"Technical Report: {q_name}", "Mumbai University curriculum | TopperGPT",
+                   [(heading, parsed.section(tag), color) for tag, heading, color in research_cards],
+                   f"TopperGPT_{normalize_subject(q_name).replace(' ', '_')}_report.pdf")
 
         if st.button("🗑️ Clear Research"):
-            st.session_state.research_data = None
-            st.rerun()
\ No newline at end of file
+            st.session_state.research_key = None
+            st.rerun()
+
+# ==================================================
+# --- TAB 8: SEARCH PAST PAPERS (free, local) ---
+# ==================================================
+with tab8:
+    st.subheader("📚 Search Past Papers")
+    st.caption("Ye topic pehle aaya hai kya, kab aur kitne marks ka? Seedha MU papers se. Free hai, trial nahi katega.")
+
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        pyq_query = st.text_input("Topic / keywords (e.g. Fermi level, Huffman, PMMA):", key="pyq_search_q")
+    with c2:
+        pyq_subject = st.selectbox("Subject", ["All Subjects"] + sorted(s.title() for s in kb.store.subjects()), key="pyq_search_subject")
+
+    if pyq_query.strip():
+        hits = past_papers.search(pyq_query, None if pyq_subject == "All Subjects" else pyq_subject.lower())
+        if not hits:
+            st.info(f"'{pyq_query}' MU papers me nahi mila. Spelling check karo ya Topic Search tab try karo.")
+        else:
+            summary = past_papers.summary(hits)
+            if summary["count"]:
+                st.success(f"✅ {summary['count']} baar aaya: {', '.join(summary['sessions'])} | Max {summary['max_marks']}M")
+            else:
+                # OR fallback: kuch words hi milte hain, toh "itni baar aaya" bolna galat hoga
+                st.info(f"'{pyq_query}' exactly kisi sawal me nahi mila. Ye related sawal hain (repeat count me nahi gine):")
+            st.markdown("\n".join(
+                f"- **{h.marks}M** · {h.session} · {h.subject.title()}{f' (QP: {h.qp_code})' if h.qp_code else ''} — {h.snippet}"
+                for h in hits
+            ))
+
+RERUNS.finish()
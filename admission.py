@@ -0,0 +1,211 @@
+# TopperGPT Admission Control
+# Exam ki raat traffic spike: provider ke RPM/TPM limit se zyada requests bhejna = 429 ki baarish + retries.
+# Har provider ke do token buckets (requests/min, tokens/min). Request tabhi jaati hai jab kisi provider ke
+# bucket me jagah ho; warna ek bounded FIFO queue me (har user ki ek hi waiting request) position + ETA ke saath.
+# Limits secrets.toml se:
+#   [RATE_LIMITS.groq]
+#   rpm = 30
+#   tpm = 12000
+
+import threading
+import time
+from collections import deque
+
+from metrics import METRICS
+from router import retry_after, status_code
+
+# Groq free tier (llama-3.3-70b-versatile) aur DeepSeek ke liye conservative defaults
+DEFAULT_LIMITS = {
+    "groq": {"rpm": 30, "tpm": 12000},
+    "deepseek": {"rpm": 120, "tpm": 240000},
+}
+COMPLETION_TOKENS = {"predict": 1500, "research": 700}
+
+
+class Overloaded(Exception):
+    pass
+
+
+class Throttled(Exception):
+    # Hedge / fallback attempt ke liye bucket me jagah nahi thi; provider ki galti nahi
+    pass
+
+
+def estimate_tokens(prompt, route):
+    return len(prompt) // 4 + COMPLETION_TOKENS.get(route, 1000)
+
+
+class TokenBucket:
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now):
+        self._refill(now)
+        return self.tokens
+
+    def wait_for(self, amount, now):
+        # Kitne seconds baad `amount` tokens milenge (0 = abhi)
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def drain(self, seconds, now):
+        # 429 aaya: provider ke hisaab se hum abhi limit pe hain, `seconds` tak kuch mat bhejo
+        self._refill(now)
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class Ticket:
+    __slots__ = ("user", "tokens", "providers", "enqueued")
+
+    def __init__(self, user, tokens, providers):
+        self.user = user
+        self.tokens = tokens
+        self.providers = providers
+        self.enqueued = time.monotonic()
+
+
+class AdmissionController:
+
+    def __init__(self, limits=None, max_queue=200, queue_timeout=90.0, poll_interval=0.5):
+        self.buckets = {}
+        for name, cfg in {**DEFAULT_LIMITS, **dict(limits or {})}.items():
+            cfg = dict(cfg)
+            self.buckets[name] = (TokenBucket(cfg.get("rpm", 60)), TokenBucket(cfg.get("tpm", 100000)))
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.poll_interval = poll_interval
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    # --- ADMISSION ---
+    def _wait_for(self, provider, tokens, now):
+        buckets = self.buckets.get(provider)
+        if buckets is None:
+            return 0.0
+        rpm, tpm = buckets
+        return max(rpm.wait_for(1, now), tpm.wait_for(tokens, now))
+
+    def _take(self, provider, tokens):
+        buckets = self.buckets.get(provider)
+        if buckets is not None:
+            buckets[0].take(1)
+            buckets[1].take(tokens)
+
+    def _eta(self, position, head_wait, providers):
+        # Head ka wait + aage wale requests / combined requests-per-second ceiling
+        rate = sum(self.buckets[p][0].rate for p in providers if p in self.buckets) or 1.0
+        return head_wait + position / rate
+
+    def acquire(self, user, providers, tokens, on_wait=None):
+        # providers router ke order me; jis pehle provider ke bucket me jagah hai wahi milta hai (naam return)
+        ticket = Ticket(user, tokens, list(providers))
+        with self._cond:
+            # Fair queue: ek user ki ek hi waiting request; naya click purani ko replace karta hai
+            for old in [t for t in self._queue if t.user == user]:
+                self._queue.remove(old)
+                self._cond.notify_all()
+            if len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                METRICS.inc("admission_total", result="rejected")
+                raise Overloaded("Abhi bahut students ek saath generate kar rahe hain. Thodi der me try karo.")
+            self._queue.append(ticket)
+        deadline = ticket.enqueued + self.queue_timeout
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    if ticket not in self._queue:
+                        raise Overloaded("Same account se nayi request aa gayi, ye wali cancel.")
+                    position = self._queue.index(ticket)
+                    head_wait = None
+                    if position == 0:
+                        waits = [(self._wait_for(p, tokens, now), i, p) for i, p in enumerate(ticket.providers)]
+                        head_wait, _, provider = min(waits)
+                        if head_wait == 0.0:
+                            self._take(provider, tokens)
+                            self._queue.popleft()
+                            self._cond.notify_all()
+                            self.admitted += 1
+                            METRICS.inc("admission_total", result="admitted", provider=provider)
+                            METRICS.observe("admission_wait_seconds", now - ticket.enqueued)
+                            return provider
+                    if now >= deadline:
+                        self.timed_out += 1
+                        METRICS.inc("admission_total", result="timeout")
+                        raise Overloaded("Queue me bahut der lag rahi hai. Thodi der baad try karo.")
+                    if head_wait is None:
+                        head = self._queue[0]
+                        head_wait = min(self._wait_for(p, head.tokens, now) for p in head.providers)
+                    eta = self._eta(position, head_wait, ticket.providers)
+                # Callback lock ke bahar (UI update slow ho sakta hai)
+                if on_wait is not None:
+                    on_wait(position + 1, eta)
+                with self._cond:
+                    self._cond.wait(timeout=max(0.01, min(self.poll_interval, head_wait or self.poll_interval, deadline - now)))
+        finally:
+            with self._cond:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    self._cond.notify_all()
+
+    def try_take(self, provider, tokens):
+        # Hedge / fallback attempt: queue nahi, jagah hai toh lo warna Throttled
+        with self._cond:
+            if self._wait_for(provider, tokens, time.monotonic()) > 0:
+                return False
+            self._take(provider, tokens)
+            return True
+
+    def penalize(self, provider, seconds):
+        with self._cond:
+            buckets = self.buckets.get(provider)
+            if buckets is not None:
+                now = time.monotonic()
+                buckets[0].drain(seconds, now)
+                buckets[1].drain(seconds, now)
+
+    def guard(self, attempts, admitted, tokens):
+        # hedger ke attempts: admitted provider pehle (pehle se paid), baaki try_take se; 429 pe bucket drain
+        ordered = sorted(attempts, key=lambda a: a[0] != admitted)
+        return [(name, self._guarded(name, factory, tokens, name == admitted)) for name, factory in ordered]
+
+    def _guarded(self, name, factory, tokens, prepaid):
+        def run():
+            if not prepaid and not self.try_take(name, tokens):
+                METRICS.inc("admission_total", result="throttled", provider=name)
+                raise Throttled(f"{name} is at its rate limit")
+            try:
+                yield from factory()
+            except Exception as e:
+                if status_code(e) == 429:
+                    self.penalize(name, retry_after(e) or 10.0)
+                raise
+        return run
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "queued": len(self._queue),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "rpm_available": {p: round(max(0.0, b[0].available(now)), 1) for p, b in self.buckets.items()},
+            }
@@ -0,0 +1,86 @@
+# TopperGPT Client Registry
+# Har provider ka client process me sirf ek baar banta hai (pehli zaroorat pe), aur saare sessions
+# usi keep-alive HTTP pool ko share karte hain. Har rerun pe naya client / TLS handshake nahi.
+
+import threading
+import time
+
+DEEPSEEK_BASE_URL = "https://api.deepseek.com"
+GEMINI_MODEL = "models/gemini-1.5-flash"
+
+POOL_LIMITS = {"max_connections": 64, "max_keepalive_connections": 32, "keepalive_expiry": 120.0}
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 60.0
+
+
+def _http_client():
+    import httpx
+    return httpx.Client(
+        limits=httpx.Limits(**POOL_LIMITS),
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+    )
+
+
+def _build_deepseek(secrets):
+    # Key nahi toh None: router is provider ko skip karta hai, job fail nahi hota
+    api_key = secrets.get("DEEPSEEK_API_KEY")
+    if not api_key:
+        return None
+    from groq import Groq
+    return Groq(
+        api_key=api_key,
+        base_url=secrets.get("DEEPSEEK_BASE_URL") or DEEPSEEK_BASE_URL,
+        http_client=_http_client(),
+    )
+
+
+def _build_groq(secrets):
+    from groq import Groq
+    api_key = secrets.get("GROQ_API_KEY")
+    if not api_key:
+        return None
+    base_url = secrets.get("GROQ_BASE_URL")
+    if base_url:
+        return Groq(api_key=api_key, base_url=base_url, http_client=_http_client())
+    return Groq(api_key=api_key, http_client=_http_client())
+
+
+def _build_gemini(secrets):
+    import google.generativeai as genai
+    genai.configure(api_key=secrets.get("GEMINI_API_KEY") or secrets.get("GOOGLE_API_KEY"))
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+
+BUILDERS = {
+    "deepseek": _build_deepseek,
+    "groq": _build_groq,
+    "gemini": _build_gemini,
+}
+
+
+class ClientRegistry:
+
+    def __init__(self, secrets, builders=BUILDERS):
+        self.secrets = secrets
+        self.builders = dict(builders)
+        self.build_seconds = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        client = self._clients.get(name)
+        if client is not None or name in self._clients:
+            return client
+        with self._lock:
+            if name not in self._clients:
+                started = time.perf_counter()
+                self._clients[name] = self.builders[name](self.secrets)
+                self.build_seconds[name] = time.perf_counter() - started
+            return self._clients[name]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "built": sorted(self._clients),
+                "build_ms": {name: round(sec * 1000, 2) for name, sec in self.build_seconds.items()},
+            }
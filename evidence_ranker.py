@@ -0,0 +1,115 @@
+# TopperGPT Evidence Ranker
+# Poora subject blob prompt me chipkane ke bajaye sirf sabse kaam ke PYQs bhejo, token budget ke andar.
+# PYQ digest ke canonical sawal (near-duplicates pehle se merged) pe BM25 (subject ke recurring topics ko query maan ke)
+# x marks weight x recency weight x kitni baar aaya. BM25 ke idf / avgdl subject ke andar ke records se, aur ye index
+# digest jaisa per-subject LRU me: poore corpus ka vocabulary kabhi heap me nahi.
+
+import math
+
+from pyq_digest import DIGEST, PYQDigest, render_clusters
+from pyq_store import MAX_CACHED_SUBJECTS, STORE, SubjectMemo, keywords, session_order
+
+DEFAULT_TOKEN_BUDGET = 400
+BM25_K1 = 1.2
+BM25_B = 0.75
+RECENCY_DECAY = 0.85
+REPEAT_WEIGHT = 0.5
+
+
+def estimate_tokens(text):
+    # ~4 chars per token, provider tokenizer ke bina kaafi close
+    return len(text) // 4 + 1
+
+
+class SubjectIndex:
+    # Ek subject ke canonical sawalon ke terms + BM25 stats; evidence = (budget -> text) memo
+    __slots__ = ("terms", "avgdl", "idf", "evidence")
+
+    def __init__(self, store, clusters, subject):
+        self.terms = {c.ids[0]: keywords(c.text) for c in clusters}
+        self.avgdl = sum(map(len, self.terms.values())) / max(1, len(self.terms))
+        records = store.records(subject)
+        df = {}
+        for rec in records:
+            for word in set(keywords(rec.text)):
+                df[word] = df.get(word, 0) + 1
+        n = len(records)
+        self.idf = {word: math.log(1 + (n - d + 0.5) / (d + 0.5)) for word, d in df.items()}
+        # Digest badalta nahi toh har rerun / worker pe dobara rank kyun
+        self.evidence = {}
+
+
+class EvidenceRanker:
+
+    def __init__(self, store=STORE, digest=None, max_subjects=MAX_CACHED_SUBJECTS):
+        self.store = store
+        self.digest = digest or (DIGEST if store is STORE else PYQDigest(store))
+        self._index = SubjectMemo(max_subjects)
+
+    def index(self, subject):
+        return self._index.get(subject, lambda s: SubjectIndex(self.store, self.digest.clusters(s), s))
+
+    def rank(self, subject, query=""):
+        clusters = self.digest.clusters(subject)
+        if not clusters:
+            return []
+
+        # Subject ke andar jo terms baar baar aate hain wahi "important topics" hain (repeat wale sawal utni baar gine)
+        index = self.index(subject)
+        weights = {}
+        for c in clusters:
+            for word in set(index.terms[c.ids[0]]):
+                weights[word] = weights.get(word, 0) + c.count
+        weights = {w: n - 1 for w, n in weights.items() if n > 1}
+        for word in keywords(query):
+            weights[word] = weights.get(word, 0) + 3
+
+        sessions = sorted({s for c in clusters for s in c.sessions}, key=session_order, reverse=True)
+        recency = {s: RECENCY_DECAY ** rank for rank, s in enumerate(sessions)}
+
+        scored = []
+        for c in clusters:
+            terms = index.terms[c.ids[0]]
+            tf = {}
+            for word in terms:
+                tf[word] = tf.get(word, 0) + 1
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * len(terms) / max(1.0, index.avgdl))
+            bm25 = sum(
+                weights[w] * index.idf.get(w, 0.0) * f * (BM25_K1 + 1) / (f + norm)
+                for w, f in tf.items() if w in weights
+            )
+            score = ((1.0 + bm25) * (1.0 + 0.1 * min(c.max_marks, 15)) * recency[c.latest]
+                     * (1.0 + REPEAT_WEIGHT * (c.count - 1)))
+            scored.append((score, c))
+        scored.sort(key=lambda x: (-x[0], x[1].ids[0]))
+        return scored
+
+    def select(self, subject, token_budget=DEFAULT_TOKEN_BUDGET, query=""):
+        # Budget ke andar canonical sawal (clusters already deduped hain)
+        picked = []
+        used = 0
+        for _, c in self.rank(subject, query):
+            cost = estimate_tokens(c.line()) + 1
+            if used + cost > token_budget:
+                continue
+            picked.append(c)
+            used += cost
+        return picked
+
+    def build_evidence(self, subject, token_budget=DEFAULT_TOKEN_BUDGET, query="", fallback=""):
+        if subject not in self.store:
+            return fallback
+        memo = self.index(subject).evidence if not query else None
+        if memo is not None and token_budget in memo:
+            return memo[token_budget] or fallback
+
+        selected = self.select(subject, token_budget, query)
+        evidence = ""
+        if selected:
+            clusters = self.digest.clusters(subject)
+            header = (f"--- MU PYQ EVIDENCE (top {len(selected)} of {len(clusters)} unique, "
+                      f"{self.digest.asked(subject)} asked) ---")
+            evidence = "\n".join([header, render_clusters(selected)])
+        if memo is not None:
+            memo[token_budget] = evidence
+        return evidence or fallback
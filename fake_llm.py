@@ -0,0 +1,148 @@
+# TopperGPT Fake LLM Server
+# Local OpenAI-style /chat/completions stand-in for dry runs aur load tests. Koi API key / network nahi chahiye.
+#   python fake_llm.py --port 8765 --latency 0.5 --error-rate 0.1
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREDICT_REPLY = """START_SURESHOT
+1. Derive the key expression for {topic} | Confidence: 92% | Marks: 5M
+2. Numerical on {topic} with given values | Confidence: 88% | Marks: 6M
+END_SURESHOT
+START_JUGAAD
+- Revise {topic} definitions and diagrams
+END_JUGAAD
+START_PLAN
+Day 1: Theory. Day 2: Numericals. Day 3: PYQs.
+END_PLAN"""
+
+RESEARCH_REPLY = """[1_DEF]
+{topic} is a standard engineering concept as per MU syllabus.
+[2_BRK]
+Core components, equations and diagram notes for {topic}.
+[3_WRK]
+Step 1: Input. Step 2: Process. Step 3: Output for {topic}."""
+
+
+class FakeLLMState:
+
+    def __init__(self, latency=0.0, first_token_latency=0.0, error_rate=0.0, chunk_size=12, seed=None):
+        self.latency = latency
+        self.first_token_latency = first_token_latency
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next_call(self):
+        with self._lock:
+            self.calls += 1
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+
+def fake_reply(prompt):
+    topic = "the topic"
+    if "Target:" in prompt:
+        topic = prompt.split("Target:", 1)[1].split("|", 1)[0].strip()
+    elif "report for:" in prompt:
+        topic = prompt.split("report for:", 1)[1].split("'")[1]
+    template = PREDICT_REPLY if "START_SURESHOT" in prompt else RESEARCH_REPLY
+    return template.format(topic=topic)
+
+
+def make_handler(state):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("chat/completions"):
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if state.next_call():
+                self._json(429, {"error": {"message": "fake rate limit", "type": "rate_limit_exceeded"}})
+                return
+
+            prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+            text = fake_reply(prompt)
+            model = body.get("model", "fake-model")
+            time.sleep(state.first_token_latency)
+
+            usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+                     "total_tokens": (len(prompt) + len(text)) // 4}
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                pieces = [text[i:i + state.chunk_size] for i in range(0, len(text), state.chunk_size)]
+                include_usage = (body.get("stream_options") or {}).get("include_usage")
+                for n, piece in enumerate(pieces, 1):
+                    chunk = {"id": "fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                             "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                    if n == len(pieces) and not include_usage:
+                        # Groq style: usage aakhri chunk ke x_groq me
+                        chunk["x_groq"] = {"id": "fake", "usage": usage}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(state.latency / max(1, len(pieces)))
+                if include_usage:
+                    # OpenAI / DeepSeek style: alag chunk, choices khali
+                    chunk = {"id": "fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                             "choices": [], "usage": usage}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.write(b"data: [DONE]\n\n")
+                return
+
+            time.sleep(state.latency)
+            self._json(200, {
+                "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        def _json(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def start_fake_llm(port=0, **state_kwargs):
+    # Background thread me server; (server, state, base_url) return
+    state = FakeLLMState(**state_kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local fake chat-completions server")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.5)
+    ap.add_argument("--first-token-latency", type=float, default=0.2)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    args = ap.parse_args()
+    server, state, url = start_fake_llm(args.port, latency=args.latency,
+                                        first_token_latency=args.first_token_latency, error_rate=args.error_rate)
+    print(f"Fake LLM listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,167 @@
+# TopperGPT Fake Supabase
+# Local PostgREST-style stand-in sirf `profiles` table + `decrement_trial` / `bump_session_gen` RPCs ke liye.
+# supabase-py isse asli project ki tarah baat karta hai: create_client("http://127.0.0.1:PORT", FAKE_SUPABASE_KEY)
+#   python fake_supabase.py --port 8766 --latency 0.05
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# supabase-py key ka JWT jaisa format check karta hai
+FAKE_SUPABASE_KEY = "fake.supabase.key"
+
+
+class FakeSupabaseState:
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.profiles = {}
+        self.calls = {}
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def begin(self, op):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls[op] = self.calls.get(op, 0) + 1
+            if self._rng.random() < self.error_rate:
+                self.errors += 1
+                return False
+            return True
+
+    def seed_profile(self, email, full_name="Student", trials=10, is_pro=False):
+        with self._lock:
+            self.profiles[email] = {"email": email, "full_name": full_name, "free_trials_left": trials, "is_pro": is_pro,
+                                    "session_gen": 0}
+
+
+def _eq_filters(query):
+    # PostgREST filter: ?email=eq.someone@x.com
+    filters = {}
+    for key, values in parse_qs(query).items():
+        if key in ("select", "limit", "order"):
+            continue
+        if values[0].startswith("eq."):
+            filters[key] = values[0][3:]
+    return filters
+
+
+def _project(row, select):
+    if not select or select == "*":
+        return dict(row)
+    return {c: row.get(c) for c in select.split(",")}
+
+
+def make_handler(state):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"null") if length else None
+
+        def _json(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _fail(self):
+            self._json(503, {"message": "fake supabase error", "code": "FAKE"})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/rest/v1/profiles":
+                return self._json(404, {"message": "not found"})
+            if not state.begin("select"):
+                return self._fail()
+            qs = parse_qs(url.query)
+            filters = _eq_filters(url.query)
+            with state._lock:
+                rows = [r for r in state.profiles.values() if all(str(r.get(k)) == v for k, v in filters.items())]
+            if "limit" in qs:
+                rows = rows[:int(qs["limit"][0])]
+            self._json(200, [_project(r, qs.get("select", ["*"])[0]) for r in rows])
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            body = self._body()
+            if url.path == "/rest/v1/rpc/decrement_trial":
+                if not state.begin("rpc_decrement_trial"):
+                    return self._fail()
+                with state._lock:
+                    row = state.profiles.get(body.get("p_email"))
+                    if row is None or row.get("is_pro"):
+                        return self._json(200, None)
+                    row["free_trials_left"] = max(0, row["free_trials_left"] - 1)
+                    return self._json(200, row["free_trials_left"])
+            if url.path == "/rest/v1/rpc/bump_session_gen":
+                if not state.begin("rpc_bump_session_gen"):
+                    return self._fail()
+                with state._lock:
+                    row = state.profiles.get(body.get("p_email"))
+                    if row is None:
+                        return self._json(200, None)
+                    row["session_gen"] = row.get("session_gen", 0) + 1
+                    return self._json(200, row["session_gen"])
+            if url.path == "/rest/v1/profiles":
+                if not state.begin("insert"):
+                    return self._fail()
+                rows = body if isinstance(body, list) else [body]
+                with state._lock:
+                    for row in rows:
+                        # Column default, asli table jaisa
+                        state.profiles[row["email"]] = {"session_gen": 0, **row}
+                return self._json(201, rows)
+            self._json(404, {"message": "not found"})
+
+        def do_PATCH(self):
+            url = urlparse(self.path)
+            if url.path != "/rest/v1/profiles":
+                return self._json(404, {"message": "not found"})
+            if not state.begin("update"):
+                return self._fail()
+            body = self._body() or {}
+            filters = _eq_filters(url.query)
+            updated = []
+            with state._lock:
+                for row in state.profiles.values():
+                    if all(str(row.get(k)) == v for k, v in filters.items()):
+                        row.update(body)
+                        updated.append(dict(row))
+            self._json(200, updated)
+
+    return Handler
+
+
+def start_fake_supabase(port=0, **state_kwargs):
+    state = FakeSupabaseState(**state_kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local fake Supabase (profiles table + decrement_trial / bump_session_gen RPCs)")
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--latency", type=float, default=0.02)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    args = ap.parse_args()
+    server, state, url = start_fake_supabase(args.port, latency=args.latency, error_rate=args.error_rate)
+    print(f"Fake Supabase listening on {url} (key: {FAKE_SUPABASE_KEY})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
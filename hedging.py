@@ -0,0 +1,171 @@
+# TopperGPT Hedged Requests
+# Primary provider ne delay ke andar pehla token nahi diya toh secondary bhi start kar do.
+# Jiska pehla token pehle aaya wahi jeeta, doosre ko cancel. Fail hua toh turant agla provider.
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+
+from metrics import METRICS
+
+
+class HedgedStream:
+    # Iterable chunks; iteration ke baad .provider me winner ka naam hota hai
+
+    def __init__(self, executor, attempts):
+        self._executor = executor
+        self._attempts = list(attempts)
+        self.provider = None
+        self.hedged = False
+
+    def __iter__(self):
+        return self._executor._run(self)
+
+
+class HedgingExecutor:
+
+    def __init__(self, hedge_delay=4.0, percentile=0.9, min_delay=0.5, max_delay=15.0, window=50, min_samples=10):
+        self.hedge_delay = hedge_delay
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self._window = window
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges_fired = 0
+        self.wins = Counter()
+        self.failures = Counter()
+
+    def stream(self, attempts):
+        # attempts: [(provider_name, factory), ...] primary pehle; factory() chunk iterator deta hai
+        return HedgedStream(self, attempts)
+
+    def delay_for(self, name):
+        # Provider ka p90 first-token latency; data kam hai toh configured default
+        with self._lock:
+            samples = sorted(self._latencies.get(name, ()))
+        if len(samples) < self.min_samples:
+            return self.hedge_delay
+        idx = min(len(samples) - 1, int(self.percentile * len(samples)))
+        return max(self.min_delay, min(self.max_delay, samples[idx]))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges_fired": self.hedges_fired,
+                "wins": dict(self.wins),
+                "failures": dict(self.failures),
+            }
+
+    def _record_first_token(self, name, seconds):
+        with self._lock:
+            self._latencies.setdefault(name, deque(maxlen=self._window)).append(seconds)
+
+    def _run(self, handle):
+        attempts = handle._attempts
+        events = queue.Queue()
+        cancels = {}
+        started_at = {}
+        pending = set()
+        winner = None
+        last_error = None
+
+        def start(i):
+            name, factory = attempts[i]
+            cancel = threading.Event()
+            cancels[name] = cancel
+            started_at[name] = time.monotonic()
+            pending.add(name)
+            threading.Thread(target=self._worker, args=(name, factory, cancel, events), daemon=True).start()
+
+        with self._lock:
+            self.requests += 1
+        next_idx = 1
+        start(0)
+        hedge_at = time.monotonic() + self.delay_for(attempts[0][0])
+
+        try:
+            while True:
+                timeout = None
+                if winner is None and next_idx < len(attempts):
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                try:
+                    name, kind, payload = events.get(timeout=timeout)
+                except queue.Empty:
+                    # Primary abhi tak chup hai: hedge fire
+                    with self._lock:
+                        self.hedges_fired += 1
+                    METRICS.event("llm_hedge", provider=attempts[next_idx][0])
+                    handle.hedged = True
+                    start(next_idx)
+                    next_idx += 1
+                    if next_idx < len(attempts):
+                        hedge_at = time.monotonic() + self.delay_for(attempts[next_idx - 1][0])
+                    continue
+
+                if kind == "chunk":
+                    if winner is None:
+                        winner = name
+                        handle.provider = name
+                        first_token = time.monotonic() - started_at[name]
+                        self._record_first_token(name, first_token)
+                        METRICS.observe("llm_first_token_seconds", first_token, provider=name)
+                        with self._lock:
+                            self.wins[name] += 1
+                        for other, cancel in cancels.items():
+                            if other != name:
+                                cancel.set()
+                    if name == winner:
+                        yield payload
+                    continue
+
+                pending.discard(name)
+                if name == winner:
+                    if kind == "error":
+                        raise payload
+                    return
+                if kind == "done" and winner is None:
+                    payload = RuntimeError(f"{name} returned an empty completion")
+                if winner is None:
+                    with self._lock:
+                        self.failures[name] += 1
+                    # Pehle ye bare except me chupchaap hota tha; ab reason ke saath record
+                    METRICS.event("llm_fallback", detail=str(payload)[:300], provider=name, reason=type(payload).__name__)
+                    last_error = payload
+                    # Fail hua toh hedge delay ka wait mat karo, agla provider abhi start
+                    if next_idx < len(attempts):
+                        start(next_idx)
+                        next_idx += 1
+                        hedge_at = time.monotonic() + self.delay_for(attempts[next_idx - 1][0])
+                    elif not pending:
+                        raise last_error
+        finally:
+            for cancel in cancels.values():
+                cancel.set()
+
+    @staticmethod
+    def _worker(name, factory, cancel, events):
+        chunks = None
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            chunks = iter(factory())
+            for delta in chunks:
+                if cancel.is_set():
+                    # Loser ya abandoned stream: connection band, aage padhna bekaar
+                    outcome = "cancelled"
+                    break
+                events.put((name, "chunk", delta))
+            events.put((name, "done", None))
+        except Exception as e:
+            outcome = type(e).__name__
+            events.put((name, "error", e))
+        finally:
+            METRICS.observe("llm_stream_seconds", time.perf_counter() - started, provider=name, outcome=outcome)
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
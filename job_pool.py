@@ -0,0 +1,197 @@
+# TopperGPT Job Pool
+# Provider call ab script run ke andar nahi chalti: job pool ke thread pe chalti hai, session sirf job id rakhta hai
+# aur poll karta hai. Toh spinner ke peeche poora session freeze nahi hota, doosra tab chalta rehta hai.
+# Job id = user + kind + prompt ka hash: double click / refresh pe wahi job milta hai, naya nahi banta.
+# Result SQLite me persist hota hai; refresh ke baad reconnect karne wala session usi se utha leta hai.
+# Saare workers busy hain toh job executor ki backlog me FIFO wait karta hai; position() usi line me number deta hai.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_cache import CACHE_DIR
+from metrics import METRICS
+
+JOBS_PATH = os.environ.get("TOPPER_JOBS_PATH", os.path.join(CACHE_DIR, "jobs.sqlite"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def job_id(user, kind, key):
+    return hashlib.sha256(f"{user}|{kind}|{key}".encode("utf-8")).hexdigest()[:32]
+
+
+class JobLimit(Exception):
+    pass
+
+
+class Job:
+    # sections / note sirf is process ki memory me (live progress); baaki sab DB me bhi
+    __slots__ = ("id", "user", "kind", "title", "status", "result", "error", "created_at", "updated_at",
+                 "sections", "note")
+
+    def __init__(self, id, user, kind, title, status=QUEUED, result=None, error=None, created_at=None, updated_at=None):
+        self.id = id
+        self.user = user
+        self.kind = kind
+        self.title = title
+        self.status = status
+        self.result = result
+        self.error = error
+        self.created_at = created_at or time.time()
+        self.updated_at = updated_at or self.created_at
+        self.sections = {}
+        self.note = None
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def progress(self, sections):
+        # Worker thread se: streaming parser ke sections ki copy, UI poll pe render karega
+        self.sections = dict(sections)
+        self.note = None
+
+    def notify(self, note):
+        self.note = note
+
+
+class JobPool:
+
+    def __init__(self, path=JOBS_PATH, max_workers=16, per_user=3, ttl_seconds=24 * 3600, stale_after=600.0):
+        self.path = path
+        self.per_user = per_user
+        self.ttl_seconds = ttl_seconds
+        self.stale_after = stale_after
+        self.completed = 0
+        self.failed = 0
+        self._live = {}
+        self._backlog = deque()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="topper-job")
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                user TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                title TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs (user, kind, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (updated_at)")
+        self._prune()
+
+    # --- SUBMIT ---
+    def submit(self, user, kind, key, title, fn):
+        # fn(job) worker thread pe chalta hai aur result text return karta hai
+        jid = job_id(user, kind, key)
+        with self._lock:
+            job = self._live.get(jid)
+            if job is not None:
+                METRICS.inc("jobs_total", kind=kind, result="joined")
+                return job
+            if sum(1 for j in self._live.values() if j.user == user) >= self.per_user:
+                METRICS.inc("jobs_total", kind=kind, result="limited")
+                raise JobLimit(f"Aapke {self.per_user} generations pehle se chal rahe hain. Ek khatam hone do.")
+            job = self._live[jid] = Job(jid, user, kind, title)
+            self._backlog.append(jid)
+            self._save(job)
+        METRICS.inc("jobs_total", kind=kind, result="submitted")
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job, fn):
+        job.status = RUNNING
+        job.updated_at = time.time()
+        with self._lock:
+            self._backlog.remove(job.id)
+            self._save(job)
+        try:
+            with METRICS.span("job_seconds", kind=job.kind):
+                result = fn(job)
+        except Exception as e:
+            job.status, job.error = FAILED, str(e)
+            self.failed += 1
+            METRICS.event("job_error", detail=str(e)[:300], kind=job.kind, reason=type(e).__name__)
+        else:
+            job.status, job.result = DONE, result
+            self.completed += 1
+        job.updated_at = time.time()
+        with self._lock:
+            self._save(job)
+            self._live.pop(job.id, None)
+
+    # --- POLL ---
+    def get(self, jid):
+        with self._lock:
+            job = self._live.get(jid)
+            if job is not None:
+                return job
+            row = self._conn.execute(
+                "SELECT id, user, kind, title, status, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (jid,),
+            ).fetchone()
+        return self._from_row(row)
+
+    def position(self, jid):
+        # Worker ka wait: backlog me 1-based number, chal raha / khatam hai toh None
+        with self._lock:
+            try:
+                return self._backlog.index(jid) + 1
+            except ValueError:
+                return None
+
+    def latest(self, user, kind, max_age=None):
+        # Reconnect: is user ka sabse naya job (refresh se pehle submit kiya hua bhi)
+        since = time.time() - (self.ttl_seconds if max_age is None else max_age)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE user = ? AND kind = ? AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (user, kind, since),
+            ).fetchone()
+        return self.get(row[0]) if row else None
+
+    def _from_row(self, row):
+        if row is None:
+            return None
+        job = Job(*row)
+        if job.active and time.time() - job.updated_at > self.stale_after:
+            # Kisi process me chal raha tha jo restart / crash ho gaya; ab kabhi complete nahi hoga
+            job.status, job.error = FAILED, "Generation interrupted (server restarted). Dobara try karo."
+        return job
+
+    def _save(self, job):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, user, kind, title, status, result, error, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.id, job.user, job.kind, job.title, job.status, job.result, job.error, job.created_at, job.updated_at),
+        )
+
+    def _prune(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+
+    def stats(self):
+        with self._lock:
+            live = list(self._live.values())
+        return {
+            "queued": len(self._backlog),
+            "running": sum(1 for j in live if j.status == RUNNING),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
@@ -0,0 +1,92 @@
+# TopperGPT Knowledge
+# PYQ store + digest + evidence ranker + subject resolver + analytics ek snapshot me. Har rerun pe (throttled) knowledge file ka
+# revision dekhte hain; naya paper append hua toh background thread naya snapshot banake swap karta hai.
+# App restart nahi, aur rebuild ke dauraan requests purane snapshot se chalti rehti hain.
+# Snapshot banana sasta hai (subject list + counts); records / digest / ranker index / analytics subject-wise on demand,
+# MAX_CACHED_SUBJECTS tak (pyq_store.SubjectMemo).
+
+import os
+import threading
+import time
+
+import knowledge_db
+from evidence_ranker import EvidenceRanker
+from metrics import METRICS
+from pyq_analytics import PYQAnalytics
+from pyq_digest import PYQDigest
+from pyq_store import STORE, load_store, store_fingerprint
+from subject_resolver import SubjectResolver
+
+
+class KnowledgeSnapshot:
+    __slots__ = ("revision", "store", "digest", "ranker", "resolver", "analytics")
+
+    def __init__(self, store):
+        self.revision = store.revision
+        self.store = store
+        self.digest = PYQDigest(store)
+        self.ranker = EvidenceRanker(store, self.digest)
+        self.resolver = SubjectResolver(store.subjects())
+        self.analytics = PYQAnalytics(store, self.digest)
+
+
+class Knowledge:
+
+    def __init__(self, path=None, check_interval=2.0):
+        self.path = knowledge_db.ensure_kb(path or knowledge_db.KB_PATH)
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._checked = time.monotonic()
+        self._open()
+        # Import ke waqt bana STORE same file + revision ka hai toh wahi use karo
+        store = STORE if STORE.fingerprint == store_fingerprint(self._conn) else load_store(self.path)
+        self._snapshot = KnowledgeSnapshot(store)
+
+    def _open(self):
+        self._conn = knowledge_db.connect(self.path)
+        self._inode = os.stat(self.path).st_ino
+
+    def current(self):
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            self._checked = now
+            if self._reloading:
+                return self._snapshot
+            try:
+                if os.stat(self.path).st_ino != self._inode:
+                    # `knowledge_db.py import` ne file replace ki: purana connection purana inode dekhta rahega
+                    self._conn.close()
+                    self._open()
+                fingerprint = store_fingerprint(self._conn)
+            except Exception as e:
+                METRICS.event("knowledge_check_error", detail=str(e)[:300], reason=type(e).__name__)
+                return self._snapshot
+            if fingerprint == self._snapshot.store.fingerprint:
+                return self._snapshot
+            self._reloading = True
+        threading.Thread(target=self._reload, daemon=True).start()
+        return self._snapshot
+
+    def _reload(self):
+        started = time.perf_counter()
+        try:
+            # Store ka apna connection: script threads ka revision check uske reads ke peeche na ruke
+            snapshot = KnowledgeSnapshot(load_store(self.path))
+        except Exception as e:
+            METRICS.event("knowledge_reload_error", detail=str(e)[:300], reason=type(e).__name__)
+        else:
+            self._snapshot = snapshot
+            self.reloads += 1
+            METRICS.event("knowledge_reload", detail=f"revision {snapshot.revision}")
+            METRICS.observe("knowledge_reload_seconds", time.perf_counter() - started)
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def stats(self):
+        snap = self._snapshot
+        return {"revision": snap.revision, "reloads": self.reloads, **snap.store.stats(), **snap.digest.stats()}
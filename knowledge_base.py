@@ -1,5 +1,7 @@
 # TopperGPT Official Knowledge Base (V135)
 # Data extracted directly from MU NEP-2020 Question Papers (2024-2025)
+# Legacy seed: app ab data/knowledge.sqlite padhti hai. Naya paper `python knowledge_db.py add ...` se append karo;
+# yahan edit kiya toh `python knowledge_db.py import` se file dobara banao.
 
 PYQ_DATA = {
     "applied physics": """
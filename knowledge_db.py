@@ -0,0 +1,261 @@
+# TopperGPT Knowledge DB
+# PYQ corpus ab Python literals me nahi, data/knowledge.sqlite me hai. Har worker ise read-only + mmap se kholta hai:
+# pages OS page cache me saare processes ke beech shared rehte hain, kisi process ki apni copy nahi.
+# Naya paper bina redeploy ke append hota hai; har append PRAGMA user_version (revision) badhata hai aur chalti app
+# usse dekh ke hot reload karti hai (knowledge.py).
+#   python knowledge_db.py import                                  # knowledge_base.py (legacy seed) se file banao
+#   python knowledge_db.py add "applied physics" --semester 1 --session "MAY 2026" --qp 10099999 paper.txt
+#   python knowledge_db.py stats
+# paper.txt me wahi format jo knowledge_base.py me tha: "- Question text (5M) [cite: 12]" har line.
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+import uuid
+
+KB_PATH = os.environ.get(
+    "TOPPER_KB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "knowledge.sqlite")
+)
+MMAP_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS papers (
+    id INTEGER PRIMARY KEY,
+    subject TEXT NOT NULL,
+    semester INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    qp_code TEXT NOT NULL DEFAULT '',
+    added_at REAL NOT NULL,
+    UNIQUE (subject, session, qp_code)
+);
+CREATE TABLE IF NOT EXISTS questions (
+    paper_id INTEGER NOT NULL REFERENCES papers (id),
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    marks INTEGER NOT NULL,
+    cites TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (paper_id, position)
+) WITHOUT ROWID;
+-- "Search Past Papers" tab (pyq_search.py) ka full-text index; questions ke saath hi likha jaata hai
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+    text, subject, paper_id UNINDEXED, position UNINDEXED, tokenize = 'porter unicode61'
+);
+"""
+
+
+def connect(path=KB_PATH, readonly=True):
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        # Read-only mmap: page cache se seedha, heap me copy nahi
+        conn.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+        return conn
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, isolation_level=None, timeout=10)
+    # WAL nahi: read-only readers ko -shm likhne ki permission na chahiye
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.executescript(SCHEMA)
+    _ensure_fts(conn)
+    return conn
+
+
+def _ensure_fts(conn):
+    # FTS table se pehle bani file: ek baar poora index bhar do
+    if conn.execute("SELECT 1 FROM questions_fts LIMIT 1").fetchone() is None:
+        conn.execute("""
+            INSERT INTO questions_fts (text, subject, paper_id, position)
+            SELECT q.text, p.subject, q.paper_id, q.position FROM questions q JOIN papers p ON p.id = q.paper_id
+        """)
+
+
+def revision(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def kb_id(conn):
+    # Poori file dobara import hui toh naya id (revision 1 se shuru hone pe bhi cache galat na mile)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'kb_id'").fetchone()
+    return row[0] if row else ""
+
+
+def read_rows(conn, subject=None, session=None, marks=None):
+    # (subject, semester, session, qp_code, text, marks, cites) paper + position order me; filters SQL me hi
+    where, params = [], []
+    for column, value in (("p.subject", subject), ("p.session", session), ("q.marks", marks)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+    for subject, semester, session, qp_code, text, marks, cites in conn.execute(f"""
+        SELECT p.subject, p.semester, p.session, p.qp_code, q.text, q.marks, q.cites
+        FROM questions q JOIN papers p ON p.id = q.paper_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY p.id, q.position
+    """, params):
+        yield (subject, semester, session, qp_code or None, text, marks,
+               tuple(int(c) for c in cites.split(",")) if cites else ())
+
+
+def subject_counts(conn):
+    # subject -> questions, pehle paper ke order me (heap me bas itna hi corpus-wide)
+    return dict(conn.execute("""
+        SELECT p.subject, COUNT(*) FROM questions q JOIN papers p ON p.id = q.paper_id
+        GROUP BY p.subject ORDER BY MIN(p.id)
+    """).fetchall())
+
+
+def sessions(conn, subject=None):
+    if subject is None:
+        return [row[0] for row in conn.execute("SELECT DISTINCT session FROM papers")]
+    return [row[0] for row in conn.execute("SELECT DISTINCT session FROM papers WHERE subject = ?", (subject,))]
+
+
+def add_records(conn, records):
+    # records: PYQRecord list; (subject, session, qp_code) wise papers me, ek transaction, revision +1
+    papers = {}
+    for rec in records:
+        papers.setdefault((rec.subject, rec.semester, rec.session, rec.qp_code or ""), []).append(rec)
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for (subject, semester, session, qp_code), recs in papers.items():
+            row = conn.execute(
+                "SELECT id, (SELECT COALESCE(MAX(position) + 1, 0) FROM questions WHERE paper_id = papers.id) "
+                "FROM papers WHERE subject = ? AND session = ? AND qp_code = ?",
+                (subject, session, qp_code),
+            ).fetchone()
+            if row is None:
+                paper_id = conn.execute(
+                    "INSERT INTO papers (subject, semester, session, qp_code, added_at) VALUES (?, ?, ?, ?, ?)",
+                    (subject, semester, session, qp_code, now),
+                ).lastrowid
+                start = 0
+            else:
+                paper_id, start = row
+            conn.executemany(
+                "INSERT INTO questions (paper_id, position, text, marks, cites) VALUES (?, ?, ?, ?, ?)",
+                [(paper_id, start + i, r.text, r.marks, ",".join(map(str, r.cites))) for i, r in enumerate(recs)],
+            )
+            conn.executemany(
+                "INSERT INTO questions_fts (text, subject, paper_id, position) VALUES (?, ?, ?, ?)",
+                [(r.text, subject, paper_id, start + i) for i, r in enumerate(recs)],
+            )
+        conn.execute(f"PRAGMA user_version={revision(conn) + 1}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return len(records)
+
+
+def import_sources(path, sources):
+    # Nayi file tmp me banao phir atomic replace: chalti app purani file (purana inode) padhti rahegi,
+    # knowledge.py inode badalte hi naya connection kholta hai
+    from pyq_store import parse_blob
+
+    records = []
+    for semester, data in sources:
+        for subject, blob in data.items():
+            records.extend(parse_blob(subject, semester, blob))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = connect(tmp_path, readonly=False)
+    try:
+        conn.execute("INSERT INTO meta (key, value) VALUES ('kb_id', ?)", (uuid.uuid4().hex,))
+        add_records(conn, records)
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+def import_legacy(path=KB_PATH):
+    from knowledge_base import PYQ_DATA, PYQ_DATA_SEM2
+    return import_sources(path, [(1, PYQ_DATA), (2, PYQ_DATA_SEM2)])
+
+
+def ensure_kb(path=KB_PATH):
+    # Fresh checkout / naya TOPPER_KB_PATH: legacy seed se ek baar bana lo
+    if not os.path.exists(path):
+        import_legacy(path)
+    return path
+
+
+def add_paper(subject, semester, session, text, qp_code=None, path=KB_PATH):
+    from pyq_store import SESSION_RE, parse_blob
+
+    session = " ".join(session.upper().split())
+    header = f"{session} (QP: {qp_code}):" if qp_code else f"{session}:"
+    if not SESSION_RE.match(header):
+        raise ValueError(f"session should look like 'MAY 2026', got {session!r}")
+    records = parse_blob(" ".join(subject.lower().split()), semester, f"{header}\n{text}")
+    if not records:
+        raise ValueError("no '- question (xM)' lines found")
+    conn = connect(ensure_kb(path), readonly=False)
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM papers WHERE subject = ? AND session = ? AND qp_code = ?",
+            (records[0].subject, records[0].session, records[0].qp_code or ""),
+        ).fetchone()
+        if exists:
+            raise ValueError(f"{records[0].subject} {records[0].session} (QP {qp_code or '-'}) already imported")
+        add_records(conn, records)
+        return records, revision(conn)
+    finally:
+        conn.close()
+
+
+def stats(path=KB_PATH):
+    conn = connect(path)
+    try:
+        return {
+            "revision": revision(conn),
+            "subjects": conn.execute("SELECT COUNT(DISTINCT subject) FROM papers").fetchone()[0],
+            "papers": conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0],
+            "questions": conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0],
+            "bytes": os.path.getsize(path),
+        }
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Manage the TopperGPT PYQ knowledge file")
+    ap.add_argument("--path", default=KB_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("import", help="rebuild the file from knowledge_base.py")
+    add = sub.add_parser("add", help="append one question paper")
+    add.add_argument("subject")
+    add.add_argument("file", help="question lines ('- text (5M)'), '-' for stdin")
+    add.add_argument("--semester", type=int, required=True)
+    add.add_argument("--session", required=True, help="e.g. 'MAY 2026'")
+    add.add_argument("--qp", help="QP code")
+    sub.add_parser("stats")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "import":
+        print(f"Imported {import_legacy(args.path)} questions into {args.path}")
+    elif args.cmd == "add":
+        if args.file == "-":
+            text = sys.stdin.read()
+        else:
+            with open(args.file, encoding="utf-8") as f:
+                text = f.read()
+        try:
+            records, rev = add_paper(args.subject, args.semester, args.session, text, args.qp, args.path)
+        except ValueError as e:
+            ap.error(str(e))
+        print(f"Added {len(records)} questions to {records[0].subject} {records[0].session} (revision {rev})")
+    else:
+        print(stats(ensure_kb(args.path)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# TopperGPT Response Cache
+# Same subject + same evidence + same prompt version = same answer.
+# Local disk pe SQLite me rakhte hain, taaki har Streamlit session aur har worker process share kare.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import METRICS
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".topper_cache")
+CACHE_PATH = os.environ.get("TOPPER_CACHE_PATH", os.path.join(CACHE_DIR, "responses.sqlite"))
+
+
+def normalize_subject(text):
+    return " ".join(str(text).lower().split())
+
+
+def evidence_hash(evidence):
+    return hashlib.sha256(str(evidence).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    # Ek row per (kind, subject). Evidence hash ya prompt version match nahi hua toh entry stale hai:
+    # knowledge file me naya paper aaya => evidence hash badla => purana answer apne aap invalidate.
+
+    def __init__(self, path=CACHE_PATH, ttl_seconds=7 * 24 * 3600, max_entries=2000, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                kind TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                evidence_hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (kind, subject)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+
+    def get(self, kind, subject, evidence, version):
+        subject = normalize_subject(subject)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT evidence_hash, version, value, created_at FROM responses WHERE kind = ? AND subject = ?",
+                (kind, subject),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                METRICS.inc("response_cache_total", kind=kind, result="miss")
+                return None
+
+            stored_hash, stored_version, value, created_at = row
+            if stored_hash != evidence_hash(evidence) or stored_version != version or now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE kind = ? AND subject = ?", (kind, subject))
+                self.misses += 1
+                METRICS.inc("response_cache_total", kind=kind, result="stale")
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE kind = ? AND subject = ?",
+                (now, kind, subject),
+            )
+            self.hits += 1
+            METRICS.inc("response_cache_total", kind=kind, result="hit")
+            return value
+
+    def put(self, kind, subject, evidence, version, value):
+        subject = normalize_subject(subject)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, subject, evidence_hash(evidence), version, value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Size cap cross hua: least recently used entries pehle jayengi
+        for kind, subject, size in self._conn.execute(
+            "SELECT kind, subject, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE kind = ? AND subject = ?", (kind, subject))
+            count -= 1
+            total -= size
+
+    def subjects(self, kind):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT subject FROM responses WHERE kind = ?", (kind,))]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"entries": count, "bytes": total, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,287 @@
+# TopperGPT Load Test
+# APP.py ko Streamlit AppTest se headless chalata hai, fake LLM + fake Supabase ke against.
+# N students parallel: login -> predict -> topic search -> past paper search -> reconnect (session token) -> logout.
+# p50/p95/p99, rerun time, provider calls, memory/session.
+#   python loadtest.py --sessions 20 --llm-latency 1.5 --llm-error-rate 0.05
+#   python loadtest.py --sessions 50 --db-latency 0.05 --json report.json
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SUBJECTS = ["data structure", "applied physics", "applied mathematics 2", "bee", "engineering materials"]
+DEFAULT_TOPICS = ["Transformer", "PN Diode", "Virtual Memory", "Hall Effect", "Stack"]
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Recorder:
+
+    def __init__(self):
+        self.events = []
+
+    def add(self, step, seconds, error=None):
+        self.events.append((step, seconds, error[:200] if error else None))
+
+
+def summarize(events):
+    steps, failures, errors = {}, {}, {}
+    for step, seconds, error in events:
+        if error is None:
+            steps.setdefault(step, []).append(seconds)
+        else:
+            failures[step] = failures.get(step, 0) + 1
+            errors[error] = errors.get(error, 0) + 1
+    out = {}
+    for step, samples in steps.items():
+        out[step] = {
+            "count": len(samples),
+            "failures": failures.get(step, 0),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+        }
+    for step, n in failures.items():
+        out.setdefault(step, {"count": 0, "failures": n})
+    return out, errors
+
+
+def _button(at, label=None, key=None):
+    for b in at.button:
+        if (key and b.key == key) or (label and b.label == label):
+            return b
+    raise LookupError(f"button {label or key} not rendered")
+
+
+def _await_job(at, state_key, timeout):
+    # Generation background job me chalti hai: job khatam hone tak rerun karte raho (UI ka fragment bhi yahi karta hai)
+    deadline = time.monotonic() + timeout
+    while state_key in at.session_state:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{state_key} did not finish in {timeout}s")
+        time.sleep(0.05)
+        at.run()
+    return at
+
+
+def _has_error(at):
+    return any("Stability Alert" in e.value or "System Busy" in e.value for e in at.error)
+
+
+def student_session(idx, args, rec):
+    from streamlit.testing.v1 import AppTest
+
+    email = f"{idx}@loadtest.local" if idx == "warmup" else f"student{idx}@loadtest.local"
+    n = 0 if idx == "warmup" else idx
+    subject = args.subjects[n % len(args.subjects)]
+    topic = args.topics[n % len(args.topics)]
+
+    at = AppTest.from_file(os.path.join(HERE, "APP.py"), default_timeout=args.timeout)
+
+    def step(name, action):
+        started = time.perf_counter()
+        try:
+            action()
+            error = at.exception[0].message if at.exception else None
+            if error is None and _has_error(at):
+                error = at.error[0].value
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        rec.add(name, time.perf_counter() - started, error)
+        # Har run() ek poora script rerun hai
+        return error is None
+
+    def fill(key, value):
+        at.text_input(key=key).input(value)
+
+    def open_link(query_params):
+        # Naya tab / copied link: sirf URL ke query params ke saath naya session
+        again = AppTest.from_file(os.path.join(HERE, "APP.py"), default_timeout=args.timeout)
+        again.query_params.update(query_params)
+        again.run()
+        if again.exception:
+            raise RuntimeError(again.exception[0].message)
+        return again
+
+    def reconnect():
+        # Refresh / naya tab: URL ka signed token hi login hai, login form nahi aana chahiye
+        if not open_link(at.query_params).session_state["user_data"]:
+            raise AssertionError("session token did not restore the login")
+
+    def logout():
+        # Doosre tab me Logout ke baad wahi purana link (token) dobara login nahi kar sakta
+        link = dict(at.query_params)
+        _button(open_link(link), label="🔓 Logout").click().run()
+        if open_link(link).session_state["user_data"]:
+            raise AssertionError("logged-out session token still restores the login")
+
+    _ = (step("first_load", lambda: at.run())
+         and step("login", lambda: (fill("l_email_quick", email),
+                                    _button(at, label="ENTER DASHBOARD 🚀").click().run()))
+         and step("predict", lambda: (fill("subj_v2600_final", subject),
+                                      _button(at, label="⚡ GENERATE BATTLE PLAN").click().run(),
+                                      _await_job(at, "predict_job", args.timeout)))
+         and step("topic_search", lambda: (fill("search_final_absolute_v1", topic),
+                                           _button(at, key="btn_absolute_v1").click().run(),
+                                           _await_job(at, "research_job", args.timeout)))
+         and step("pyq_search", lambda: (fill("pyq_search_q", topic), at.run()))
+         and step("idle_rerun", lambda: at.run())
+         and step("reconnect", reconnect)
+         and step("logout", logout))
+    return at
+
+
+# --- WORKER PROCESS ---
+# AppTest har run() pe global Streamlit Runtime banata/todta hai, isliye ek process me parallel
+# sessions aapas me takraate hain. Har concurrent session apne worker process me chalta hai.
+_ARGS = None
+
+
+def _init_worker(args, secrets, ready):
+    global _ARGS
+    _ARGS = args
+    if args.cache_path:
+        os.environ["TOPPER_CACHE_PATH"] = args.cache_path
+    os.environ["TOPPER_JOBS_PATH"] = args.jobs_path
+    os.environ["TOPPER_TRIAL_WRITES_PATH"] = args.trial_writes_path
+
+    # AppTest.secrets global st.secrets ko har run pe swap karta hai; poore process ke liye ek hi object
+    import streamlit as st
+    from streamlit.runtime.secrets import Secrets
+    shared_secrets = Secrets()
+    shared_secrets._secrets = secrets
+    st.secrets = shared_secrets
+
+    # Warm-up: imports, cache_resource objects aur pehla compile measurement se bahar
+    warm_args = argparse.Namespace(**dict(vars(args), subjects=["warmup subject"], topics=["warmup topic"]))
+    student_session("warmup", warm_args, Recorder())
+    ready.wait()
+
+
+def _run_one(idx):
+    from startup_profiler import RERUNS
+    rec = Recorder()
+    # Worker ek waqt me ek hi session chalata hai, toh reset ke baad ke saare reruns isi session ke
+    RERUNS.reset()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    at = student_session(idx, _ARGS, rec)
+    gc.collect()
+    # AppTest (session state + element tree) abhi zinda hai: yahi ek session ka resident cost hai
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del at
+    return rec.events, retained, RERUNS.samples()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless load test for APP.py with fake backends")
+    ap.add_argument("--sessions", type=int, default=10)
+    ap.add_argument("--concurrency", type=int, default=10, help="sessions running at the same time")
+    ap.add_argument("--subjects", nargs="*", default=DEFAULT_SUBJECTS)
+    ap.add_argument("--topics", nargs="*", default=DEFAULT_TOPICS)
+    ap.add_argument("--llm-latency", type=float, default=0.5, help="seconds to stream a completion")
+    ap.add_argument("--llm-first-token", type=float, default=0.2)
+    ap.add_argument("--llm-error-rate", type=float, default=0.0)
+    ap.add_argument("--db-latency", type=float, default=0.02)
+    ap.add_argument("--db-error-rate", type=float, default=0.0)
+    ap.add_argument("--warm-cache", action="store_true", help="keep the app response cache (default: fresh temp cache)")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--json", help="also write the report to this file")
+    args = ap.parse_args(argv)
+
+    # Jobs / pending trial writes hamesha fresh: pichhle run ke fake students ke jobs reconnect pe restore
+    # na ho jayein, aur unke decrements asli app ki queue me replay na hon
+    scratch = tempfile.mkdtemp(prefix="topper-load-")
+    args.jobs_path = os.path.join(scratch, "jobs.sqlite")
+    args.trial_writes_path = os.path.join(scratch, "trial_writes.sqlite")
+    args.cache_path = None
+    if not args.warm_cache:
+        args.cache_path = os.path.join(scratch, "responses.sqlite")
+
+    from fake_llm import start_fake_llm
+    from fake_supabase import FAKE_SUPABASE_KEY, start_fake_supabase
+
+    _, llm, llm_url = start_fake_llm(latency=args.llm_latency, first_token_latency=args.llm_first_token,
+                                     error_rate=args.llm_error_rate)
+    _, db, db_url = start_fake_supabase(latency=args.db_latency, error_rate=args.db_error_rate)
+    db.seed_profile("warmup@loadtest.local", "Warmup", trials=10 * args.concurrency)
+    for i in range(args.sessions):
+        db.seed_profile(f"student{i}@loadtest.local", f"Student {i}", trials=10)
+
+    secrets = {
+        "DEEPSEEK_API_KEY": "fake", "DEEPSEEK_BASE_URL": llm_url,
+        "GROQ_API_KEY": "fake", "GROQ_BASE_URL": llm_url,
+        "SUPABASE_URL": db_url, "SUPABASE_KEY": FAKE_SUPABASE_KEY,
+        "HEDGE_DELAY_SECONDS": 2.0, "SESSION_TOKEN_SECRET": "loadtest-secret",
+    }
+
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Barrier(args.concurrency + 1)
+    with ctx.Pool(args.concurrency, initializer=_init_worker, initargs=(args, secrets, ready)) as pool:
+        ready.wait(timeout=args.timeout * 3)
+        llm.calls = 0
+        llm.errors = 0
+        db.calls.clear()
+        db.errors = 0
+
+        started = time.perf_counter()
+        results = pool.map(_run_one, range(args.sessions), chunksize=1)
+        wall = time.perf_counter() - started
+
+    from startup_profiler import RerunTimer
+    events, retained = [], []
+    reruns = RerunTimer(window=None)
+    for session_events, session_bytes, samples in results:
+        events.extend(session_events)
+        retained.append(session_bytes)
+        for seconds in samples:
+            reruns.record(seconds)
+
+    steps, errors = summarize(events)
+    report = {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "wall_seconds": round(wall, 2),
+        "steps": steps,
+        "rerun_execution": reruns.stats(),
+        "provider_calls": {"llm": llm.calls, "llm_injected_errors": llm.errors},
+        "supabase_calls": dict(db.calls, injected_errors=db.errors),
+        "errors": errors,
+        "memory_per_session_kb": round(sum(retained) / max(1, len(retained)) / 1024, 1),
+    }
+
+    print(f"{args.sessions} sessions, concurrency {args.concurrency}, wall {report['wall_seconds']}s")
+    print(f"{'step':<14}{'n':>5}{'fail':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for step_name, s in report["steps"].items():
+        print(f"{step_name:<14}{s['count']:>5}{s['failures']:>6}{s.get('p50_ms', '-'):>10}{s.get('p95_ms', '-'):>10}{s.get('p99_ms', '-'):>10}")
+    print(f"rerun execution: {report['rerun_execution']}")
+    print(f"provider calls: {report['provider_calls']}  supabase calls: {report['supabase_calls']}")
+    print(f"memory per session: {report['memory_per_session_kb']} KB")
+    for message, count in report["errors"].items():
+        print(f"error x{count}: {message}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    # AppTest worker me sys.modules["__main__"] ko APP.py se badal deta hai; pool ke pickled
+    # functions "__main__" se nahi, importable "loadtest" module se resolve hone chahiye
+    import loadtest
+    sys.exit(loadtest.main())
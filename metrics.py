@@ -0,0 +1,234 @@
+# TopperGPT Metrics
+# Hamesha ON rehne wala halka instrumentation: counters, latency histograms aur optional JSONL event log.
+# Hot path pe sirf ek lock + dict update (microseconds); file I/O background thread me hota hai.
+#   METRICS_PORT secret       => http://127.0.0.1:PORT/metrics (Prometheus text), /metrics.json
+#   METRICS_LOG_PATH secret   => har span / event ek JSON line, size pe rotate
+
+import bisect
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "topper_"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_PORT = 9108
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class JsonlSink:
+    # Events queue me, ek daemon thread file me likhta hai; max_bytes cross hua toh path.1, path.2 ... rotate
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=10000)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def put(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            # Disk slow hai toh events chhodo, request ko kabhi mat roko
+            self.dropped += 1
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _write_loop(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+                    # Jo aur pada hai wo bhi isi open file me
+                    while True:
+                        try:
+                            f.write(json.dumps(self._queue.get_nowait(), default=str) + "\n")
+                        except queue.Empty:
+                            break
+            except OSError:
+                self.dropped += 1
+
+
+class Metrics:
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.sink = None
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = {}
+
+    # --- RECORDING (hot path) ---
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            hist[0][idx] += 1
+            hist[1] += seconds
+            hist[2] += 1
+        if self.sink is not None:
+            self.sink.put({"ts": time.time(), "span": name, "ms": round(seconds * 1000, 3), **labels})
+
+    @contextmanager
+    def span(self, name, **labels):
+        # Block ka time histogram me; exception aaya toh outcome = exception class
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, outcome=outcome, **labels)
+
+    def event(self, name, detail=None, **labels):
+        # Labels counter me jaate hain (kam cardinality); detail (error message waghera) sirf JSONL me.
+        # Pehla arg "name" hai taaki job_error jaisa event kind=... label de sake
+        self.inc(f"{name}_total", **labels)
+        if self.sink is not None:
+            self.sink.put({"ts": time.time(), "event": name, "detail": detail, **labels})
+
+    # --- EXPORT ---
+    def register(self, name, collector):
+        # collector() -> dict; numbers gauges bante hain, nested dict ke keys label "key" me
+        with self._lock:
+            self._collectors[name] = collector
+
+    def log_to(self, path, **sink_kwargs):
+        if self.sink is None or self.sink.path != path:
+            self.sink = JsonlSink(path, **sink_kwargs)
+        return self.sink
+
+    def _gauges(self):
+        with self._lock:
+            collectors = list(self._collectors.items())
+        gauges = []
+        for prefix, collector in collectors:
+            try:
+                stats = collector()
+            except Exception as e:
+                gauges.append((f"{prefix}_collector_errors", (("error", type(e).__name__),), 1))
+                continue
+            for field, value in stats.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    gauges.append((f"{prefix}_{field}", (), value))
+                elif isinstance(value, dict):
+                    for sub, v in value.items():
+                        if isinstance(v, (int, float)) and not isinstance(v, bool):
+                            gauges.append((f"{prefix}_{field}", (("key", sub),), v))
+        return gauges
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: (list(h[0]), h[1], h[2]) for k, h in self._histograms.items()}
+        return {
+            "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in counters.items()],
+            "histograms": [
+                {"name": n, "labels": dict(l), "count": c, "sum": round(s, 6),
+                 "buckets": dict(zip([*map(str, self.buckets), "+Inf"], b))}
+                for (n, l), (b, s, c) in histograms.items()
+            ],
+            "gauges": [{"name": n, "labels": dict(l), "value": v} for n, l, v in self._gauges()],
+            "dropped_events": self.sink.dropped if self.sink else 0,
+        }
+
+    def render_prometheus(self):
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((k, (list(h[0]), h[1], h[2])) for k, h in self._histograms.items())
+        lines = []
+        typed = set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            full = PREFIX + name
+            declare(full, "counter")
+            lines.append(f"{full}{_label_text(labels)} {value}")
+        for (name, labels), (buckets, total, count) in histograms:
+            full = PREFIX + name
+            declare(full, "histogram")
+            running = 0
+            for bound, n in zip([*self.buckets, "+Inf"], buckets):
+                running += n
+                lines.append(f"{full}_bucket{_label_text(labels + (('le', bound),))} {running}")
+            lines.append(f"{full}_sum{_label_text(labels)} {total}")
+            lines.append(f"{full}_count{_label_text(labels)} {count}")
+        for name, labels, value in self._gauges():
+            full = PREFIX + name
+            declare(full, "gauge")
+            lines.append(f"{full}{_label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def start_metrics_server(metrics=METRICS, port=DEFAULT_PORT, host="127.0.0.1"):
+    # Streamlit custom routes nahi deta, isliye alag chhota HTTP server (daemon thread)
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, ctype = json.dumps(metrics.snapshot()).encode(), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, ctype = metrics.render_prometheus().encode(), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,159 @@
+# TopperGPT Output Parser
+# Completion ko ek hi pass me typed structure me todta hai: sections -> items (question text, marks).
+# Result content hash pe memoised hai, toh har widget click / rerun pe dobara split-replace nahi hota.
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from metrics import METRICS
+
+# "Most Repeated PYQs" model nahi likhta, pyq_analytics knowledge base se banata hai
+PREDICT_MARKERS = ("START_SURESHOT", "START_JUGAAD", "START_PLAN")
+PREDICT_END_TOKENS = ("END_SURESHOT", "END_JUGAAD", "END_PLAN")
+RESEARCH_MARKERS = ("[1_DEF]", "[2_BRK]", "[3_WRK]")
+
+MARKS_RE = re.compile(r"marks\s*:?\s*\[?\s*(\d{1,2})\s*\]?\s*m\b|\((\d{1,2})\s*m\)", re.IGNORECASE)
+# "| Confidence: 92% | Marks: 5M" wala tail; question ke text se hata dete hain
+META_RE = re.compile(
+    r"\|?\s*(?:confidence\s*:?\s*\[?\s*\d{1,3}\s*\]?\s*%|marks\s*:?\s*\[?\s*\d{1,2}\s*\]?\s*m\b)", re.IGNORECASE
+)
+BULLET_RE = re.compile(r"^(?:\d{1,2}[.)]|q\d{1,2}[.:)]?|[-*•])\s*", re.IGNORECASE)
+
+MEMO_SIZE = 256
+
+
+class Item:
+    # Ek question / topic line; marks sirf tab jab model ne diye
+    __slots__ = ("text", "marks")
+
+    def __init__(self, text, marks=None):
+        self.text = text
+        self.marks = marks
+
+
+class Section:
+    __slots__ = ("marker", "text", "items")
+
+    def __init__(self, marker, text, items):
+        self.marker = marker
+        self.text = text
+        self.items = items
+
+
+class ParsedOutput:
+
+    __slots__ = ("digest", "sections")
+
+    def __init__(self, digest, sections):
+        self.digest = digest
+        self.sections = sections
+
+    def has(self, marker):
+        return marker in self.sections
+
+    def section(self, marker, default=""):
+        sec = self.sections.get(marker)
+        return sec.text if sec is not None else default
+
+    def items(self, marker):
+        sec = self.sections.get(marker)
+        return sec.items if sec is not None else []
+
+
+def _parse_item(text):
+    marks = MARKS_RE.search(text)
+    clean = " ".join(META_RE.sub("", text).split()).strip(" |")
+    return Item(clean, int(marks.group(1) or marks.group(2)) if marks else None)
+
+
+def _split_items(text):
+    # Numbered / bulleted line naya item shuru karta hai; baaki lines pichhle item ka continuation
+    items = []
+    current = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        bullet = BULLET_RE.match(line)
+        if bullet or current is None:
+            if current is not None:
+                items.append(current)
+            current = line[bullet.end():] if bullet else line
+        else:
+            current += " " + line
+    if current is not None:
+        items.append(current)
+    return [_parse_item(t) for t in items]
+
+
+def _token_pattern(markers, end_tokens):
+    # Lambe tokens pehle taaki koi marker doosre ka prefix ho toh bhi sahi match ho
+    tokens = sorted(set(markers) | set(end_tokens), key=len, reverse=True)
+    return re.compile("|".join(re.escape(t) for t in tokens))
+
+
+class OutputParser:
+
+    def __init__(self, memo_size=MEMO_SIZE):
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._patterns = {}
+        self._lock = threading.Lock()
+
+    def parse(self, text, markers, end_tokens=()):
+        text = text or ""
+        markers, end_tokens = tuple(markers), tuple(end_tokens)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        key = (digest, markers, end_tokens)
+        with self._lock:
+            parsed = self._memo.get(key)
+            if parsed is not None:
+                self._memo.move_to_end(key)
+                METRICS.inc("output_parse_total", result="hit")
+                return parsed
+            pattern = self._patterns.get((markers, end_tokens))
+            if pattern is None:
+                pattern = self._patterns[(markers, end_tokens)] = _token_pattern(markers, end_tokens)
+
+        METRICS.inc("output_parse_total", result="miss")
+        parsed = ParsedOutput(digest, self._sections(text, pattern, set(markers)))
+        with self._lock:
+            self._memo[key] = parsed
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return parsed
+
+    @staticmethod
+    def _sections(text, pattern, markers):
+        # Ek hi scan: START ke baad ka text us section ka, END (ya agla START) pe band
+        chunks = {}
+        current, pos = None, 0
+        for m in pattern.finditer(text):
+            if current is not None:
+                chunks[current].append(text[pos:m.start()])
+            token = m.group(0)
+            current = token if token in markers else None
+            if current is not None:
+                chunks.setdefault(current, [])
+            pos = m.end()
+        if current is not None:
+            chunks[current].append(text[pos:])
+
+        sections = {}
+        for marker, parts in chunks.items():
+            body = "".join(parts).strip()
+            sections[marker] = Section(marker, body, _split_items(body))
+        return sections
+
+
+PARSER = OutputParser()
+
+
+def parse_prediction(text):
+    return PARSER.parse(text, PREDICT_MARKERS, PREDICT_END_TOKENS)
+
+
+def parse_research(text):
+    return PARSER.parse(text, RESEARCH_MARKERS)
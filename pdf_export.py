@@ -0,0 +1,162 @@
+# TopperGPT PDF Export
+# Students expanders ka screenshot le rahe the. Battle plan / research report ka PDF job pool ke worker pe banta hai
+# (script run block nahi hota), aur content hash pe disk cache hota hai: popular subject ka plan ek baar render,
+# phir har student ko wahi file. Layout / sanitizer badlo toh EXPORT_VERSION bump karo.
+
+import hashlib
+import os
+import re
+import threading
+
+from llm_cache import CACHE_DIR
+from metrics import METRICS
+
+EXPORT_VERSION = 2
+EXPORT_DIR = os.environ.get("TOPPER_PDF_DIR", os.path.join(CACHE_DIR, "pdf"))
+
+# fpdf ke core fonts sirf latin-1; baaki sab (emoji, devanagari) hata dete hain
+UNICODE_FIXES = {
+    "–": "-", "—": "-", "‘": "'", "’": "'", "“": '"', "”": '"', "•": "-",
+    "…": "...", "→": "->", "←": "<-", "⇒": "=>", "≤": "<=", "≥": ">=", "≠": "!=",
+    "≈": "~", "∞": "inf", "−": "-",
+}
+# Maths ko latin-1 me likhne layak banao, warna "x⁴" -> "x" aur "dθ" -> "d" ho jaata tha
+MATH_FIXES = {
+    "∫": "integral", "∬": "double integral", "∮": "contour integral", "∑": "sum", "∏": "product",
+    "√": "sqrt", "∂": "d", "∇": "nabla", "∆": "Delta", "∈": " in ", "∝": " prop to ", "≡": "==",
+}
+GREEK = [
+    "alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "iota", "kappa", "lambda", "mu",
+    "nu", "xi", "omicron", "pi", "rho", "sigma", "tau", "upsilon", "phi", "chi", "psi", "omega",
+]
+# Capital sigma ke baad U+03A2 khaali hai; final sigma (ς) bhi sigma hi
+GREEK_FIXES = {chr(0x3B1 + i + (i > 16)): name for i, name in enumerate(GREEK)}
+GREEK_FIXES.update({chr(0x391 + i + (i > 16)): name.capitalize() for i, name in enumerate(GREEK)})
+GREEK_FIXES.update({"ς": "sigma", "ϕ": "phi", "ϑ": "theta", "ϵ": "epsilon"})
+SUPERSCRIPTS = str.maketrans("⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻⁼⁽⁾ⁿⁱ", "0123456789+-=()ni")
+SUBSCRIPTS = str.maketrans("₀₁₂₃₄₅₆₇₈₉₊₋₌₍₎ₐₑₒₓₙᵢⱼₖₘₚₜ", "0123456789+-=()aeoxnijkmpt")
+SUPERSCRIPT_RE = re.compile("[⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻⁼⁽⁾ⁿⁱ]+")
+SUBSCRIPT_RE = re.compile("[₀₁₂₃₄₅₆₇₈₉₊₋₌₍₎ₐₑₒₓₙᵢⱼₖₘₚₜ]+")
+MARKDOWN_RE = re.compile(r"\*\*|__|^#+\s*", re.MULTILINE)
+
+
+def export_key(kind, title, subtitle, sections):
+    h = hashlib.sha256(f"{EXPORT_VERSION}|{kind}|{title}|{subtitle}".encode("utf-8"))
+    for heading, text, color in sections:
+        h.update(f"\x00{heading}\x00{text}\x00{color}".encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def pdf_text(text):
+    text = MARKDOWN_RE.sub("", str(text or ""))
+    for bad, good in UNICODE_FIXES.items():
+        text = text.replace(bad, good)
+    text = SUPERSCRIPT_RE.sub(lambda m: "^" + _group(m.group().translate(SUPERSCRIPTS)), text)
+    text = SUBSCRIPT_RE.sub(lambda m: "_" + _group(m.group().translate(SUBSCRIPTS)), text)
+    for bad, good in MATH_FIXES.items():
+        text = text.replace(bad, good)
+    text = "".join(GREEK_FIXES.get(ch, ch) for ch in text)
+    return text.encode("latin-1", "ignore").decode("latin-1").strip()
+
+
+def _group(power):
+    # x^10 theek hai, par x^n+1 ka matlab badal jaata hai: multi-char exponent bracket me
+    return power if power.isalnum() else f"({power})"
+
+
+def _rgb(color):
+    color = color.lstrip("#")
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def render_pdf(title, subtitle, sections):
+    from fpdf import FPDF  # sirf pehle export pe chahiye
+
+    pdf = FPDF(format="A4")
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 18)
+    pdf.set_text_color(76, 175, 80)
+    pdf.multi_cell(0, 9, pdf_text(title))
+    pdf.set_font("Helvetica", "", 10)
+    pdf.set_text_color(120, 120, 120)
+    pdf.multi_cell(0, 6, pdf_text(subtitle))
+    pdf.ln(4)
+    for heading, text, color in sections:
+        r, g, b = _rgb(color)
+        pdf.set_font("Helvetica", "B", 13)
+        pdf.set_text_color(r, g, b)
+        pdf.multi_cell(0, 8, pdf_text(heading))
+        pdf.set_draw_color(r, g, b)
+        pdf.line(pdf.l_margin, pdf.get_y(), pdf.w - pdf.r_margin, pdf.get_y())
+        pdf.ln(2)
+        pdf.set_font("Helvetica", "", 11)
+        pdf.set_text_color(30, 30, 30)
+        pdf.multi_cell(0, 6, pdf_text(text) or "-")
+        pdf.ln(5)
+    data = pdf.output(dest="S")
+    # fpdf 1.x latin-1 str deta hai, fpdf2 bytearray
+    return data.encode("latin-1") if isinstance(data, str) else bytes(data)
+
+
+class PDFExporter:
+
+    def __init__(self, path=EXPORT_DIR, max_files=500):
+        self.path = path
+        self.max_files = max_files
+        self.hits = 0
+        self.renders = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.pdf")
+
+    def peek(self, key):
+        # Download button ke liye; stats me nahi ginta (har rerun pe chalta hai)
+        try:
+            with open(self._file(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def lookup(self, key, kind):
+        data = self.peek(key)
+        if data is not None:
+            with self._lock:
+                self.hits += 1
+            METRICS.inc("pdf_export_total", kind=kind, result="hit")
+        return data
+
+    def export(self, key, kind, title, subtitle, sections):
+        # Job pool worker pe: cache me hai toh wahi, warna render karke atomic write
+        if self.lookup(key, kind) is not None:
+            return key
+        with METRICS.span("pdf_render_seconds", kind=kind):
+            data = render_pdf(title, subtitle, sections)
+        tmp_path = f"{self._file(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._file(key))
+        with self._lock:
+            self.renders += 1
+        METRICS.inc("pdf_export_total", kind=kind, result="render")
+        with self._lock:
+            self._prune()
+        return key
+
+    def _prune(self):
+        # Sabse purane (mtime) files hatao; naya render hamesha bachta hai
+        files = [os.path.join(self.path, name) for name in os.listdir(self.path) if name.endswith(".pdf")]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda p: os.stat(p).st_mtime)
+        for path in files[:len(files) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        files = [name for name in os.listdir(self.path) if name.endswith(".pdf")]
+        return {"files": len(files), "hits": self.hits, "renders": self.renders}
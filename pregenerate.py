@@ -0,0 +1,200 @@
+# TopperGPT Offline Pre-generation
+# Exam season se pehle har subject ka battle plan + common topic reports generate karke response cache garam karo.
+#   python pregenerate.py                      # sab subjects + default topics
+#   python pregenerate.py --dry-run            # local fake LLM server ke against, koi API key nahi
+#   python pregenerate.py --subjects "data structure" --no-topics
+# Beech me band ho gaya? Dobara chalao: jo cache me already hai wo skip ho jata hai (--force se regenerate).
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from prompts import PREDICT_PROMPT_VERSION, RESEARCH_PROMPT_VERSION, build_predict_prompt, build_research_prompt
+from llm_cache import ResponseCache
+from evidence_ranker import DEFAULT_TOKEN_BUDGET, EvidenceRanker
+from pyq_store import STORE
+from topic_cache import topic_key, topic_version
+
+# tab7 me sabse zyada search hone wale topics
+COMMON_TOPICS = [
+    "Transformer", "PN Diode", "Virtual Memory", "LASER", "Optical Fiber", "Newton's Rings",
+    "Fermi Level", "Hall Effect", "Stack", "Queue", "Linked List", "Binary Search Tree",
+    "Huffman Coding", "Induction Motor", "DC Motor", "Maximum Power Transfer Theorem",
+    "Norton's Theorem", "BJT", "MOSFET", "JFET", "Corrosion", "Green Chemistry",
+    "Runge-Kutta Method", "Euler's Method", "Beta and Gamma Functions", "OSI Model",
+    "Amplitude Modulation", "Frequency Modulation", "Four Stroke Engine", "Refrigeration Cycle",
+]
+
+PROVIDERS = {
+    "deepseek": {"model": "deepseek-chat", "base_url": "https://api.deepseek.com", "key": "DEEPSEEK_API_KEY"},
+    "groq": {"model": "llama-3.3-70b-versatile", "base_url": None, "key": "GROQ_API_KEY"},
+}
+
+
+def load_secrets():
+    # Streamlit wali secrets.toml padho, env vars override karte hain
+    secrets = {}
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml")
+    if os.path.exists(path):
+        import tomllib
+        with open(path, "rb") as f:
+            secrets.update(tomllib.load(f))
+    for cfg in PROVIDERS.values():
+        if os.environ.get(cfg["key"]):
+            secrets[cfg["key"]] = os.environ[cfg["key"]]
+    return secrets
+
+
+def build_jobs(subjects, topics, ranker, evidence_budget):
+    jobs = []
+    for subject in subjects:
+        evidence = ranker.build_evidence(subject, evidence_budget, fallback="MU Engineering Standard Pattern.")
+        jobs.append({
+            "kind": "predict", "subject": subject, "evidence": evidence, "version": PREDICT_PROMPT_VERSION,
+            "prompt": build_predict_prompt(subject, evidence), "order": ["deepseek", "groq"],
+        })
+    for topic in topics:
+        jobs.append({
+            # APP ka TopicCache canonical key se dhoondta hai
+            "kind": "research", "subject": topic_key(topic), "evidence": "", "version": topic_version(RESEARCH_PROMPT_VERSION),
+            "prompt": build_research_prompt(topic), "order": ["groq", "deepseek"],
+        })
+    return jobs
+
+
+class Pregenerator:
+
+    def __init__(self, clients, cache, concurrency, retries=3, backoff=1.0, timeout=60.0):
+        self.clients = clients
+        self.cache = cache
+        self.limits = {name: asyncio.Semaphore(concurrency.get(name, 2)) for name in clients}
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+
+    async def run_job(self, job):
+        order = [p for p in job["order"] if p in self.clients]
+        last_error = None
+        for attempt in range(self.retries):
+            provider = order[attempt % len(order)]
+            try:
+                async with self.limits[provider]:
+                    started = time.perf_counter()
+                    res = await self.clients[provider].chat.completions.create(
+                        model=PROVIDERS[provider]["model"],
+                        messages=[{"role": "user", "content": job["prompt"]}],
+                        timeout=self.timeout,
+                    )
+                text = res.choices[0].message.content.strip()
+                if not text:
+                    raise RuntimeError("empty completion")
+                self.cache.put(job["kind"], job["subject"], job["evidence"], job["version"], text)
+                return provider, time.perf_counter() - started
+            except Exception as e:
+                last_error = e
+                if attempt + 1 < self.retries:
+                    await asyncio.sleep(self.backoff * (2 ** attempt))
+        raise last_error
+
+    async def run(self, jobs, force=False, list_only=False):
+        total = len(jobs)
+        pending = []
+        for job in jobs:
+            if not force and self.cache.get(job["kind"], job["subject"], job["evidence"], job["version"]) is not None:
+                self.skipped += 1
+            else:
+                pending.append(job)
+        print(f"{total} jobs: {self.skipped} already cached, {len(pending)} to generate")
+        if list_only:
+            for job in pending:
+                print(f"  would generate {job['kind']}: {job['subject']}")
+            return
+
+        async def worker(job):
+            label = f"{job['kind']}: {job['subject']}"
+            try:
+                provider, seconds = await self.run_job(job)
+                self.done += 1
+                print(f"[{self.done + self.failed}/{len(pending)}] OK   {label} ({provider}, {seconds:.1f}s)")
+            except Exception as e:
+                self.failed += 1
+                print(f"[{self.done + self.failed}/{len(pending)}] FAIL {label}: {e}")
+
+        await asyncio.gather(*(worker(job) for job in pending))
+        print(f"Finished: {self.done} generated, {self.skipped} skipped, {self.failed} failed")
+
+
+def make_clients(secrets, base_url_override=None):
+    from groq import AsyncGroq
+    clients = {}
+    for name, cfg in PROVIDERS.items():
+        api_key = "fake-key" if base_url_override else secrets.get(cfg["key"])
+        if not api_key:
+            print(f"Skipping {name}: {cfg['key']} not set")
+            continue
+        base_url = base_url_override or cfg["base_url"]
+        clients[name] = AsyncGroq(api_key=api_key, base_url=base_url) if base_url else AsyncGroq(api_key=api_key)
+    return clients
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Warm the TopperGPT response cache before exam season")
+    ap.add_argument("--subjects", nargs="*", help="subset of knowledge file subjects (default: all)")
+    ap.add_argument("--topics-file", help="one tab7 topic per line (default: built-in COMMON_TOPICS)")
+    ap.add_argument("--no-topics", action="store_true", help="only battle plans, skip topic reports")
+    ap.add_argument("--concurrency", type=int, default=3, help="max in-flight requests per provider")
+    ap.add_argument("--retries", type=int, default=3)
+    ap.add_argument("--evidence-budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+                    help="must match EVIDENCE_TOKEN_BUDGET used by the app")
+    ap.add_argument("--force", action="store_true", help="regenerate even if cached")
+    ap.add_argument("--list", action="store_true", help="only print what would be generated")
+    ap.add_argument("--dry-run", action="store_true", help="use a local fake LLM server and a throwaway cache")
+    ap.add_argument("--fake-url", help="point both providers at an already running fake_llm.py server")
+    ap.add_argument("--cache-path", help="response cache file (default: app cache)")
+    args = ap.parse_args(argv)
+
+    subjects = args.subjects or STORE.subjects()
+    unknown = [s for s in subjects if s not in STORE]
+    if unknown:
+        ap.error(f"unknown subjects: {', '.join(unknown)}")
+    topics = []
+    if not args.no_topics:
+        if args.topics_file:
+            with open(args.topics_file, encoding="utf-8") as f:
+                topics = [line.strip() for line in f if line.strip()]
+        else:
+            topics = COMMON_TOPICS
+
+    base_url = args.fake_url
+    cache_path = args.cache_path
+    if args.dry_run and not base_url:
+        from fake_llm import start_fake_llm
+        _, _, base_url = start_fake_llm(latency=0.05)
+        print(f"Dry run: fake LLM at {base_url}")
+    if args.dry_run and not cache_path:
+        cache_path = ":memory:"
+
+    cache = ResponseCache(cache_path) if cache_path else ResponseCache()
+    clients = make_clients(load_secrets(), base_url)
+    if not clients:
+        print("No provider credentials found. Set DEEPSEEK_API_KEY / GROQ_API_KEY or use --dry-run.")
+        return 1
+
+    jobs = build_jobs(subjects, topics, EvidenceRanker(), args.evidence_budget)
+    gen = Pregenerator(clients, cache, {name: args.concurrency for name in clients}, retries=args.retries,
+                       backoff=0.05 if base_url else 1.0)
+    try:
+        asyncio.run(gen.run(jobs, force=args.force, list_only=args.list))
+    except KeyboardInterrupt:
+        print(f"Interrupted after {gen.done} jobs; rerun to resume from the cache.")
+        return 130
+    return 1 if gen.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+# TopperGPT Profile Service
+# Supabase profiles ke liye: sirf zaroori columns, per-process TTL cache, aur trial deduction
+# ek atomic RPC (sql/decrement_trial.sql) se jo background thread me chalta hai (write-behind).
+# Session token se aaye users ka status bhi background me refresh (ek worker, same email ek hi baar queue me).
+# session_gen (sql/session_gen.sql) logout pe badhta hai; purane session tokens isi se revoke hote hain.
+# Pending decrements SQLite me bhi likhe jaate hain: restart pe replay, aur fail hua write thread ko rokta nahi
+# (retry heap me backoff ke saath, deadline tak). Jab tak decrement pending hai, DB refresh local count ko
+# wapas nahi badhata.
+
+import heapq
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from llm_cache import CACHE_DIR
+from metrics import METRICS
+
+TRIAL_WRITES_PATH = os.environ.get("TOPPER_TRIAL_WRITES_PATH", os.path.join(CACHE_DIR, "trial_writes.sqlite"))
+
+PROFILE_COLUMNS = "email,full_name,free_trials_left,is_pro,session_gen"
+# sql/session_gen.sql abhi nahi chala (column hi nahi): login chalta rahe, bas token revocation band
+LEGACY_COLUMNS = "email,full_name,free_trials_left,is_pro"
+UNDEFINED_COLUMN = "42703"
+DEFAULT_TRIALS = 10
+# PostgREST: function hai hi nahi (PGRST202) / 404. Sirf tab absolute update fallback
+RPC_MISSING_CODES = {"PGRST202", "404"}
+# Grant / key galat: retry se kuch nahi badlega, row disk pe rehti hai aur fix ke baad restart pe replay
+PERMISSION_CODES = {"42501", "401", "403"}
+
+
+def rpc_missing(error):
+    return str(getattr(error, "code", "")) in RPC_MISSING_CODES
+
+
+def permission_denied(error):
+    return str(getattr(error, "code", "")) in PERMISSION_CODES
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class ProfileService:
+
+    def __init__(self, supabase, ttl_seconds=30.0, write_backoff=0.5, max_write_backoff=300.0,
+                 write_deadline=24 * 3600, path=TRIAL_WRITES_PATH):
+        self.supabase = supabase
+        self.ttl_seconds = ttl_seconds
+        self.columns = PROFILE_COLUMNS
+        self.write_backoff = write_backoff
+        self.max_write_backoff = max_write_backoff
+        self.write_deadline = write_deadline
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._writes = queue.Queue()
+        self._retries = []
+        self._pending = {}
+        self._refreshes = queue.Queue()
+        self._refreshing = set()
+        self.hits = 0
+        self.misses = 0
+        self.write_errors = 0
+        self.fatal_writes = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS trial_writes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT NOT NULL,
+                local_val INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                owner INTEGER NOT NULL
+            )
+        """)
+        # Band ho chuke process ke adhure decrements apne naam karo (same CACHE_DIR pe chalti doosri
+        # process ke rows uske paas hi rahein, warna double decrement)
+        pid = os.getpid()
+        rows = self._conn.execute("SELECT id, email, local_val, created_at, owner FROM trial_writes ORDER BY id").fetchall()
+        for rid, email, local_val, created_at, owner in rows:
+            if owner != pid and _alive(owner):
+                continue
+            self._conn.execute("UPDATE trial_writes SET owner = ? WHERE id = ?", (pid, rid))
+            self._pending[email] = self._pending.get(email, 0) + 1
+            self._writes.put((rid, email, local_val, created_at, 0))
+        threading.Thread(target=self._write_loop, daemon=True).start()
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+
+    # --- READS ---
+    def get(self, email, fresh=False):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(email)
+            if entry and not fresh and now - entry[0] < self.ttl_seconds:
+                self.hits += 1
+                METRICS.inc("profile_cache_total", result="hit")
+                return dict(entry[1])
+            self.misses += 1
+        METRICS.inc("profile_cache_total", result="miss")
+
+        res = self._select(email)
+        profile = res.data[0] if res.data else None
+        return self._remember(email, profile) if profile is not None else None
+
+    def _select(self, email):
+        try:
+            with METRICS.span("supabase_seconds", op="select"):
+                return self.supabase.table("profiles").select(self.columns).eq("email", email).limit(1).execute()
+        except Exception as e:
+            if str(getattr(e, "code", "")) != UNDEFINED_COLUMN or self.columns == LEGACY_COLUMNS:
+                raise
+            METRICS.event("profile_columns_fallback", detail=str(e)[:300])
+            self.columns = LEGACY_COLUMNS
+        with METRICS.span("supabase_seconds", op="select"):
+            return self.supabase.table("profiles").select(self.columns).eq("email", email).limit(1).execute()
+
+    def peek(self, email):
+        # Sirf cache se (TTL ke andar); DB kabhi nahi
+        with self._lock:
+            entry = self._cache.get(email)
+            if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+                return dict(entry[1])
+        return None
+
+    def refresh_async(self, email):
+        # Token se restore hua session: pro / trials DB se background me, session agle rerun pe peek karega.
+        # Cache abhi fresh hai toh DB ki zaroorat hi nahi
+        with self._lock:
+            entry = self._cache.get(email)
+            if email in self._refreshing or (entry and time.monotonic() - entry[0] < self.ttl_seconds):
+                return
+            self._refreshing.add(email)
+        self._refreshes.put(email)
+
+    def create(self, email, full_name, trials=DEFAULT_TRIALS):
+        new_u = {"email": email, "full_name": full_name, "free_trials_left": trials, "is_pro": False}
+        with METRICS.span("supabase_seconds", op="insert"):
+            ins = self.supabase.table("profiles").insert(new_u).execute()
+        if not ins.data:
+            return None
+        return self._remember(email, {k: ins.data[0].get(k) for k in self.columns.split(",")})
+
+    def invalidate(self, email):
+        with self._lock:
+            self._cache.pop(email, None)
+
+    def revoke_sessions(self, email):
+        # Logout: session_gen +1 (atomic RPC), is email ke saare purane session tokens refresh pe reject.
+        # Naya generation ya None (RPC / column nahi, ya DB error)
+        try:
+            with METRICS.span("supabase_seconds", op="rpc_bump_session_gen"):
+                res = self.supabase.rpc("bump_session_gen", {"p_email": email}).execute()
+        except Exception as e:
+            METRICS.event("session_revoke_error", detail=str(e)[:300], reason=type(e).__name__)
+            return None
+        gen = res.data if isinstance(res.data, int) else None
+        with self._lock:
+            entry = self._cache.get(email)
+            if entry is not None and gen is not None:
+                entry[1]["session_gen"] = gen
+        return gen
+
+    # --- TRIAL DEDUCTION ---
+    def deduct_trial(self, email, current=None):
+        # Local count turant ghatao (UI ke liye), DB me atomic decrement background me
+        with self._lock:
+            entry = self._cache.get(email)
+            if entry is not None:
+                current = entry[1].get("free_trials_left", DEFAULT_TRIALS)
+            new_val = max(0, (DEFAULT_TRIALS if current is None else current) - 1)
+            if entry is not None:
+                entry[1]["free_trials_left"] = new_val
+            self._pending[email] = self._pending.get(email, 0) + 1
+            created_at = time.time()
+            rid = self._conn.execute(
+                "INSERT INTO trial_writes (email, local_val, created_at, owner) VALUES (?, ?, ?, ?)",
+                (email, new_val, created_at, os.getpid())).lastrowid
+        METRICS.inc("trial_deductions_total")
+        self._writes.put((rid, email, new_val, created_at, 0))
+        return new_val
+
+    def flush(self, timeout=5.0):
+        # Pending writes khatam hone tak ruko (shutdown / tests)
+        deadline = time.monotonic() + timeout
+        while self._writes.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self._writes.unfinished_tasks == 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cached_profiles": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "pending_writes": self._writes.unfinished_tasks,
+                "retrying_writes": len(self._retries),
+                "pending_refreshes": len(self._refreshing),
+                "write_errors": self.write_errors,
+                "fatal_writes": self.fatal_writes,
+            }
+
+    def _remember(self, email, profile):
+        profile = dict(profile)
+        with self._lock:
+            # DB ko abhi humare decrements nahi mile: refresh se free trials wapas na aa jaayein
+            pending = self._pending.get(email, 0)
+            if pending and isinstance(profile.get("free_trials_left"), int):
+                profile["free_trials_left"] = max(0, profile["free_trials_left"] - pending)
+            self._cache[email] = (time.monotonic(), profile)
+        return dict(profile)
+
+    def _next_write(self):
+        # Retry heap ka due item pehle, warna queue pe (agle due retry tak) ruko
+        while True:
+            with self._lock:
+                wait = self._retries[0][0] - time.monotonic() if self._retries else None
+                if wait is not None and wait <= 0:
+                    return heapq.heappop(self._retries)[2]
+            try:
+                return self._writes.get(timeout=wait)
+            except queue.Empty:
+                pass
+
+    def _write_loop(self):
+        seq = 0
+        while True:
+            rid, email, local_val, created_at, attempt = self._next_write()
+            try:
+                server_val = self._decrement(email, local_val)
+            except Exception as e:
+                detail, reason = str(e)[:300], type(e).__name__
+                if permission_denied(e):
+                    # Retry bekaar; row disk pe aur pending count bana rehta hai taaki trials wapas na milein
+                    with self._lock:
+                        self.write_errors += 1
+                        self.fatal_writes += 1
+                    METRICS.inc("trial_write_fatal_total")
+                    METRICS.event("trial_write_fatal", detail=detail, reason=reason)
+                    self._writes.task_done()
+                    continue
+                if time.time() - created_at < self.write_deadline:
+                    # Timeout / 5xx pe absolute update nahi (read-modify-write race wapas aata): RPC hi dobara,
+                    # backoff ke saath, par thread doosre users ke decrements chalata rehta hai
+                    METRICS.event("trial_rpc_retry", detail=detail, reason=reason, attempt=attempt + 1)
+                    seq += 1
+                    due = time.monotonic() + min(self.max_write_backoff, self.write_backoff * 2 ** attempt)
+                    with self._lock:
+                        heapq.heappush(self._retries, (due, seq, (rid, email, local_val, created_at, attempt + 1)))
+                    continue
+                with self._lock:
+                    self.write_errors += 1
+                METRICS.event("trial_write_error", detail=detail, reason=reason, attempt=attempt + 1)
+                server_val = None
+            with self._lock:
+                self._conn.execute("DELETE FROM trial_writes WHERE id = ?", (rid,))
+                self._pending[email] -= 1
+                # Aur deductions queue me hain toh local value hi aage ki hai, server wali purani
+                if self._pending[email] == 0:
+                    del self._pending[email]
+                    entry = self._cache.get(email)
+                    if entry is not None and server_val is not None:
+                        entry[1]["free_trials_left"] = server_val
+            self._writes.task_done()
+
+    def _decrement(self, email, local_val):
+        # Server ki nayi value (ya None); transient error raise hota hai, retry _write_loop decide karta hai
+        try:
+            with METRICS.span("supabase_seconds", op="rpc_decrement_trial"):
+                res = self.supabase.rpc("decrement_trial", {"p_email": email}).execute()
+            return res.data if isinstance(res.data, int) else None
+        except Exception as e:
+            if not rpc_missing(e):
+                raise
+            # RPC abhi deploy nahi hua: purana plain update, taaki app chalti rahe
+            METRICS.event("trial_rpc_fallback", detail=str(e)[:300], reason=type(e).__name__)
+        with METRICS.span("supabase_seconds", op="update"):
+            self.supabase.table("profiles").update({"free_trials_left": local_val}).eq("email", email).execute()
+        return local_val
+
+    def _refresh_loop(self):
+        while True:
+            email = self._refreshes.get()
+            try:
+                self.get(email, fresh=True)
+            except Exception as e:
+                METRICS.event("profile_refresh_error", detail=str(e)[:300], reason=type(e).__name__)
+            with self._lock:
+                self._refreshing.discard(email)
+            self._refreshes.task_done()
@@ -0,0 +1,37 @@
+# TopperGPT Prompt Templates
+# Prompt ka text yahin rehta hai taaki cache key me iska version jaa sake.
+# Template me kuch bhi badlo toh VERSION bump karo, purane cached answers apne aap miss ho jayenge.
+
+PREDICT_PROMPT_VERSION = "predict-v2"
+RESEARCH_PROMPT_VERSION = "research-v1"
+
+
+def build_predict_prompt(target, evidence):
+    return f"""
+                    Role: Senior MU Paper Setter. Target: {target} | Data: {evidence}
+                    MISSION: Predict 12 high-probability questions for WRITTEN EXAM.
+
+                    STRICT DYNAMIC RULES:
+                    1. IF DRAWING (EG): 10M-15M Drafting problems only. No theory/CAD.
+                    2. IF MATHS/NUMERICAL: Provide actual numericals with specific values.
+                    3. SURESHOT: Add | Confidence: [85-99]% | Marks: [X]M.
+
+                    STRUCTURE: START_SURESHOT [12 Qs] END_SURESHOT. START_JUGAAD [5 Topics] END_JUGAAD. START_PLAN [Roadmap] END_PLAN.
+                    """
+
+
+def build_research_prompt(query):
+    return f"""
+                Act as a PhD Engineering Professor for Mumbai University curriculum.
+                Provide an academically accurate and high-scoring report for: '{query}'.
+
+                OUTPUT FORMAT STRICTLY USING THESE 3 HEADERS ONLY:
+                [1_DEF]
+                Exact University Standard 2-Mark definition as expected in MU marking rubrics.
+
+                [2_BRK]
+                Technical Breakdown: Architecture, internal equations, core components, and diagram notes.
+
+                [3_WRK]
+                Working Principle: Step-by-step operational logic and mechanism.
+                """
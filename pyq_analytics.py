@@ -0,0 +1,151 @@
+# TopperGPT PYQ Analytics
+# "Most Repeated PYQs" LLM se yaad karwane ki zaroorat nahi: knowledge base me exact data hai. "Asked Nx" sirf
+# digest ke sach wale repeats (same sawal, same operands) ko milta hai, har baar ke asli session + marks ke saath.
+# Alag sawal jo same topic pe aaye wo alag "recurring topic" hain: records ka topic x session matrix (numpy) ek hi
+# pass me, wahi heat map bhi banata hai.
+
+import numpy as np
+
+from pyq_digest import topic_terms
+from pyq_store import MAX_CACHED_SUBJECTS, SubjectMemo, session_order
+
+REPEATED_LIMIT = 6
+HEATMAP_TOPICS = 12
+# Subject ke itne se zyada sawalon me aaya term topic nahi, vocabulary hai ("algorithm" DSA me har jagah)
+MAX_TOPIC_SHARE = 0.25
+# Har subject me aane wale kaam ke words / maths notation: topic label me kisi kaam ke nahi
+GENERIC_TERMS = frozenset("""
+equation equations algorithm algorithms calculation principle theorem order limits integral integrals function
+functions value sin cos tan log dydx dxdy dx dy method methods formula expression example examples
+""".split())
+
+
+def analytics_terms(text):
+    return {t for t in topic_terms(text) if t not in GENERIC_TERMS and not any(c.isdigit() for c in t)}
+
+
+class TopicStat:
+    # Ek topic (saath saath aane wale terms ek label me: "fermi level"), subject ke andar.
+    # occurrences = us topic ke har sawal ka (session, marks)
+    __slots__ = ("label", "count", "sessions", "total_marks", "max_marks", "example", "per_session", "ids",
+                 "occurrences")
+
+    def __init__(self, label, count, sessions, total_marks, max_marks, example, per_session, ids, occurrences):
+        self.label = label
+        self.count = count
+        self.sessions = sessions
+        self.total_marks = total_marks
+        self.max_marks = max_marks
+        self.example = example
+        self.per_session = per_session
+        self.ids = ids
+        self.occurrences = occurrences
+
+    def __repr__(self):
+        return f"TopicStat({self.label!r}, x{self.count}, {list(self.sessions)}, {self.total_marks}M)"
+
+
+class SubjectAnalytics:
+
+    __slots__ = ("subject", "sessions", "topics", "repeated_questions")
+
+    def __init__(self, subject, sessions, topics, repeated_questions):
+        self.subject = subject
+        self.sessions = sessions
+        self.topics = topics
+        self.repeated_questions = repeated_questions
+
+    def repeated_topics(self):
+        # 2+ alag sessions me aaya topic; zyada sessions, phir zyada baar, phir zyada marks
+        return [t for t in self.topics if len(t.sessions) > 1]
+
+    def heatmap(self, limit=HEATMAP_TOPICS):
+        # (sessions, [(label, [marks per session], total)]) sabse zyada marks wale topics
+        top = sorted(self.topics, key=lambda t: (-t.total_marks, -t.count, t.label))[:limit]
+        return self.sessions, [(t.label, t.per_session, t.total_marks) for t in top]
+
+    def most_repeated(self, limit=REPEATED_LIMIT):
+        # Predict tab ka "Most Repeated PYQs": sirf wahi sawal jo sach me dobara aaye, har baar ke marks ke saath
+        return [f"{i}. {c.text} | Asked {c.count}x ({c.asked()})"
+                for i, c in enumerate(self.repeated_questions[:limit], 1)]
+
+    def recurring_topics(self, limit=REPEATED_LIMIT):
+        # Alag alag sawal, same topic, 2+ sessions me; count = kitne alag sawal, "asked" nahi
+        shown = [set(c.ids) for c in self.repeated_questions]
+        lines = []
+        for t in self.repeated_topics():
+            # Exact repeat ya upar wale topic ke hi sawal ("modified" sirf Euler ke andar) => kuch naya nahi
+            if any(set(t.ids) <= ids for ids in shown):
+                continue
+            shown.append(set(t.ids))
+            occurrences = ", ".join(f"{session} {marks}M" for session, marks in t.occurrences)
+            lines.append(f"{t.label.title()}: {t.count} alag sawal ({occurrences}), e.g. {t.example}")
+            if len(lines) >= limit:
+                break
+        return [f"{i}. {line}" for i, line in enumerate(lines, 1)]
+
+
+def analyze(store, digest, subject):
+    recs = store.records(subject)
+    sessions = sorted({r.session for r in recs}, key=session_order)
+    repeated = sorted((c for c in digest.clusters(subject) if c.count > 1), key=lambda c: (-c.count, -c.max_marks))
+    if not recs:
+        return SubjectAnalytics(subject, sessions, [], repeated)
+
+    terms = [analytics_terms(r.text) for r in recs]
+    df = {}
+    for ts in terms:
+        for t in ts:
+            df[t] = df.get(t, 0) + 1
+    limit = max(2, MAX_TOPIC_SHARE * len(recs))
+    terms = [{t for t in ts if df[t] <= limit} for ts in terms]
+    vocab = sorted(set().union(*terms))
+    if not vocab:
+        return SubjectAnalytics(subject, sessions, [], repeated)
+    col = {t: j for j, t in enumerate(vocab)}
+    s_col = {s: j for j, s in enumerate(sessions)}
+
+    # records x terms incidence, records x sessions one-hot (marks weighted); do matrix products = saari counting
+    incidence = np.zeros((len(recs), len(vocab)), dtype=np.int32)
+    rows = [i for i, ts in enumerate(terms) for _ in ts]
+    cols = [col[t] for ts in terms for t in ts]
+    incidence[rows, cols] = 1
+    onehot = np.zeros((len(recs), len(sessions)), dtype=np.int32)
+    onehot[np.arange(len(recs)), [s_col[r.session] for r in recs]] = 1
+    marks = np.array([r.marks for r in recs], dtype=np.int32)
+
+    # Jo terms hamesha saath aate hain (same incidence column) wo ek hi topic: "fermi" + "level" => "fermi level"
+    groups, inverse = np.unique(incidence.T, axis=0, return_inverse=True)
+    counts = groups @ onehot                       # topics x sessions: kitne sawal
+    marks_by_session = groups @ (onehot * marks[:, None])
+    max_marks = (groups * marks[None, :]).max(axis=1)
+
+    topics = []
+    for g in range(len(groups)):
+        members = np.flatnonzero(groups[g])
+        # Label words example sawal ke order me
+        latest = max(members, key=lambda i: (session_order(recs[i].session), recs[i].marks))
+        words = [vocab[j] for j in np.flatnonzero(inverse.ravel() == g)]
+        text = recs[latest].text.lower()
+        words.sort(key=lambda w: (text.find(w) if w in text else len(text), w))
+        seen = np.flatnonzero(counts[g])
+        topics.append(TopicStat(
+            " ".join(words[:3]), int(counts[g].sum()), tuple(sessions[j] for j in seen),
+            int(marks_by_session[g].sum()), int(max_marks[g]), recs[latest].text,
+            [int(m) for m in marks_by_session[g]], tuple(int(i) for i in members),
+            tuple(sorted(((recs[i].session, recs[i].marks) for i in members), key=lambda o: session_order(o[0]))),
+        ))
+    topics.sort(key=lambda t: (-len(t.sessions), -t.count, -t.total_marks, t.label))
+    return SubjectAnalytics(subject, sessions, topics, repeated)
+
+
+class PYQAnalytics:
+    # Knowledge snapshot ke saath banta hai; har subject pehli baar maangne pe compute, phir per-subject LRU me
+
+    def __init__(self, store, digest, max_subjects=MAX_CACHED_SUBJECTS):
+        self.store = store
+        self.digest = digest
+        self._memo = SubjectMemo(max_subjects)
+
+    def subject(self, subject):
+        return self._memo.get(subject, lambda s: analyze(self.store, self.digest, s))
@@ -0,0 +1,170 @@
+# TopperGPT PYQ Digest
+# Same sawal alag sessions me baar baar aata hai ("Fermi level lies midway..." DEC 2024 + DEC 2025, PMMA har paper me).
+# Har subject ke near-duplicate PYQs ek canonical entry me: kitni baar aaya, kin sessions me, har baar kitne marks.
+# Sirf wahi merge hote hain jo sach me same sawal hain: topic words almost same AUR numbers / equation / variables
+# exactly same (alag values wala Euler's method alag numerical hai). Corpus me exact repeats kam hain, toh digest
+# size me source se zyada chhota nahi; fayda repeat count + sessions ka signal hai.
+# Subject ka digest pehli baar maangne pe banta hai (subject ke records hi, ms me) aur store jaisa SubjectMemo LRU me
+# rehta hai; poore corpus ka digest kabhi memory me nahi.
+
+import re
+
+from pyq_store import MAX_CACHED_SUBJECTS, STORE, SubjectMemo, keywords, session_order
+
+CLUSTER_JACCARD = 0.75
+
+# Sawal ka "kaam" batane wale words; topic same ho toh "Synthesis of PMMA" aur "Uses of PMMA" ek hi entry
+QUESTION_WORDS = frozenset("""
+prove proof derive derivation discuss describe compare comparison difference between list draw diagram
+construction working explain explanation properties property uses use applications application advantages
+disadvantages preparation synthesis types significance mention give obtain show determine determination
+solve evaluate
+""".split())
+
+
+# Numericals ke operands: numbers, math symbols, aur (sirf maths wale sawal me) single-letter variables
+MATH_FIXES = {"’": "'", "−": "-", "×": "*", "÷": "/", **{sup: f"^{d}" for d, sup in enumerate("⁰¹²³⁴⁵⁶⁷⁸⁹")}}
+NUMBER_SYMBOL_RE = re.compile(r"\d+(?:\.\d+)?|[=+\-*/^∫]")
+VARIABLE_RE = re.compile(r"(?<![a-z'])[a-z](?![a-z])")
+# Huffman tree for 'MALAYALAM' vs 'CONSTRUCTION': quoted input bhi operand hai
+QUOTED_RE = re.compile(r"'([^']+)'")
+
+
+def topic_terms(text):
+    # Sirf "Solve ..." / "Evaluate ..." jaise sawal (baaki sab numbers) ke topic terms khaali; unhe operands pehchante hain
+    return frozenset(w for w in keywords(text) if w not in QUESTION_WORDS)
+
+
+def operands(text):
+    # "Euler's method dy/dx = x+y, h=0.2" -> sorted (0.2, =, =, +, /, x, y, ...); theory sawal ("Applications
+    # of Stack") me koi number / symbol nahi toh khaali, warna "a" / "i" jaise English words variable ban jaate
+    text = text.lower()
+    for bad, good in MATH_FIXES.items():
+        text = text.replace(bad, good)
+    quoted = QUOTED_RE.findall(text)
+    text = QUOTED_RE.sub(" ", text)
+    found = NUMBER_SYMBOL_RE.findall(text)
+    if found:
+        found += VARIABLE_RE.findall(text)
+    return tuple(sorted(found + quoted))
+
+
+def signature(text):
+    return topic_terms(text), operands(text)
+
+
+def similar(a, b):
+    # a, b = signature(); operands exactly same hone chahiye, phir topic words ka Jaccard
+    terms_a, ops_a = a
+    terms_b, ops_b = b
+    if ops_a != ops_b:
+        return False
+    if not terms_a and not terms_b:
+        # Pure numerical ("Solve (x-2e^y)dy + ...") : same operands hi same sawal hai
+        return bool(ops_a)
+    if not terms_a or not terms_b:
+        return False
+    return len(terms_a & terms_b) / len(terms_a | terms_b) >= CLUSTER_JACCARD
+
+
+class PYQCluster:
+    # Ek canonical sawal; text latest session wali phrasing hai. occurrences = har baar ka (session, marks)
+    __slots__ = ("subject", "text", "terms", "count", "sessions", "max_marks", "ids", "occurrences")
+
+    def __init__(self, subject, text, terms, count, sessions, max_marks, ids, occurrences):
+        self.subject = subject
+        self.text = text
+        self.terms = terms
+        self.count = count
+        self.sessions = sessions
+        self.max_marks = max_marks
+        self.ids = ids
+        self.occurrences = occurrences
+
+    @property
+    def latest(self):
+        return self.sessions[-1]
+
+    def asked(self):
+        # "MAY 2025 3M, DEC 2025 6M": har baar ke asli marks, aggregate nahi
+        return ", ".join(f"{session} {marks}M" for session, marks in self.occurrences)
+
+    def line(self):
+        # "- Preparation, properties and uses of PMMA x2 [MAY 2025 3M, DEC 2025 6M]"; ek hi baar aaya toh
+        # session header ke neeche, tag ki zaroorat nahi
+        if self.count == 1:
+            return f"- {self.text} ({self.max_marks}M)"
+        return f"- {self.text} x{self.count} [{self.asked()}]"
+
+    def __repr__(self):
+        return f"PYQCluster({self.subject!r}, x{self.count}, {self.max_marks}M, {self.text!r})"
+
+
+def cluster_subject(store, subject):
+    # Latest session pehle, har record pehle matching leader me jaata hai (leader ke terms se compare,
+    # chain-merging nahi hota). ids = subject ke records me position
+    records = store.records(subject)
+    ids = sorted(range(len(records)), key=lambda i: (session_order(records[i].session), len(records[i].text)), reverse=True)
+    groups = []
+    for i in ids:
+        sig = signature(records[i].text)
+        for leader_sig, members in groups:
+            if similar(sig, leader_sig):
+                members.append(i)
+                break
+        else:
+            groups.append((sig, [i]))
+
+    clusters = []
+    for (terms, _), members in groups:
+        recs = [records[i] for i in members]
+        sessions = tuple(sorted({r.session for r in recs}, key=session_order))
+        occurrences = tuple(sorted(((r.session, r.marks) for r in recs), key=lambda o: session_order(o[0])))
+        clusters.append(PYQCluster(
+            subject, recs[0].text, terms, len(recs), sessions, max(r.marks for r in recs), tuple(sorted(members)),
+            occurrences,
+        ))
+    return clusters
+
+
+def render_clusters(clusters):
+    # Repeat wale upar ek block me, baaki session-wise (QP code / cite prompt me kisi kaam ke nahi)
+    repeated = sorted((c for c in clusters if c.count > 1), key=lambda c: (-c.count, -c.max_marks, c.ids[0]))
+    lines = []
+    if repeated:
+        lines.append("REPEATED:")
+        lines.extend(c.line() for c in repeated)
+    by_session = {}
+    for c in clusters:
+        if c.count == 1:
+            by_session.setdefault(c.latest, []).append(c)
+    for session in sorted(by_session, key=session_order):
+        lines.append(f"{session}:")
+        lines.extend(c.line() for c in by_session[session])
+    return "\n".join(lines)
+
+
+class PYQDigest:
+
+    def __init__(self, store, max_subjects=MAX_CACHED_SUBJECTS):
+        self.store = store
+        self._clusters = SubjectMemo(max_subjects)
+
+    def clusters(self, subject):
+        return self._clusters.get(subject, lambda s: cluster_subject(self.store, s))
+
+    def asked(self, subject):
+        return self.store.count(subject)
+
+    def render(self, subject):
+        # Poore subject ka dense digest (budget ke bina)
+        clusters = self.clusters(subject)
+        if not clusters:
+            return ""
+        return f"--- MU PYQ DIGEST ({len(clusters)} unique of {self.asked(subject)} asked) ---\n{render_clusters(clusters)}"
+
+    def stats(self):
+        return {"cached_digests": len(self._clusters), "clustered": self._clusters.builds}
+
+
+DIGEST = PYQDigest(STORE)
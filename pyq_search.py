@@ -0,0 +1,111 @@
+# TopperGPT Past Paper Search
+# "Ye topic pehle aaya hai kya, kitne marks ka?" ke liye LLM / trial ki zaroorat nahi: knowledge file ke FTS5 index
+# pe seedha query. Har result me subject, session, QP code, marks; BM25 rank, phir naya session / zyada marks pehle.
+# Saare words kisi sawal me nahi mile toh koi bhi word wale "related" hits; wo "kitni baar aaya" me nahi gine jaate.
+
+import os
+import re
+import threading
+import time
+
+import knowledge_db
+from metrics import METRICS
+from pyq_store import STOPWORDS, session_order
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+MAX_TERMS = 8
+
+
+class Hit:
+    __slots__ = ("subject", "session", "qp_code", "marks", "text", "snippet", "score", "related")
+
+    def __init__(self, subject, session, qp_code, marks, text, snippet, score, related=False):
+        self.subject = subject
+        self.session = session
+        self.qp_code = qp_code
+        self.marks = marks
+        self.text = text
+        self.snippet = snippet
+        self.score = score
+        self.related = related
+
+    def __repr__(self):
+        return f"Hit({self.subject!r}, {self.session!r}, {self.marks}M, {self.text!r})"
+
+
+def match_query(text, any_term=False):
+    # User text -> FTS5 MATCH: har word quoted (operators / quotes kabhi pass nahi hote); 4+ letters pe prefix
+    # ("ferm"* -> fermi), chhote words exact warna "op"* har "operation" pakad leta hai
+    words = [w for w in WORD_RE.findall(text.lower()) if len(w) > 1 and w not in STOPWORDS][:MAX_TERMS]
+    if not words:
+        return ""
+    return (" OR " if any_term else " AND ").join(f'"{w}"*' if len(w) >= 4 else f'"{w}"' for w in words)
+
+
+class PastPaperSearch:
+
+    def __init__(self, path=None):
+        self.path = knowledge_db.ensure_kb(path or knowledge_db.KB_PATH)
+        self.searches = 0
+        self.empty = 0
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        self._conn = knowledge_db.connect(self.path)
+        self._inode = os.stat(self.path).st_ino
+
+    def _query(self, match, subject, limit):
+        sql = """
+            SELECT p.subject, p.session, p.qp_code, q.marks, q.text,
+                   highlight(questions_fts, 0, '**', '**'), bm25(questions_fts, 1.0, 0.5)
+            FROM questions_fts f
+            JOIN papers p ON p.id = f.paper_id
+            JOIN questions q ON q.paper_id = f.paper_id AND q.position = f.position
+            WHERE questions_fts MATCH ?
+        """
+        params = [match]
+        if subject:
+            sql += " AND p.subject = ?"
+            params.append(subject)
+        sql += " ORDER BY bm25(questions_fts, 1.0, 0.5) LIMIT ?"
+        params.append(limit * 3)
+        return self._conn.execute(sql, params).fetchall()
+
+    def search(self, text, subject=None, limit=20):
+        started = time.perf_counter()
+        match = match_query(text)
+        hits = []
+        related = False
+        if match:
+            with self._lock:
+                if os.stat(self.path).st_ino != self._inode:
+                    # `knowledge_db.py import` ne file replace ki
+                    self._conn.close()
+                    self._open()
+                rows = self._query(match, subject, limit)
+                if not rows:
+                    # Saare words kisi ek sawal me nahi: koi bhi word match kare, rank BM25 sambhal lega.
+                    # Ye same topic ka sawal ho zaroori nahi, isliye related
+                    rows = self._query(match_query(text, any_term=True), subject, limit)
+                    related = True
+            hits = [Hit(s, sess, qp or None, marks, t, snip, -score, related)
+                    for s, sess, qp, marks, t, snip, score in rows]
+            # BM25 almost barabar ho toh naya session aur zyada marks pehle
+            hits.sort(key=lambda h: (-round(h.score, 1), tuple(-x for x in session_order(h.session)), -h.marks))
+            hits = hits[:limit]
+        self.searches += 1
+        if not hits:
+            self.empty += 1
+        METRICS.observe("pyq_search_seconds", time.perf_counter() - started,
+                        result="empty" if not hits else "related" if related else "hit")
+        return hits
+
+    def summary(self, hits):
+        # "3 baar aaya (DEC 2024, MAY 2025), max 10M"; sirf saare words wale hits, related nahi
+        hits = [h for h in hits if not h.related]
+        sessions = sorted({h.session for h in hits}, key=session_order)
+        return {"count": len(hits), "sessions": sessions, "max_marks": max((h.marks for h in hits), default=0)}
+
+    def stats(self):
+        return {"searches": self.searches, "empty": self.empty}
@@ -0,0 +1,171 @@
+# TopperGPT PYQ Store
+# Knowledge file (knowledge_db.py) ka read-only view; free-text papers ka parser bhi yahin hai.
+# Heap me corpus-wide sirf subject -> question count. Kisi subject ke records pehli baar maangne pe mmap'd file se
+# aate hain aur ek chhote LRU (SubjectMemo) me rehte hain; digest / ranker / analytics bhi wahi LRU use karte hain.
+# Toh process ki memory haal me maange gaye subjects se bandhi hai, corpus (saare semesters) kitna bhi bade.
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import knowledge_db
+
+PARSER_VERSION = 1
+# Ek process me itne subjects ka derived data (records, clusters, ranker index, analytics) memory me
+MAX_CACHED_SUBJECTS = int(os.environ.get("TOPPER_KB_SUBJECTS", 24))
+
+SESSION_RE = re.compile(r"^(DEC|MAY)\s+(\d{4})\s*(?:\(QP:\s*(\d+)\))?\s*:", re.IGNORECASE)
+MARKS_RE = re.compile(r"\((\d+)\s*M\)", re.IGNORECASE)
+CITE_RE = re.compile(r"\[cite:\s*([\d,\s]+)\]")
+WORD_RE = re.compile(r"[a-z][a-z0-9]+")
+MONTHS = {"MAY": 5, "DEC": 12}
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from how in into is it its of on or the to with
+find explain define state write short note using given value values calculate
+""".split())
+
+
+def keywords(text):
+    return [w for w in WORD_RE.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS]
+
+
+def session_order(session):
+    # "DEC 2024" -> (2024, 12), sort karne ke liye
+    month, year = session.split()
+    return int(year), MONTHS.get(month, 0)
+
+
+class PYQRecord:
+    __slots__ = ("subject", "semester", "session", "qp_code", "text", "marks", "cites")
+
+    def __init__(self, subject, semester, session, qp_code, text, marks, cites):
+        self.subject = subject
+        self.semester = semester
+        self.session = session
+        self.qp_code = qp_code
+        self.text = text
+        self.marks = marks
+        self.cites = cites
+
+    def __repr__(self):
+        return f"PYQRecord({self.subject!r}, {self.session!r}, {self.marks}M, {self.text!r})"
+
+
+def parse_blob(subject, semester, blob):
+    records = []
+    session, qp_code = None, None
+    for line in blob.splitlines():
+        line = line.strip()
+        if line.startswith("---"):
+            # "--- ASALI MU PAPERS DATA ---" jaisa banner: naya paper block shuru
+            session, qp_code = None, None
+            continue
+        m = SESSION_RE.match(line)
+        if m:
+            session = f"{m.group(1).upper()} {m.group(2)}"
+            qp_code = m.group(3)
+            continue
+        if not line.startswith("-") or session is None:
+            continue
+
+        text = line[1:].strip()
+        cites = ()
+        cite_match = CITE_RE.search(text)
+        if cite_match:
+            cites = tuple(int(c) for c in re.findall(r"\d+", cite_match.group(1)))
+            text = CITE_RE.sub("", text)
+        marks = 0
+        mark_matches = MARKS_RE.findall(text)
+        if mark_matches:
+            marks = int(mark_matches[-1])
+            text = MARKS_RE.sub("", text)
+        records.append(PYQRecord(subject, semester, session, qp_code, " ".join(text.split()), marks, cites))
+    return records
+
+
+class SubjectMemo:
+    # subject -> derived value ka LRU; build(subject) lock ke bahar (dusre subjects ruke nahi)
+
+    def __init__(self, max_subjects=MAX_CACHED_SUBJECTS):
+        self.max_subjects = max_subjects
+        self.builds = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject, build):
+        with self._lock:
+            if subject in self._items:
+                self._items.move_to_end(subject)
+                return self._items[subject]
+        value = build(subject)
+        with self._lock:
+            self.builds += 1
+            self._items[subject] = value
+            while len(self._items) > self.max_subjects:
+                self._items.popitem(last=False)
+        return value
+
+    def __len__(self):
+        return len(self._items)
+
+
+class PYQStore:
+    # Apna read-only connection rakhta hai: file replace (import) hui toh bhi ye snapshot purana inode padhta rahega
+
+    def __init__(self, conn, max_subjects=MAX_CACHED_SUBJECTS):
+        self._conn = conn
+        self._lock = threading.Lock()
+        self.revision = knowledge_db.revision(conn)
+        self.fingerprint = store_fingerprint(conn)
+        self.counts = knowledge_db.subject_counts(conn)
+        self._records = SubjectMemo(max_subjects)
+
+    def __contains__(self, subject):
+        return subject in self.counts
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def subjects(self):
+        return list(self.counts)
+
+    def count(self, subject):
+        return self.counts.get(subject, 0)
+
+    def _read(self, **filters):
+        with self._lock:
+            return [PYQRecord(*row) for row in knowledge_db.read_rows(self._conn, **filters)]
+
+    def records(self, subject):
+        # Paper + position order me; index = subject ke andar position (clusters / analytics ke ids yahi)
+        if subject not in self.counts:
+            return []
+        return self._records.get(subject, lambda s: self._read(subject=s))
+
+    def sessions(self, subject=None):
+        with self._lock:
+            found = knowledge_db.sessions(self._conn, subject)
+        return sorted(found, key=session_order)
+
+    def query(self, subject=None, session=None, marks=None, keyword=None):
+        # subject / session / marks SQL me, keyword ke saare words record me hone chahiye; result memo nahi hota
+        words = set(keywords(keyword)) if keyword else set()
+        return [r for r in self._read(subject=subject, session=session, marks=marks) if words <= set(keywords(r.text))]
+
+    def stats(self):
+        return {"subjects": len(self.counts), "records": len(self), "cached_subjects": len(self._records)}
+
+
+def store_fingerprint(conn):
+    ident = f"parser-v{PARSER_VERSION}|{knowledge_db.kb_id(conn)}|{knowledge_db.revision(conn)}"
+    return hashlib.sha256(ident.encode()).hexdigest()
+
+
+def load_store(path=None):
+    return PYQStore(knowledge_db.connect(path or knowledge_db.ensure_kb()))
+
+
+STORE = load_store()
@@ -0,0 +1,108 @@
+# TopperGPT Result Store
+# Battle plan / research report ka poora text har session ki state me apni copy nahi rakhta: process-wide
+# content-addressed store me ek copy (key = text ka sha256), session sirf key rakhta hai. 300 students same subject
+# ka plan dekhein toh memory me ek hi plan. Parsed structure bhi usi entry ke saath, toh reruns pe dobara parse nahi.
+# Byte cap ke upar LRU eviction; stats me held bytes aur dedup ratio, taaki instance unique content se size ho.
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from metrics import METRICS
+
+
+def result_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class _Entry:
+    __slots__ = ("text", "size", "parsed")
+
+    def __init__(self, text):
+        self.text = text
+        self.size = len(text.encode("utf-8"))
+        self.parsed = {}
+
+
+class ResultStore:
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.puts = 0
+        self.put_bytes = 0
+        self.stored_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, text):
+        # Har session ka put gina jaata hai (dedup ratio ke liye), store me copy sirf pehli baar
+        text = text or ""
+        key = result_key(text)
+        with self._lock:
+            self.puts += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.put_bytes += entry.size
+                METRICS.inc("result_store_total", result="dedup")
+                return key
+            entry = self._entries[key] = _Entry(text)
+            self.bytes += entry.size
+            self.put_bytes += entry.size
+            self.stored_bytes += entry.size
+            self._evict()
+        METRICS.inc("result_store_total", result="new")
+        return key
+
+    def _evict(self):
+        # Sabse purana pehle; naya entry khud kabhi nahi nikalta (cap se bada ho tab bhi)
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.bytes -= entry.size
+            self.evicted += 1
+
+    def _entry(self, key):
+        entry = self._entries.get(key) if key else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def get(self, key):
+        # None => key evict ho chuki (ya is process ki nahi); session ko bata ke key hata do
+        with self._lock:
+            entry = self._entry(key)
+        return entry.text if entry is not None else None
+
+    def parsed(self, key, parse):
+        # parse(text) ka result entry ke saath hi cached; entry evict => parsed bhi gaya
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                return None
+            result = entry.parsed.get(parse)
+        if result is None:
+            result = parse(entry.text)
+            with self._lock:
+                entry.parsed[parse] = result
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "puts": self.puts,
+                # Sessions ne kitna content maanga / store ne kitna sach me rakha
+                "dedup_ratio": round(self.put_bytes / self.stored_bytes, 2) if self.stored_bytes else 1.0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted": self.evicted,
+            }
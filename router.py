@@ -0,0 +1,206 @@
+# TopperGPT Provider Router
+# Har provider+model ka EWMA first-token latency aur error rate yaad rakhta hai; baar baar fail / 429 pe
+# circuit breaker khulta hai. Har request ko abhi jo sabse tez aur healthy hai wahi pehle milta hai,
+# baaki hedger ke fallback order me. Tab-wise order / weights / timeouts secrets.toml se:
+#   [ROUTES.predict]
+#   order = ["deepseek", "groq"]
+#   weights = { groq = 1.2 }          # >1 matlab thoda kam pasand
+#   timeouts = { deepseek = 15 }
+#   models = { groq = "llama-3.3-70b-versatile" }
+
+import threading
+import time
+
+from metrics import METRICS
+
+DEFAULT_MODELS = {"deepseek": "deepseek-chat", "groq": "llama-3.3-70b-versatile"}
+DEFAULT_ROUTES = {
+    "predict": {"order": ["deepseek", "groq"], "timeouts": {"deepseek": 15.0, "groq": 30.0}},
+    "research": {"order": ["groq", "deepseek"], "timeouts": {"deepseek": 15.0, "groq": 30.0}},
+}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class Choice:
+    __slots__ = ("provider", "model", "timeout", "weight")
+
+    def __init__(self, provider, model, timeout, weight):
+        self.provider = provider
+        self.model = model
+        self.timeout = timeout
+        self.weight = weight
+
+    @property
+    def key(self):
+        return f"{self.provider}:{self.model}"
+
+
+def status_code(error):
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code
+
+
+def retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProviderHealth:
+    # Ek provider+model ka state: EWMA latency / error rate + circuit breaker
+
+    __slots__ = ("latency", "error_rate", "last_sample", "failures", "state", "opened_until", "opens", "probe_until")
+
+    def __init__(self):
+        self.latency = None
+        self.error_rate = 0.0
+        self.last_sample = 0.0
+        self.failures = 0
+        self.state = CLOSED
+        self.opened_until = 0.0
+        self.opens = 0
+        self.probe_until = 0.0
+
+
+class ProviderRouter:
+
+    def __init__(self, routes=None, alpha=0.3, failure_threshold=3, cooldown=30.0, max_cooldown=600.0,
+                 prior_latency=2.0, stale_after=300.0):
+        self.routes = {}
+        for name, cfg in {**DEFAULT_ROUTES, **dict(routes or {})}.items():
+            self.routes[name] = self._choices(dict(cfg))
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.prior_latency = prior_latency
+        self.stale_after = stale_after
+        self._health = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _choices(cfg):
+        weights = dict(cfg.get("weights", {}))
+        timeouts = dict(cfg.get("timeouts", {}))
+        models = dict(cfg.get("models", {}))
+        return [
+            Choice(p, models.get(p, DEFAULT_MODELS.get(p, p)), float(timeouts.get(p, 30.0)), float(weights.get(p, 1.0)))
+            for p in cfg.get("order", [])
+        ]
+
+    # --- ROUTING ---
+    def plan(self, route):
+        # Cooldown khatam hua provider ek probe request ke liye sabse aage (hedger slow probe ko cover karta hai),
+        # phir healthy providers score (EWMA latency x weight x error penalty) se. Open circuits (aur jinka probe
+        # abhi chal raha hai) list me aate hi nahi; sirf tab jab koi aur bacha hi na ho (request fail na ho)
+        now = time.monotonic()
+        ranked = []
+        with self._lock:
+            for pos, choice in enumerate(self.routes[route]):
+                h = self._health.setdefault(choice.key, ProviderHealth())
+                if h.state == OPEN and now >= h.opened_until:
+                    h.state = HALF_OPEN
+                if h.state == HALF_OPEN and now >= h.probe_until:
+                    h.probe_until = now + choice.timeout
+                    ranked.append((0, 0.0, pos, choice))
+                elif h.state == CLOSED:
+                    fresh = h.latency is not None and now - h.last_sample < self.stale_after
+                    latency = h.latency if fresh else self.prior_latency
+                    ranked.append((1, latency * choice.weight * (1.0 + 4.0 * h.error_rate), pos, choice))
+                else:
+                    ranked.append((2, h.opened_until, pos, choice))
+        ranked.sort(key=lambda r: r[:3])
+        usable = [r for r in ranked if r[0] < 2] or ranked
+        return [choice for _, _, _, choice in usable]
+
+    def is_open(self, route, provider):
+        now = time.monotonic()
+        with self._lock:
+            for choice in self.routes[route]:
+                h = self._health.get(choice.key)
+                if choice.provider == provider and h is not None and h.state == OPEN and now < h.opened_until:
+                    return True
+        return False
+
+    def attempts(self, route, make_factory):
+        # hedger.stream() ke liye [(provider, factory)]; make_factory(choice) None de toh provider skip
+        out = []
+        for choice in self.plan(route):
+            factory = make_factory(choice)
+            if factory is not None:
+                out.append((choice.provider, self._tracked(choice, factory)))
+        if not out:
+            raise RuntimeError(f"No LLM provider configured for '{route}'")
+        return out
+
+    def _tracked(self, choice, factory):
+        def run():
+            started = time.monotonic()
+            first_token = None
+            try:
+                for delta in factory():
+                    if first_token is None:
+                        first_token = time.monotonic() - started
+                        self.record_success(choice, first_token)
+                    yield delta
+            except Exception as e:
+                self.record_failure(choice, e)
+                raise
+            if first_token is None:
+                self.record_failure(choice, RuntimeError("empty completion"))
+        return run
+
+    # --- FEEDBACK ---
+    def record_latency(self, choice, seconds):
+        with self._lock:
+            h = self._health.setdefault(choice.key, ProviderHealth())
+            h.latency = seconds if h.latency is None else self.alpha * seconds + (1 - self.alpha) * h.latency
+            h.last_sample = time.monotonic()
+
+    def record_success(self, choice, first_token_seconds):
+        self.record_latency(choice, first_token_seconds)
+        with self._lock:
+            h = self._health[choice.key]
+            h.error_rate *= 1 - self.alpha
+            h.failures = 0
+            if h.state != CLOSED:
+                h.state = CLOSED
+                h.opens = 0
+                METRICS.event("circuit_close", provider=choice.provider)
+
+    def record_failure(self, choice, error):
+        status = status_code(error)
+        reason = "rate_limited" if status == 429 else type(error).__name__
+        with self._lock:
+            h = self._health.setdefault(choice.key, ProviderHealth())
+            h.error_rate = self.alpha + (1 - self.alpha) * h.error_rate
+            h.failures += 1
+            h.probe_until = 0.0
+            # 429 pe turant khol do (provider khud bol raha hai ruko); baaki errors threshold ke baad
+            if h.state == HALF_OPEN or status == 429 or h.failures >= self.failure_threshold:
+                h.opens += 1
+                wait = retry_after(error) if status == 429 else None
+                if wait is None:
+                    wait = min(self.max_cooldown, self.cooldown * 2 ** (h.opens - 1))
+                h.state = OPEN
+                h.opened_until = time.monotonic() + wait
+                opened = True
+            else:
+                opened = False
+        if opened:
+            METRICS.event("circuit_open", detail=str(error)[:300], provider=choice.provider, reason=reason)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._health.items())
+        return {
+            "ewma_ms": {k: round(h.latency * 1000, 1) for k, h in items if h.latency is not None},
+            "error_rate": {k: round(h.error_rate, 3) for k, h in items},
+            "open": {k: int(h.state == OPEN and now < h.opened_until) for k, h in items},
+        }
@@ -0,0 +1,94 @@
+# TopperGPT Session Tokens
+# Login ke baad ek signed, expiring token URL query param (?s=...) me. Refresh / naya tab / reconnect pe token
+# HMAC se yahin verify hota hai aur user_data bina profiles query ke wapas aa jata hai; pro / trials status
+# ProfileService background me refresh karta hai. Result wale din ke login burst me DB pe sirf naye logins.
+# Token = base64url(json payload) + "." + base64url(hmac_sha256(payload)). Signed hai, encrypted nahi.
+# URL me hai toh history / copied link / Referer se leak ho sakta hai, isliye:
+#   - chhota TTL (default 1 din); roz aane wale ko aadhe TTL pe naya token, par login time ("a") wahi rehta hai aur
+#     exp kabhi login + max_age (default 14 din) se aage nahi jaata: re-issue se token hamesha zinda nahi rehta
+#   - token me profile ka session_gen ("g"). Logout DB me generation badhata hai (ProfileService.revoke_sessions);
+#     background profile refresh me generation alag nikla toh wo token revoke (APP.py sync_profile)
+
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+
+from metrics import METRICS
+
+TOKEN_PARAM = "s"
+TOKEN_VERSION = 2
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class SessionTokens:
+
+    def __init__(self, secret, ttl_seconds=24 * 3600, max_age_seconds=14 * 24 * 3600):
+        self._key = secret.encode("utf-8")
+        self.ttl_seconds = ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self.issued = 0
+        self.verified = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _sign(self, payload):
+        return _b64(hmac.new(self._key, payload.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, profile, now=None, auth_time=None):
+        # auth_time = asli login ka time; re-issue pe purane token wala pass karo
+        now = time.time() if now is None else now
+        auth_time = now if auth_time is None else auth_time
+        claims = {
+            "v": TOKEN_VERSION, "e": profile["email"], "n": profile.get("full_name"),
+            "p": bool(profile.get("is_pro", False)), "t": profile.get("free_trials_left"),
+            "g": profile.get("session_gen") or 0, "a": int(auth_time),
+            "iat": int(now), "exp": int(min(now + self.ttl_seconds, auth_time + self.max_age_seconds)),
+        }
+        payload = _b64(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self.issued += 1
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify(self, token, now=None):
+        # (profile, issued_at, auth_time) ya None; tampered / expired / purana version sab reject.
+        # Revocation (session_gen) yahan nahi dikhta: wo DB se refresh pe check hota hai
+        claims, reason = None, "invalid"
+        try:
+            payload, signature = str(token).split(".", 1)
+            if hmac.compare_digest(signature, self._sign(payload)):
+                claims = json.loads(_unb64(payload))
+        except (ValueError, UnicodeError):
+            claims = None
+        if claims is not None and claims.get("v") != TOKEN_VERSION:
+            claims, reason = None, "version"
+        if claims is not None and claims.get("exp", 0) < (time.time() if now is None else now):
+            claims, reason = None, "expired"
+        self.count("valid" if claims is not None else reason)
+        if claims is None:
+            return None
+        profile = {"email": claims["e"], "full_name": claims.get("n"), "free_trials_left": claims.get("t"),
+                   "is_pro": claims.get("p", False), "session_gen": claims.get("g", 0)}
+        return profile, claims.get("iat", 0), claims.get("a", 0)
+
+    def count(self, result):
+        # "revoked" APP.py ginta hai (refresh ke baad pata chalta hai)
+        with self._lock:
+            if result == "valid":
+                self.verified += 1
+            else:
+                self.rejected += 1
+        METRICS.inc("session_token_total", result=result)
+
+    def stats(self):
+        with self._lock:
+            return {"issued": self.issued, "verified": self.verified, "rejected": self.rejected}
@@ -0,0 +1,65 @@
+# TopperGPT Single-Flight
+# Poori class ek saath "Generate Battle Plan" dabaye toh provider ko sirf ek call jaaye.
+# Same key ka pehla request leader hai; baaki sessions usi Future pe wait karke same result share karte hain.
+
+import hashlib
+import threading
+from concurrent.futures import Future
+
+from metrics import METRICS
+
+
+def prompt_key(kind, prompt):
+    return f"{kind}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}"
+
+
+class SingleFlight:
+
+    def __init__(self, follower_timeout=120.0):
+        self.follower_timeout = follower_timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.suppressed = 0
+
+    def do(self, key, fn):
+        # Returns (result, shared); shared=True matlab kisi aur session ki call ka result mila
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+            else:
+                self.suppressed += 1
+
+        METRICS.inc("single_flight_total", role="leader" if leader else "follower")
+        if not leader:
+            return future.result(timeout=self.follower_timeout), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            total = self.leaders + self.suppressed
+            return {
+                "leaders": self.leaders,
+                "suppressed": self.suppressed,
+                "in_flight": len(self._calls),
+                "suppression_ratio": round(self.suppressed / total, 3) if total else 0.0,
+            }
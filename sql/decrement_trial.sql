@@ -0,0 +1,22 @@
+-- TopperGPT: atomic trial deduction
+-- Supabase SQL editor me ek baar run karo. Read-modify-write ki jagah ek hi UPDATE,
+-- isliye do tabs ek saath click karein toh bhi trial double-spend nahi hota.
+-- security definer hai, isliye execute sirf service_role ko: anon key (jo public hoti hai) se koi bhi
+-- kisi ka bhi email de ke trials na kaat sake. App ka SUPABASE_KEY (server-side secret) service_role key hai;
+-- login Supabase Auth se nahi hota, toh function ke andar auth.email() check ka option nahi.
+
+create or replace function public.decrement_trial(p_email text)
+returns integer
+language sql
+security definer
+set search_path = public
+as $$
+  update public.profiles
+     set free_trials_left = greatest(coalesce(free_trials_left, 10) - 1, 0)
+   where email = p_email
+     and coalesce(is_pro, false) = false
+  returning free_trials_left;
+$$;
+
+revoke execute on function public.decrement_trial(text) from public, anon, authenticated;
+grant execute on function public.decrement_trial(text) to service_role;
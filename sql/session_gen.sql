@@ -0,0 +1,21 @@
+-- TopperGPT: session token revocation
+-- Supabase SQL editor me ek baar run karo. Har session token me profile ka session_gen hota hai; Logout ise
+-- badhata hai, toh us email ke purane (copied / leaked) tokens agle profile refresh pe reject ho jaate hain.
+
+alter table public.profiles add column if not exists session_gen integer not null default 0;
+
+create or replace function public.bump_session_gen(p_email text)
+returns integer
+language sql
+security definer
+set search_path = public
+as $$
+  update public.profiles
+     set session_gen = session_gen + 1
+   where email = p_email
+  returning session_gen;
+$$;
+
+-- decrement_trial.sql jaisa: sirf server-side service_role key
+revoke execute on function public.bump_session_gen(text) from public, anon, authenticated;
+grant execute on function public.bump_session_gen(text) to service_role;
@@ -0,0 +1,195 @@
+# TopperGPT Startup Profiler
+# Cold start kahan ja raha hai? Fresh interpreter me har module ka import time (python -X importtime)
+# aur app ke andar har rerun ka script execution time.
+#   python startup_profiler.py                         # report
+#   python startup_profiler.py --check --budget-ms 2500
+#   python startup_profiler.py --save-baseline         # phir --check baseline se compare karega
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, ".topper_cache", "startup_baseline.json")
+
+APP_PATH = os.path.join(HERE, "APP.py")
+
+
+def app_imports(path=APP_PATH):
+    # APP.py top-level pe jo import hota hai, seedha APP.py ke AST se (haath wali list purani pad jaati thi).
+    # Function ke andar wale imports lazy hain, stdlib ginti me nahi
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    found = []
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop(0)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            continue
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            pending.extend(ast.iter_child_nodes(node))
+            continue
+        for name in names:
+            top = name.split(".")[0]
+            if top not in sys.stdlib_module_names and top not in found:
+                found.append(top)
+    return found
+
+
+# Heavy SDKs (groq, supabase, genai, httpx) isme nahi hone chahiye
+APP_EAGER_IMPORTS = app_imports()
+# Ye sirf pehli zaroorat pe import hote hain; report me dikhte hain taaki pata rahe kitna bacha
+DEFERRED_IMPORTS = ["supabase", "groq", "httpx", "google.generativeai", "fpdf"]
+
+DEFAULT_BUDGET_MS = 2500.0
+DEFAULT_TOLERANCE = 0.25
+
+
+# --- OFFLINE IMPORT TIMING ---
+def import_times(modules):
+    # Ek fresh interpreter, sab modules ek saath import; har top-level module ka cumulative time (ms)
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=HERE, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    wanted = set(modules)
+    times = {}
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        raw = parts[2]
+        name = raw.strip()
+        nested = len(raw) - len(raw.lstrip()) > 1
+        if name in wanted and not nested and parts[1].strip().isdigit():
+            times[name] = int(parts[1].strip()) / 1000.0
+    return times
+
+
+def eagerly_loaded(modules, deferred):
+    # Eager imports ke baad kaunse "deferred" SDKs chupke se load ho gaye?
+    code = "import sys; " + "; ".join(f"import {m}" for m in modules) + f"; print(','.join(m for m in {deferred!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True)
+    return [m for m in proc.stdout.strip().split(",") if m]
+
+
+def profile_modules(modules):
+    # Module-wise alag interpreter: shared deps ek hi module ke hisaab me na jayein
+    report = {}
+    for mod in modules:
+        try:
+            report[mod] = import_times([mod]).get(mod)
+        except RuntimeError as e:
+            report[mod] = None
+            print(f"  {mod}: not importable ({e})")
+    return report
+
+
+# --- IN-APP RERUN TIMING ---
+class RerunTimer:
+
+    def __init__(self, window=500):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self):
+        self._local.started = time.perf_counter()
+
+    def finish(self):
+        started = getattr(self._local, "started", None)
+        if started is None:
+            return None
+        self._local.started = None
+        return self.record(time.perf_counter() - started)
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+        return seconds
+
+    def samples(self):
+        with self._lock:
+            return list(self._samples)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"reruns": 0}
+        pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 2)
+        return {"reruns": len(samples), "p50_ms": pick(0.5), "p95_ms": pick(0.95), "max_ms": round(samples[-1] * 1000, 2)}
+
+
+RERUNS = RerunTimer()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import-time and cold-start budget check")
+    ap.add_argument("--check", action="store_true", help="exit non-zero when over budget / baseline")
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="max total for APP eager imports")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed regression vs baseline")
+    ap.add_argument("--save-baseline", action="store_true")
+    args = ap.parse_args(argv)
+
+    print("APP.py eager imports (fresh interpreter, cumulative ms):")
+    eager = profile_modules(APP_EAGER_IMPORTS)
+    for mod, ms in sorted(eager.items(), key=lambda kv: -(kv[1] or 0)):
+        print(f"  {mod:<22} {'-' if ms is None else f'{ms:9.1f}'}")
+    total = import_times([m for m, ms in eager.items() if ms is not None]).values()
+    total_ms = sum(total)
+    print(f"  {'TOTAL (one process)':<22} {total_ms:9.1f}  (budget {args.budget_ms:.0f})")
+
+    print("Deferred until first use:")
+    for mod, ms in profile_modules(DEFERRED_IMPORTS).items():
+        print(f"  {mod:<22} {'-' if ms is None else f'{ms:9.1f}'}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"total_ms": total_ms, "modules": eager}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if not args.check:
+        return 0
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"total {total_ms:.0f} ms > budget {args.budget_ms:.0f} ms")
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            base = json.load(f)
+        limit = base["total_ms"] * (1 + args.tolerance)
+        if total_ms > limit:
+            failures.append(f"total {total_ms:.0f} ms > baseline {base['total_ms']:.0f} ms +{args.tolerance:.0%}")
+    leaked = eagerly_loaded([m for m, ms in eager.items() if ms is not None], DEFERRED_IMPORTS)
+    if leaked:
+        failures.append(f"deferred SDKs imported at startup: {', '.join(leaked)}")
+    for msg in failures:
+        print(f"FAIL: {msg}")
+    if not failures:
+        print("OK: startup within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# TopperGPT Streaming Helpers
+# Provider se tokens aate hi UI me dikhane ke liye: stream reader + incremental section parser.
+
+import time
+
+from metrics import METRICS
+
+
+def _usage(chunk):
+    # OpenAI/DeepSeek: chunk.usage (stream_options.include_usage); Groq: chunk.x_groq.usage aakhri chunk pe
+    usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+    if usage is None:
+        return None
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+
+
+def stream_chat(client, model, prompt, **kwargs):
+    # Groq / DeepSeek dono OpenAI-style chunks bhejte hain, sirf text deltas nikaalo
+    stream = client.chat.completions.create(
+        model=model, messages=[{"role": "user", "content": prompt}], stream=True, **kwargs
+    )
+    usage = None
+    completion_chars = 0
+    try:
+        for chunk in stream:
+            usage = _usage(chunk) or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                completion_chars += len(delta)
+                yield delta
+    finally:
+        # Hedge me haara hua stream beech me chhoda jata hai, HTTP connection turant band karo
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+        if usage is not None:
+            METRICS.inc("llm_prompt_tokens_total", usage[0], model=model, source="provider")
+            METRICS.inc("llm_completion_tokens_total", usage[1], model=model, source="provider")
+        else:
+            # Usage nahi aaya (cancelled loser / purana SDK): ~4 chars per token ka andaza
+            METRICS.inc("llm_prompt_tokens_total", len(prompt) // 4, model=model, source="estimate")
+            METRICS.inc("llm_completion_tokens_total", completion_chars // 4, model=model, source="estimate")
+
+
+class SectionStreamParser:
+    # Chunks me START_SURESHOT / [1_DEF] jaise markers dhoondta hai aur text sahi section me daalta hai.
+    # Marker do chunks ke beech toot sakta hai, isliye buffer ka tail tab tak rok ke rakhte hain
+    # jab tak pakka na ho ki wo kisi marker ki shuruaat nahi hai.
+
+    def __init__(self, markers, end_tokens=()):
+        self.markers = list(markers)
+        self.end_tokens = list(end_tokens)
+        self.sections = {m: "" for m in self.markers}
+        self.current = None
+        self.text = ""
+        self._buf = ""
+        self._tokens = self.markers + self.end_tokens
+        self._hold = max(len(t) for t in self._tokens) - 1
+
+    def feed(self, chunk):
+        self.text += chunk
+        self._buf += chunk
+        touched = set()
+
+        while True:
+            pos, token = self._find_token()
+            if token is None:
+                break
+            self._emit(self._buf[:pos], touched)
+            self._buf = self._buf[pos + len(token):]
+            if token in self.sections:
+                self.current = token
+                touched.add(token)
+            else:
+                # END_* marker: section band, agla START aane tak ka text kisi section ka nahi
+                self.current = None
+
+        # Tail me adha marker ho sakta hai, baaki safe hai
+        safe = len(self._buf) - self._hold
+        if safe > 0:
+            self._emit(self._buf[:safe], touched)
+            self._buf = self._buf[safe:]
+        return touched
+
+    def finish(self):
+        touched = set()
+        self._emit(self._buf, touched)
+        self._buf = ""
+        return touched
+
+    def section(self, marker):
+        return self.sections.get(marker, "").strip()
+
+    def _find_token(self):
+        best_pos, best_token = -1, None
+        for token in self._tokens:
+            pos = self._buf.find(token)
+            if pos != -1 and (best_token is None or pos < best_pos):
+                best_pos, best_token = pos, token
+        return best_pos, best_token
+
+    def _emit(self, text, touched):
+        if text and self.current is not None:
+            self.sections[self.current] += text
+            touched.add(self.current)
+
+
+def render_stream(chunks, parser, on_update, **labels):
+    # Har chunk ke baad jo sections badle unko UI pe refresh karo; poora text return hota hai.
+    # Sirf parse + UI update ka time gina jata hai, network wait nahi.
+    busy = 0.0
+    for delta in chunks:
+        started = time.perf_counter()
+        touched = parser.feed(delta)
+        if touched:
+            on_update(parser, touched)
+        busy += time.perf_counter() - started
+    started = time.perf_counter()
+    touched = parser.finish()
+    if touched:
+        on_update(parser, touched)
+    busy += time.perf_counter() - started
+    METRICS.observe("stream_render_seconds", busy, **labels)
+    return parser.text.strip()
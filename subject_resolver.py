@@ -0,0 +1,186 @@
+# TopperGPT Subject Resolver
+# Student ka typed subject ("BEE", "m2", "physics of measurements") -> knowledge base ka sahi key.
+# Exact hash lookup, token + trigram index aur bounded edit distance; ranked candidates with score.
+# Paper number ("maths 3", "Chemistry-II") naam ke number se alag ho toh wo candidate hi nahi; top do ka score
+# AMBIGUITY_MARGIN ke andar ho toh resolve() None deta hai (galat paper pe paid LLM call se poochhna behtar).
+
+import re
+
+from llm_cache import normalize_subject
+
+# Short forms jo students actually type karte hain -> knowledge file ka subject
+ALIASES = {
+    "ap": "applied physics",
+    "physics": "applied physics",
+    "physics 1": "applied physics",
+    "m1": "applied mathematics 1",
+    "am1": "applied mathematics 1",
+    "maths 1": "applied mathematics 1",
+    "m2": "applied mathematics 2",
+    "am2": "applied mathematics 2",
+    "maths 2": "applied mathematics 2",
+    "maths": "applied mathematics 2",
+    "applied maths": "applied mathematics 2",
+    "chemistry": "applied chemistry",
+    "ac": "applied chemistry",
+    "mechanics": "engineering mechanics",
+    "bee": "basic electrical electronics",
+    "beee": "basic electrical electronics",
+    "pce": "professional and communication ethics",
+    "ethics": "professional and communication ethics",
+    "telecom": "elements of telecommunication",
+    "eot": "elements of telecommunication",
+    "ds": "data structure",
+    "dsa": "data structure",
+    "data structures": "data structure",
+    "eme": "elements of mechanical engineering",
+    "ees": "elements of electrical systems",
+    "evs": "environmental chemistry",
+    "env chem": "environmental chemistry",
+    "ice": "introduction to chemical engineering",
+    "chemical engineering": "introduction to chemical engineering",
+    "semiconductor": "semiconductor physics",
+    "sp": "semiconductor physics",
+    "materials": "engineering materials",
+    "pms": "physics of measurements and sensors",
+    "sensors": "physics of measurements and sensors",
+}
+
+# Token level spelling variants
+TOKEN_FIXES = {
+    "math": "mathematics", "maths": "mathematics", "mathematic": "mathematics",
+    "engg": "engineering", "engineer": "engineering",
+    "chem": "chemistry", "elec": "electrical", "electronic": "electronics",
+    "&": "and", "i": "1", "ii": "2", "iii": "3", "iv": "4",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9&]+")
+AMBIGUITY_MARGIN = 0.05
+
+
+def tokenize(text):
+    return [TOKEN_FIXES.get(t, t) for t in TOKEN_RE.findall(normalize_subject(text))]
+
+
+def numbers(tokens):
+    # Paper / semester number tokens (roman TOKEN_FIXES me pehle hi digits ban chuke)
+    return frozenset(t for t in tokens if t.isdigit())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_levenshtein(a, b, limit):
+    # limit se zyada distance ho toh jaldi nikal jao (limit + 1 return)
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            row_min = min(row_min, cur[j])
+        if row_min > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class SubjectResolver:
+
+    def __init__(self, subjects, aliases=ALIASES):
+        self.subjects = list(subjects)
+        # Har naam (subject + alias) normalized form me -> subject
+        self.names = {}
+        for subject in self.subjects:
+            self.names[" ".join(tokenize(subject))] = subject
+        for alias, subject in aliases.items():
+            if subject in self.subjects:
+                self.names.setdefault(" ".join(tokenize(alias)), subject)
+
+        self.token_index = {}
+        self.trigram_index = {}
+        self.name_trigrams = {}
+        self.name_numbers = {}
+        for name in self.names:
+            self.name_numbers[name] = numbers(name.split())
+            for tok in set(name.split()):
+                self.token_index.setdefault(tok, set()).add(name)
+            grams = trigrams(name)
+            self.name_trigrams[name] = grams
+            for g in grams:
+                self.trigram_index.setdefault(g, set()).add(name)
+
+    def candidates(self, text, limit=5):
+        tokens = tokenize(text)
+        query = " ".join(tokens)
+        if not query:
+            return []
+        scores = {}
+        q_numbers = numbers(tokens)
+
+        def offer(name, score):
+            if q_numbers and self.name_numbers[name] != q_numbers:
+                # "applied mathematics 3" kabhi "applied mathematics 2" nahi, chahe ek hi letter ka farak ho
+                return
+            subject = self.names[name]
+            if score > scores.get(subject, 0.0):
+                scores[subject] = score
+
+        # 1. Exact hash hit
+        if query in self.names:
+            offer(query, 1.0)
+
+        # 2. Token overlap: query ke kitne tokens naam me hain (aur ulta). Number sirf filter hai (offer me),
+        # overlap ka saboot nahi: warna "applied physics 2" ko "applied" + "2" se maths 2 mil jaata
+        q_tokens = set(tokens) - q_numbers
+        for name in set().union(*(self.token_index.get(t, set()) for t in q_tokens)):
+            n_tokens = set(name.split()) - self.name_numbers[name]
+            common = len(q_tokens & n_tokens)
+            if len(n_tokens) == 1 and len(q_tokens) > 1 and name in q_tokens:
+                # "dsa notes" jaisa: akela alias token query me aaya, baaki tokens jitne zyada utna weak
+                offer(name, 0.5 + 0.35 / len(q_tokens))
+            elif common == len(q_tokens):
+                # Poori query naam ke andar hai ("physics of measurements")
+                offer(name, 0.75 + 0.2 * common / len(n_tokens))
+            else:
+                offer(name, 0.6 * common / len(q_tokens) + 0.4 * common / len(n_tokens))
+
+        # 3. Trigram similarity (Dice) sirf un naamon pe jo kam se kam ek trigram share karte hain
+        q_grams = trigrams(query)
+        shared = {}
+        for g in q_grams:
+            for name in self.trigram_index.get(g, ()):
+                shared[name] = shared.get(name, 0) + 1
+        for name, count in shared.items():
+            offer(name, 0.9 * 2 * count / (len(q_grams) + len(self.name_trigrams[name])))
+
+        # 4. Typos: bounded edit distance, sirf lambe naam (chhote alias pe fuzzy ka matlab nahi)
+        if len(query) >= 5 and max(scores.values(), default=0.0) < 0.9:
+            max_dist = 1 if len(query) < 8 else 2
+            for name in self.names:
+                if len(name) < 5:
+                    continue
+                dist = bounded_levenshtein(query, name, max_dist)
+                if dist <= max_dist:
+                    offer(name, 0.95 - 0.1 * dist)
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        return [(subject, round(score, 3)) for subject, score in ranked[:limit]]
+
+    def resolve(self, text, min_score=0.6):
+        ranked = self.candidates(text, limit=2)
+        if not ranked or ranked[0][1] < min_score or self.ambiguous(text, min_score):
+            return None
+        return ranked[0][0]
+
+    def ambiguous(self, text, min_score=0.6, margin=AMBIGUITY_MARGIN):
+        # Top ke margin ke andar wale subjects ("electrical" -> BEE / EES); ek hi ho toh []
+        ranked = self.candidates(text, limit=3)
+        if not ranked or ranked[0][1] < min_score:
+            return []
+        close = [subject for subject, score in ranked if ranked[0][1] - score < margin]
+        return close if len(close) > 1 else []
@@ -0,0 +1,5 @@
+# Tests repo root ke modules seedha import karte hain (APP jaisa flat layout)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
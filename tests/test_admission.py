@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, Overloaded
+
+LIMITS = {"p": {"rpm": 1, "tpm": 10 ** 6}}
+
+
+def wait_until(cond):
+    for _ in range(500):
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def queue_users(ctl, users, admitted, positions):
+    threads = []
+    for user in users:
+        def run(user=user):
+            try:
+                admitted.append((user, ctl.acquire(user, ["p"], 10, on_wait=lambda pos, eta: positions.setdefault(user, pos))))
+            except Overloaded as e:
+                admitted.append((user, e))
+        t = threading.Thread(target=run, daemon=True)
+        t.start()
+        threads.append(t)
+        assert wait_until(lambda: user in positions)
+    return threads
+
+
+def refill(ctl):
+    with ctl._cond:
+        ctl.buckets["p"][0].tokens = 1.0
+        ctl._cond.notify_all()
+
+
+def test_waiting_requests_are_admitted_in_fifo_order():
+    ctl = AdmissionController(LIMITS, poll_interval=0.01)
+    assert ctl.acquire("u0", ["p"], 10) == "p"
+    admitted, positions = [], {}
+    threads = queue_users(ctl, ["u1", "u2", "u3"], admitted, positions)
+    assert positions == {"u1": 1, "u2": 2, "u3": 3}
+    for n in (1, 2, 3):
+        refill(ctl)
+        assert wait_until(lambda: len(admitted) == n)
+    assert admitted == [("u1", "p"), ("u2", "p"), ("u3", "p")]
+    for t in threads:
+        t.join(1)
+    assert ctl.stats()["queued"] == 0 and ctl.admitted == 4
+
+
+def test_new_request_from_same_user_replaces_the_waiting_one():
+    ctl = AdmissionController(LIMITS, poll_interval=0.01)
+    ctl.acquire("u0", ["p"], 10)
+    admitted, positions = [], {}
+    queue_users(ctl, ["u1"], admitted, positions)
+    positions.clear()
+    queue_users(ctl, ["u1"], admitted, positions)
+    assert wait_until(lambda: len(admitted) == 1)
+    assert isinstance(admitted[0][1], Overloaded)
+    assert ctl.stats()["queued"] == 1
+    refill(ctl)
+    assert wait_until(lambda: len(admitted) == 2) and admitted[1] == ("u1", "p")
+
+
+def test_full_queue_rejects_and_timeout_gives_up():
+    ctl = AdmissionController(LIMITS, max_queue=1, poll_interval=0.01)
+    ctl.acquire("u0", ["p"], 10)
+    queue_users(ctl, ["u1"], [], {})
+    with pytest.raises(Overloaded):
+        ctl.acquire("u2", ["p"], 10)
+    assert ctl.rejected == 1
+
+    ctl = AdmissionController(LIMITS, queue_timeout=0.05, poll_interval=0.01)
+    ctl.acquire("u0", ["p"], 10)
+    with pytest.raises(Overloaded):
+        ctl.acquire("u1", ["p"], 10)
+    assert ctl.timed_out == 1 and ctl.stats()["queued"] == 0
+
+
+def test_unknown_provider_is_never_throttled():
+    ctl = AdmissionController(LIMITS)
+    assert [ctl.acquire(f"u{i}", ["unlimited"], 10) for i in range(3)] == ["unlimited"] * 3
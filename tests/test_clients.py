@@ -0,0 +1,8 @@
+from clients import ClientRegistry
+
+
+def test_missing_keys_build_no_client():
+    registry = ClientRegistry({})
+    assert registry.get("deepseek") is None
+    assert registry.get("groq") is None
+    assert registry.stats()["built"] == ["deepseek", "groq"]
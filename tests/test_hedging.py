@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+from hedging import HedgingExecutor
+
+
+def provider(chunks, delay=0.0, closed=None, error=None):
+    def factory():
+        try:
+            time.sleep(delay)
+            if error is not None:
+                raise error
+            yield from chunks
+        finally:
+            if closed is not None:
+                closed.set()
+    return factory
+
+
+def test_hedge_fires_and_first_token_wins():
+    primary_closed = threading.Event()
+    hedger = HedgingExecutor(hedge_delay=0.05)
+    stream = hedger.stream([
+        ("slow", provider(["slow-1", "slow-2"], delay=0.5, closed=primary_closed)),
+        ("fast", provider(["fast-1", "fast-2"])),
+    ])
+    assert list(stream) == ["fast-1", "fast-2"]
+    assert stream.provider == "fast" and stream.hedged
+    # Loser ka pehla token aate hi stream band
+    assert primary_closed.wait(2)
+    assert hedger.stats()["hedges_fired"] == 1 and hedger.stats()["wins"] == {"fast": 1}
+
+
+def test_fast_primary_needs_no_hedge():
+    hedger = HedgingExecutor(hedge_delay=1.0)
+    stream = hedger.stream([("a", provider(["x"])), ("b", provider(["y"]))])
+    assert list(stream) == ["x"]
+    assert stream.provider == "a" and not stream.hedged
+
+
+def test_failure_starts_next_provider_without_waiting_for_the_hedge_delay():
+    hedger = HedgingExecutor(hedge_delay=10.0)
+    started = time.monotonic()
+    stream = hedger.stream([("a", provider([], error=RuntimeError("boom"))), ("b", provider(["ok"]))])
+    assert list(stream) == ["ok"]
+    assert time.monotonic() - started < 2
+    assert hedger.stats()["failures"] == {"a": 1}
+
+
+def test_all_failing_raises_the_last_error():
+    hedger = HedgingExecutor(hedge_delay=10.0)
+    stream = hedger.stream([("a", provider([], error=RuntimeError("a down"))), ("b", provider([]))])
+    with pytest.raises(RuntimeError, match="empty completion"):
+        list(stream)
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from job_pool import DONE, FAILED, RUNNING, Job, JobLimit, JobPool
+
+
+def wait_done(pool, *jobs):
+    # Live set se nikla matlab final status DB me bhi likh diya
+    for job in jobs:
+        for _ in range(500):
+            if job.id not in pool._live:
+                break
+            time.sleep(0.01)
+    return [pool.get(job.id).status for job in jobs]
+
+
+def test_backlog_position_while_all_workers_are_busy():
+    pool = JobPool(":memory:", max_workers=1, per_user=5)
+    release, started = threading.Event(), threading.Event()
+
+    def blocking(job):
+        started.set()
+        release.wait(5)
+        return "first"
+
+    first = pool.submit("a", "predict", "1", "one", blocking)
+    assert started.wait(5)
+    second = pool.submit("b", "predict", "2", "two", lambda job: "second")
+    third = pool.submit("c", "predict", "3", "three", lambda job: "third")
+    assert [pool.position(j.id) for j in (first, second, third)] == [None, 1, 2]
+    assert pool.stats()["queued"] == 2 and pool.stats()["running"] == 1
+
+    release.set()
+    assert wait_done(pool, first, second, third) == [DONE] * 3
+    assert pool.position(third.id) is None
+    assert pool.stats()["queued"] == 0
+
+
+def test_same_key_joins_and_per_user_limit():
+    pool = JobPool(":memory:", per_user=1)
+    release = threading.Event()
+    job = pool.submit("a", "predict", "k", "one", lambda job: release.wait(5) and "done")
+    assert pool.submit("a", "predict", "k", "again", lambda job: "never") is job
+    with pytest.raises(JobLimit):
+        pool.submit("a", "research", "other", "two", lambda job: "x")
+    release.set()
+    assert wait_done(pool, job) == [DONE]
+
+
+def test_results_survive_restart_and_interrupted_jobs_fail(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    pool = JobPool(path)
+    job = pool.submit("a", "predict", "k", "plan", lambda job: "battle plan")
+    assert wait_done(pool, job) == [DONE]
+    # Process crash ke waqt chal raha job: DB me RUNNING hi reh gaya
+    stuck = Job("stuck", "a", "research", "laser", status=RUNNING, updated_at=time.time() - 3600)
+    pool._save(stuck)
+
+    restarted = JobPool(path, stale_after=600.0)
+    assert restarted.get(job.id).result == "battle plan"
+    assert restarted.latest("a", "predict").id == job.id
+    assert restarted.get("stuck").status == FAILED
+
+
+def test_old_jobs_are_pruned_on_start(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    pool = JobPool(path, ttl_seconds=60)
+    pool._save(Job("old", "a", "predict", "t", status=DONE, result="x", created_at=time.time() - 120))
+    pool._save(Job("new", "a", "predict", "t", status=DONE, result="y"))
+    restarted = JobPool(path, ttl_seconds=60)
+    assert restarted.get("old") is None
+    assert restarted.get("new").result == "y"
+    assert restarted.latest("a", "predict").id == "new"
@@ -0,0 +1,55 @@
+import llm_cache
+from llm_cache import ResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def make_cache(monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    return ResponseCache(":memory:", **kwargs), clock
+
+
+def test_hit_needs_same_evidence_and_version(monkeypatch):
+    cache, _ = make_cache(monkeypatch)
+    cache.put("predict", "Applied  Physics", "ev1", "v1", "plan")
+    assert cache.get("predict", "applied physics", "ev1", "v1") == "plan"
+    assert cache.get("predict", "applied physics", "ev1", "v2") is None
+    # Stale entry get pe hi delete
+    assert cache.get("predict", "applied physics", "ev1", "v1") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache, clock = make_cache(monkeypatch, ttl_seconds=60)
+    cache.put("predict", "physics", "ev", "v1", "plan")
+    clock.now += 59
+    assert cache.get("predict", "physics", "ev", "v1") == "plan"
+    clock.now += 2
+    assert cache.get("predict", "physics", "ev", "v1") is None
+
+
+def test_least_recently_used_entry_is_evicted_first(monkeypatch):
+    cache, clock = make_cache(monkeypatch, max_entries=2)
+    for subject in ("a", "b"):
+        cache.put("predict", subject, "ev", "v1", subject * 10)
+        clock.now += 1
+    assert cache.get("predict", "a", "ev", "v1") == "a" * 10
+    clock.now += 1
+    cache.put("predict", "c", "ev", "v1", "c" * 10)
+    assert sorted(cache.subjects("predict")) == ["a", "c"]
+
+
+def test_byte_cap_evicts_until_under_limit(monkeypatch):
+    cache, clock = make_cache(monkeypatch, max_bytes=25)
+    for subject in ("a", "b", "c"):
+        cache.put("predict", subject, "ev", "v1", subject * 10)
+        clock.now += 1
+    assert sorted(cache.subjects("predict")) == ["b", "c"]
+    assert cache.stats()["bytes"] == 20
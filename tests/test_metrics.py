@@ -0,0 +1,63 @@
+import json
+import time
+
+import pytest
+
+from metrics import Metrics
+
+
+def counter(metrics, name, **labels):
+    for c in metrics.snapshot()["counters"]:
+        if c["name"] == name and c["labels"] == labels:
+            return c["value"]
+    return None
+
+
+def test_span_records_outcome_and_buckets():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.observe("llm_seconds", 0.05, provider="groq")
+    metrics.observe("llm_seconds", 5.0, provider="groq")
+    with pytest.raises(ValueError):
+        with metrics.span("job_seconds", kind="predict"):
+            raise ValueError("bad")
+    hists = {(h["name"], tuple(sorted(h["labels"].items()))): h for h in metrics.snapshot()["histograms"]}
+    llm = hists[("llm_seconds", (("provider", "groq"),))]
+    assert llm["count"] == 2 and llm["buckets"] == {"0.1": 1, "1.0": 0, "+Inf": 1}
+    assert ("job_seconds", (("kind", "predict"), ("outcome", "ValueError"))) in hists
+
+
+def test_event_counts_by_label_and_keeps_detail_out_of_the_counter():
+    metrics = Metrics()
+    metrics.event("llm_fallback", detail="timeout after 30s", provider="groq", reason="Timeout")
+    metrics.event("llm_fallback", detail="other text", provider="groq", reason="Timeout")
+    assert counter(metrics, "llm_fallback_total", provider="groq", reason="Timeout") == 2
+
+
+def test_prometheus_text_has_cumulative_buckets_and_collector_gauges():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.inc("jobs_total", kind="predict")
+    metrics.observe("llm_seconds", 0.05)
+    metrics.observe("llm_seconds", 0.5)
+    metrics.register("jobs", lambda: {"queued": 2, "wins": {"groq": 3}, "name": "skip"})
+    metrics.register("broken", lambda: 1 / 0)
+    text = metrics.render_prometheus()
+    assert 'topper_jobs_total{kind="predict"} 1' in text
+    assert 'topper_llm_seconds_bucket{le="1.0"} 2' in text
+    assert 'topper_llm_seconds_bucket{le="+Inf"} 2' in text
+    assert "topper_jobs_queued 2" in text
+    assert 'topper_jobs_wins{key="groq"} 3' in text
+    assert 'topper_broken_collector_errors{error="ZeroDivisionError"} 1' in text
+    assert "skip" not in text
+
+
+def test_jsonl_sink_writes_events(tmp_path):
+    metrics = Metrics()
+    path = tmp_path / "events.jsonl"
+    metrics.log_to(str(path))
+    metrics.event("job_error", detail="boom", kind="predict")
+    for _ in range(200):
+        if path.exists() and path.read_text():
+            break
+        time.sleep(0.01)
+    record = json.loads(path.read_text().splitlines()[0])
+    assert record["event"] == "job_error" and record["detail"] == "boom" and record["kind"] == "predict"
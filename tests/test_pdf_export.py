@@ -0,0 +1,24 @@
+import pytest
+
+from pdf_export import pdf_text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("(x⁴ + y⁴)dx − xy³ dy", "(x^4 + y^4)dx - xy^3 dy"),
+    ("∫₀^∞ x e^(−x²) dx", "integral_0^inf x e^(-x^2) dx"),
+    ("r dθ", "r dtheta"),
+    ("λ = h/p", "lambda = h/p"),
+    ("Σ aᵢ", "Sigma a_i"),
+    ("eⁿ⁺¹", "e^(n+1)"),
+])
+def test_maths_is_transliterated_not_dropped(text, expected):
+    assert pdf_text(text) == expected
+
+
+def test_output_is_latin1_and_keeps_every_maths_token():
+    text = "**Q1.** Solve (x⁴ + y⁴)dx − xy³ dy = 0 and ∫₀^∞ x e^(−x²) dx; find λ, ω, Δ for dθ"
+    out = pdf_text(text)
+    out.encode("latin-1")
+    for token in ("x^4", "y^4", "xy^3", "integral_0^inf", "e^(-x^2)", "lambda", "omega", "Delta", "dtheta"):
+        assert token in out
+    assert "**" not in out
@@ -0,0 +1,159 @@
+from profile_service import LEGACY_COLUMNS, PROFILE_COLUMNS, ProfileService
+
+
+class APIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"api error {code}")
+        self.code = code
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class Call:
+    def __init__(self, run):
+        self.run = run
+
+    def execute(self):
+        return self.run()
+
+
+class Table:
+    def __init__(self, client):
+        self.client = client
+        self.values = None
+        self.columns = None
+
+    def select(self, columns):
+        self.columns = columns
+        return self
+
+    def limit(self, n):
+        return self
+
+    def update(self, values):
+        self.values = values
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        if self.columns is not None:
+            self.client.selects.append(self.columns)
+            if "session_gen" in self.columns and self.client.legacy:
+                raise APIError("42703")
+            row = {"email": "a@b.com", "full_name": "A", "free_trials_left": self.client.trials, "is_pro": False,
+                   "session_gen": self.client.session_gen}
+            return Result([{c: row[c] for c in self.columns.split(",")}])
+        self.client.updates.append(self.values)
+        return Result([self.values])
+
+
+class FakeSupabase:
+    # rpc_errors: pehle itne RPC calls ye errors uthayenge, phir decrement chalega
+    def __init__(self, rpc_errors=(), trials=5, legacy=False):
+        self.rpc_errors = list(rpc_errors)
+        self.legacy = legacy
+        self.trials = trials
+        self.session_gen = 0
+        self.rpc_calls = 0
+        self.updates = []
+        self.selects = []
+
+    def rpc(self, name, params):
+        def run():
+            self.rpc_calls += 1
+            if self.rpc_errors:
+                raise self.rpc_errors.pop(0)
+            if name == "bump_session_gen":
+                self.session_gen += 1
+                return Result(self.session_gen)
+            self.trials -= 1
+            return Result(self.trials)
+        return Call(run)
+
+    def table(self, name):
+        return Table(self)
+
+
+def test_transient_rpc_errors_are_retried_without_absolute_update():
+    db = FakeSupabase([TimeoutError("read timeout"), APIError("503")])
+    service = ProfileService(db, write_backoff=0.0, path=":memory:")
+    service.deduct_trial("a@b.com", current=5)
+    assert service.flush()
+    assert db.rpc_calls == 3
+    assert db.trials == 4
+    assert db.updates == []
+    assert service.stats()["write_errors"] == 0
+
+
+def test_missing_rpc_falls_back_to_absolute_update():
+    db = FakeSupabase([APIError("PGRST202")])
+    service = ProfileService(db, write_backoff=0.0, path=":memory:")
+    service.deduct_trial("a@b.com", current=5)
+    assert service.flush()
+    assert db.updates == [{"free_trials_left": 4}]
+
+
+def test_failing_write_waits_in_the_retry_heap_without_blocking_others():
+    db = FakeSupabase([TimeoutError("read timeout")])
+    service = ProfileService(db, write_backoff=60.0, path=":memory:")
+    service.deduct_trial("a@b.com", current=5)
+    service.deduct_trial("c@d.com", current=5)
+    assert not service.flush(timeout=0.5)
+    assert db.rpc_calls == 2 and db.trials == 4
+    assert service.stats()["retrying_writes"] == 1
+
+
+def test_write_past_deadline_counts_a_write_error():
+    db = FakeSupabase([TimeoutError("read timeout")])
+    service = ProfileService(db, write_deadline=0, path=":memory:")
+    service.deduct_trial("a@b.com", current=5)
+    assert service.flush()
+    assert db.rpc_calls == 1 and db.updates == []
+    assert service.stats()["write_errors"] == 1
+
+
+def test_permission_denied_is_fatal_and_refresh_keeps_the_local_count():
+    db = FakeSupabase([APIError("42501")])
+    service = ProfileService(db, write_backoff=0.0, path=":memory:")
+    service.deduct_trial("a@b.com", current=5)
+    assert service.flush()
+    assert db.rpc_calls == 1 and db.trials == 5
+    assert service.stats()["fatal_writes"] == 1
+    # DB abhi bhi 5 bolta hai, par pending decrement refresh me ghata ke dikhta hai
+    assert service.get("a@b.com", fresh=True)["free_trials_left"] == 4
+
+
+def test_pending_decrements_are_replayed_after_restart(tmp_path):
+    path = str(tmp_path / "trial_writes.sqlite")
+    service = ProfileService(FakeSupabase([APIError("42501")]), path=path)
+    service.deduct_trial("a@b.com", current=5)
+    assert service.flush()
+
+    # Pichli process ab nahi hai
+    service._conn.execute("UPDATE trial_writes SET owner = ?", (2 ** 22 + 1,))
+    db = FakeSupabase()
+    restarted = ProfileService(db, path=path)
+    assert restarted.flush()
+    assert db.rpc_calls == 1 and db.trials == 4
+    assert ProfileService(FakeSupabase(), path=path).stats()["pending_writes"] == 0
+
+
+def test_revoke_sessions_bumps_the_cached_generation():
+    db = FakeSupabase()
+    service = ProfileService(db, path=":memory:")
+    assert service.get("a@b.com")["session_gen"] == 0
+    assert service.revoke_sessions("a@b.com") == 1
+    assert service.peek("a@b.com")["session_gen"] == 1
+
+
+def test_missing_session_gen_column_falls_back_to_legacy_columns():
+    db = FakeSupabase(legacy=True)
+    service = ProfileService(db, path=":memory:")
+    assert "session_gen" not in service.get("a@b.com")
+    assert service.get("a@b.com", fresh=True)["free_trials_left"] == 5
+    assert db.selects == [PROFILE_COLUMNS, LEGACY_COLUMNS, LEGACY_COLUMNS]
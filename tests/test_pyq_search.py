@@ -0,0 +1,30 @@
+import knowledge_db
+from pyq_search import PastPaperSearch
+from pyq_store import PYQRecord
+
+
+def make_search(tmp_path):
+    path = str(tmp_path / "kb.sqlite")
+    conn = knowledge_db.connect(path, readonly=False)
+    conn.execute("INSERT INTO meta (key, value) VALUES ('kb_id', 'test')")
+    knowledge_db.add_records(conn, [
+        PYQRecord("applied physics", 1, "DEC 2024", None, "Fermi level in intrinsic semiconductor", 5, ()),
+        PYQRecord("applied physics", 1, "MAY 2025", None, "Fermi level lies midway in intrinsic semiconductor", 3, ()),
+        PYQRecord("applied physics", 1, "MAY 2025", None, "He-Ne laser construction and working", 5, ()),
+    ])
+    conn.close()
+    return PastPaperSearch(path)
+
+
+def test_all_terms_match_counts_as_asked(tmp_path):
+    search = make_search(tmp_path)
+    hits = search.search("fermi level")
+    assert len(hits) == 2 and not any(h.related for h in hits)
+    assert search.summary(hits) == {"count": 2, "sessions": ["DEC 2024", "MAY 2025"], "max_marks": 5}
+
+
+def test_any_term_fallback_is_related_and_not_counted(tmp_path):
+    search = make_search(tmp_path)
+    hits = search.search("laser fermi")
+    assert len(hits) == 3 and all(h.related for h in hits)
+    assert search.summary(hits) == {"count": 0, "sessions": [], "max_marks": 0}
@@ -0,0 +1,45 @@
+import knowledge_db
+from evidence_ranker import EvidenceRanker
+from pyq_digest import PYQDigest
+from pyq_store import PYQRecord, PYQStore, load_store
+
+
+TOPICS = ("laser", "optical fiber", "diode")
+
+
+def make_kb(path, subjects=3):
+    conn = knowledge_db.connect(str(path), readonly=False)
+    conn.execute("INSERT INTO meta (key, value) VALUES ('kb_id', 'test')")
+    records = [
+        PYQRecord(f"subject {s}", 1, session, None, f"Explain {TOPICS[q]} of subject {s}", 5, ())
+        for s in range(subjects) for session in ("MAY 2025", "DEC 2025") for q in range(3)
+    ]
+    knowledge_db.add_records(conn, records)
+    conn.close()
+    return str(path)
+
+
+def test_store_holds_only_counts_until_a_subject_is_read(tmp_path):
+    store = load_store(make_kb(tmp_path / "kb.sqlite"))
+    assert store.subjects() == ["subject 0", "subject 1", "subject 2"]
+    assert len(store) == 18 and store.count("subject 1") == 6
+    assert store.stats()["cached_subjects"] == 0
+
+    recs = store.records("subject 1")
+    assert [r.session for r in recs] == ["MAY 2025"] * 3 + ["DEC 2025"] * 3
+    assert store.records("subject 1") is recs
+    assert store.records("unknown") == []
+    assert store.sessions("subject 1") == ["MAY 2025", "DEC 2025"]
+    assert [r.text for r in store.query(subject="subject 2", session="DEC 2025", keyword="fiber")] == [
+        "Explain optical fiber of subject 2"]
+
+
+def test_subject_data_is_bounded_by_the_lru(tmp_path):
+    store = PYQStore(knowledge_db.connect(make_kb(tmp_path / "kb.sqlite", subjects=5)), max_subjects=2)
+    ranker = EvidenceRanker(store, PYQDigest(store, max_subjects=2), max_subjects=2)
+    for subject in store.subjects():
+        assert ranker.build_evidence(subject).startswith("--- MU PYQ EVIDENCE")
+    assert store.stats()["cached_subjects"] == 2
+    assert ranker.digest.stats()["cached_digests"] == 2
+    # Evict hua subject dobara maango toh file se wapas
+    assert len(store.records("subject 0")) == 6
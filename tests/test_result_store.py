@@ -0,0 +1,45 @@
+from result_store import ResultStore, result_key
+
+
+def test_same_text_is_stored_once():
+    store = ResultStore()
+    keys = [store.put("battle plan") for _ in range(3)]
+    assert keys == [result_key("battle plan")] * 3
+    assert store.get(keys[0]) == "battle plan"
+    stats = store.stats()
+    assert stats["entries"] == 1 and stats["puts"] == 3 and stats["dedup_ratio"] == 3.0
+
+
+def test_lru_eviction_over_the_byte_cap():
+    store = ResultStore(max_bytes=25)
+    a, b = store.put("a" * 10), store.put("b" * 10)
+    assert store.get(a) == "a" * 10
+    c = store.put("c" * 10)
+    assert store.get(b) is None
+    assert store.get(a) == "a" * 10 and store.get(c) == "c" * 10
+    assert store.stats()["evicted"] == 1 and store.stats()["bytes"] == 20
+
+
+def test_oversized_entry_is_kept_alone():
+    store = ResultStore(max_bytes=5)
+    store.put("small")
+    big = store.put("x" * 50)
+    assert store.get(big) == "x" * 50 and store.stats()["entries"] == 1
+
+
+def test_parsed_result_is_cached_with_the_entry():
+    store = ResultStore(max_bytes=15)
+    calls = []
+
+    def parse(text):
+        calls.append(text)
+        return text.upper()
+
+    key = store.put("plan one")
+    assert store.parsed(key, parse) == "PLAN ONE"
+    assert store.parsed(key, parse) == "PLAN ONE"
+    assert calls == ["plan one"]
+    store.put("plan two")
+    # Entry evict => parsed bhi gaya, key ab miss
+    assert store.parsed(key, parse) is None
+    assert store.parsed(None, parse) is None
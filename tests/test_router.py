@@ -0,0 +1,47 @@
+from router import OPEN, ProviderRouter
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def choice_for(router, provider, route="predict"):
+    return next(c for c in router.routes[route] if c.provider == provider)
+
+
+def calls_for(router, route="predict"):
+    calls = []
+
+    def make(choice):
+        def factory():
+            calls.append(choice.provider)
+            yield "ok"
+        return factory
+    return calls, [(name, run) for name, run in router.attempts(route, make)]
+
+
+def test_open_provider_gets_no_call_while_closed_one_is_available():
+    router = ProviderRouter(cooldown=60.0)
+    router.record_failure(choice_for(router, "deepseek"), RateLimited("slow down"))
+    assert router._health[choice_for(router, "deepseek").key].state == OPEN
+
+    calls, attempts = calls_for(router)
+    assert [name for name, _ in attempts] == ["groq"]
+    for _, run in attempts:
+        list(run())
+    assert calls == ["groq"]
+
+
+def test_all_open_still_returns_providers():
+    router = ProviderRouter(cooldown=60.0)
+    for provider in ("deepseek", "groq"):
+        router.record_failure(choice_for(router, provider), RateLimited("slow down"))
+    assert [c.provider for c in router.plan("predict")] == ["deepseek", "groq"]
+
+
+def test_in_flight_probe_is_not_retried_while_closed_one_is_available():
+    router = ProviderRouter(cooldown=0.0)
+    router.record_failure(choice_for(router, "deepseek"), RateLimited("slow down"))
+    # Cooldown khatam: pehla plan probe deta hai, doosra (probe abhi chal raha) nahi
+    assert [c.provider for c in router.plan("predict")] == ["deepseek", "groq"]
+    assert [c.provider for c in router.plan("predict")] == ["groq"]
@@ -0,0 +1,33 @@
+from session_tokens import SessionTokens
+
+DAY = 24 * 3600
+PROFILE = {"email": "a@b.com", "full_name": "A", "free_trials_left": 7, "is_pro": False, "session_gen": 3}
+
+
+def test_round_trip_carries_generation_and_login_time():
+    tokens = SessionTokens("secret", ttl_seconds=DAY, max_age_seconds=14 * DAY)
+    profile, issued_at, auth_time = tokens.verify(tokens.issue(PROFILE, now=1000.0), now=2000.0)
+    assert profile == {"email": "a@b.com", "full_name": "A", "free_trials_left": 7, "is_pro": False, "session_gen": 3}
+    assert (issued_at, auth_time) == (1000, 1000)
+
+
+def test_tampered_and_expired_tokens_are_rejected():
+    tokens = SessionTokens("secret", ttl_seconds=DAY)
+    token = tokens.issue(PROFILE, now=0.0)
+    assert tokens.verify(token[:-2] + "xx", now=10.0) is None
+    assert SessionTokens("other").verify(token, now=10.0) is None
+    assert tokens.verify(token, now=DAY + 1) is None
+    assert tokens.stats()["rejected"] == 2
+
+
+def test_reissue_cannot_extend_past_max_age():
+    tokens = SessionTokens("secret", ttl_seconds=DAY, max_age_seconds=3 * DAY)
+    token, now = tokens.issue(PROFILE, now=0.0), 0.0
+    # Roz aadhe TTL pe re-issue, login time wahi
+    while True:
+        now += DAY / 2 + 1
+        restored = tokens.verify(token, now=now)
+        if restored is None:
+            break
+        token = tokens.issue(restored[0], now=now, auth_time=restored[2])
+    assert 3 * DAY <= now < 3 * DAY + DAY
@@ -0,0 +1,58 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight, prompt_key
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        release.wait(5)
+        return "plan"
+
+    with ThreadPoolExecutor(5) as pool:
+        futures = [pool.submit(flight.do, prompt_key("predict", "same prompt"), generate) for _ in range(5)]
+        while flight.stats()["suppressed"] < 4:
+            time.sleep(0.01)
+        release.set()
+        results = [f.result(5) for f in futures]
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert {value for value, _ in results} == {"plan"}
+    assert flight.in_flight() == 0
+
+
+def test_leader_error_reaches_followers_and_key_is_freed():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("provider down")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, "k", failing)
+        assert started.wait(5)
+        follower = pool.submit(flight.do, "k", lambda: "never called")
+        while flight.stats()["suppressed"] < 1:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="provider down"):
+                future.result(5)
+    # Agli call naya leader banti hai
+    assert flight.do("k", lambda: "retry") == ("retry", False)
+
+
+def test_different_prompts_do_not_coalesce():
+    assert prompt_key("predict", "a") != prompt_key("predict", "b")
+    assert prompt_key("predict", "a") != prompt_key("research", "a")
@@ -0,0 +1,21 @@
+from startup_profiler import APP_EAGER_IMPORTS, DEFERRED_IMPORTS, app_imports
+
+
+def test_eager_imports_follow_app_py():
+    assert {"pyq_search", "session_tokens", "knowledge", "streamlit"} <= set(APP_EAGER_IMPORTS)
+    assert "time" not in APP_EAGER_IMPORTS
+    assert not set(APP_EAGER_IMPORTS) & {m.split(".")[0] for m in DEFERRED_IMPORTS}
+
+
+def test_function_level_imports_are_lazy(tmp_path):
+    app = tmp_path / "APP.py"
+    app.write_text(
+        "import os\n"
+        "import streamlit as st\n"
+        "from pdf_export import PDFExporter\n"
+        "def init():\n"
+        "    from supabase import create_client\n"
+        "with st.sidebar:\n"
+        "    import job_pool\n"
+    )
+    assert app_imports(str(app)) == ["streamlit", "pdf_export", "job_pool"]
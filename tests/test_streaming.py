@@ -0,0 +1,45 @@
+from output_parser import PREDICT_END_TOKENS, PREDICT_MARKERS, RESEARCH_MARKERS
+from streaming import SectionStreamParser, render_stream
+
+TEXT = "intro START_SURESHOT Q1 laser END_SURESHOT gap START_JUGAAD Q2 diode END_JUGAAD START_PLAN day 1"
+
+
+def feed_all(chunks, markers=PREDICT_MARKERS, end_tokens=PREDICT_END_TOKENS):
+    parser = SectionStreamParser(markers, end_tokens)
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.finish()
+    return parser
+
+
+def test_marker_split_across_chunks_never_leaks_into_a_section():
+    parser = feed_all(["intro START_SUR", "ESHOT Q1 laser END_SU", "RESHOT gap START_JUGAAD Q2 diode END_JUGAAD START_PLAN day 1"])
+    assert parser.section("START_SURESHOT") == "Q1 laser"
+    assert parser.section("START_JUGAAD") == "Q2 diode"
+    assert parser.section("START_PLAN") == "day 1"
+
+
+def test_char_by_char_matches_single_chunk():
+    whole = feed_all([TEXT])
+    by_char = feed_all(list(TEXT))
+    assert by_char.sections == whole.sections
+    assert by_char.text == TEXT
+
+
+def test_possible_marker_prefix_is_held_until_finish():
+    parser = SectionStreamParser(RESEARCH_MARKERS)
+    parser.feed("[1_DEF] Laser is light [")
+    # "[" kisi marker ki shuruaat ho sakti hai: abhi section me nahi
+    assert parser.sections["[1_DEF]"] == " Laser is l"
+    parser.feed("2_BRK] parts")
+    assert parser.section("[1_DEF]") == "Laser is light"
+    assert parser.finish() == {"[2_BRK]"}
+    assert parser.section("[2_BRK]") == "parts"
+
+
+def test_render_stream_reports_touched_sections():
+    updates = []
+    out = render_stream(["START_SURESHOT Q1 ", "laser END_SURESHOT"], SectionStreamParser(PREDICT_MARKERS, PREDICT_END_TOKENS),
+                        lambda p, touched: updates.append(set(touched)))
+    assert out == "START_SURESHOT Q1 laser END_SURESHOT"
+    assert set().union(*updates) == {"START_SURESHOT"}
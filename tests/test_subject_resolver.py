@@ -0,0 +1,50 @@
+import pytest
+
+from subject_resolver import SubjectResolver
+
+SUBJECTS = [
+    "applied physics", "applied mathematics 1", "applied chemistry", "engineering mechanics",
+    "basic electrical electronics", "professional and communication ethics", "elements of telecommunication",
+    "data structure", "elements of mechanical engineering", "elements of electrical systems",
+    "environmental chemistry", "introduction to chemical engineering", "applied mathematics 2",
+    "semiconductor physics", "engineering materials", "physics of measurements and sensors",
+]
+RESOLVER = SubjectResolver(SUBJECTS)
+
+
+@pytest.mark.parametrize("text", [
+    "applied mathematics 3", "Applied Chemistry-II", "chemistry 2", "applied physics 2",
+])
+def test_wrong_paper_number_does_not_resolve(text):
+    assert RESOLVER.resolve(text) is None
+
+
+@pytest.mark.parametrize("text, choices", [
+    ("electrical", ["basic electrical electronics", "elements of electrical systems"]),
+])
+def test_near_tie_is_ambiguous(text, choices):
+    assert RESOLVER.resolve(text) is None
+    assert RESOLVER.ambiguous(text) == choices
+
+
+def test_bare_roman_numeral_does_not_resolve():
+    assert RESOLVER.resolve("i") is None
+
+
+@pytest.mark.parametrize("text, subject", [
+    ("m2", "applied mathematics 2"),
+    ("Applied Mathematics II", "applied mathematics 2"),
+    ("maths 1", "applied mathematics 1"),
+    ("mathematics 2", "applied mathematics 2"),
+    ("BEE", "basic electrical electronics"),
+    ("aplied physics", "applied physics"),
+    ("physics of measurements", "physics of measurements and sensors"),
+    ("dsa notes", "data structure"),
+])
+def test_known_forms_resolve(text, subject):
+    assert RESOLVER.resolve(text) == subject
+    assert RESOLVER.ambiguous(text) == []
+
+
+def test_candidates_honour_limit_after_typo_pass():
+    assert len(RESOLVER.candidates("aplied physics", limit=3)) == 3
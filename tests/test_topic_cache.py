@@ -0,0 +1,67 @@
+import pytest
+
+from topic_cache import TopicCache, topic_key
+
+
+class MemoryCache:
+    # ResponseCache ka chhota stand-in: (kind, subject) -> value
+    def __init__(self):
+        self.rows = {}
+
+    def subjects(self, kind):
+        return [s for k, s in self.rows if k == kind]
+
+    def get(self, kind, subject, evidence, version):
+        return self.rows.get((kind, subject))
+
+    def put(self, kind, subject, evidence, version, value):
+        self.rows[(kind, subject)] = value
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Euler's Method", "Euler's theorem"),
+    ("Newton's method", "Newton's law"),
+    ("Stokes theorem", "Stokes law"),
+    ("Gauss law", "Gauss theorem"),
+    ("Fermi Dirac distribution", "Fermi level"),
+    ("Pascal's principle", "Pascal's law"),
+    ("infix to postfix", "postfix to infix"),
+    ("stack using queue", "queue using stack"),
+    ("convert decimal into binary", "convert binary into decimal"),
+])
+def test_different_topics_get_different_keys(a, b):
+    assert topic_key(a) != topic_key(b)
+
+
+@pytest.mark.parametrize("a, b", [
+    ("PN Diode", "p-n junction diode"),
+    ("pn-diode working", "PN junction diode"),
+    ("Transformer working principle", "transformer"),
+    ("AM", "amplitude modulation"),
+    ("AM vs FM", "amplitude modulation vs frequency modulation"),
+    ("A.C. motor", "AC motor"),
+    ("Infix to Postfix conversion", "infix to postfix conversions"),
+    ("how to implement stack using queue", "implement stack using queues"),
+])
+def test_same_topic_same_key(a, b):
+    assert topic_key(a) == topic_key(b)
+
+
+def test_abbreviations_need_context():
+    assert "amplitude" not in topic_key("I am confused")
+    assert topic_key("write a C program") == "c program write"
+    assert topic_key("am modulation index") == topic_key("amplitude modulation index")
+
+
+def test_reversed_direction_is_not_a_fuzzy_hit():
+    topics = TopicCache(MemoryCache(), "research-test")
+    topics.put("infix to postfix conversion", "infix report")
+    assert topics.get("postfix to infix conversion")[0] is None
+    assert topics.get("infix to postfx conversion")[0] == "infix report"
+
+
+def test_cached_method_report_not_served_for_theorem():
+    topics = TopicCache(MemoryCache(), "research-test")
+    topics.put("Euler's method", "numerical methods report")
+    assert topics.get("Euler's theorem")[0] is None
+    assert topics.get("euler method")[0] == "numerical methods report"
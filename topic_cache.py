@@ -0,0 +1,281 @@
+# TopperGPT Topic Cache
+# "PN Diode", "p-n junction diode" aur "pn-diode working" ek hi report hai. Query ko canonical key me todte hain
+# (case / punctuation / stopwords / synonyms / plurals), exact key pe seedha hit; typo / word order wale
+# near-duplicates ke liye char 3-gram MinHash + LSH se candidates, phir token-level verification.
+# Sab CPU pe, koi embedding service nahi.
+# Jo words topic badal dete hain (theorem / method / law / principle: "Euler's method" != "Euler's theorem") key me
+# rehte hain. Ek hisse ke andar word order se farak nahi, par direction words ke aar-paar order rehta hai
+# ("infix to postfix" != "postfix to infix", "stack using queue" != "queue using stack").
+# Key banane ka tarika badlo toh TOPIC_KEY_VERSION bump karo, purani keys pe bane reports miss ho jayenge.
+
+import random
+import re
+import threading
+import zlib
+
+from llm_cache import normalize_subject
+from metrics import METRICS
+from subject_resolver import bounded_levenshtein, trigrams
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+TOPIC_KEY_VERSION = 3
+
+# Phrase -> canonical phrase (normalize ke baad, space separated)
+SYNONYMS = {
+    "p n junction diode": "pn diode", "pn junction diode": "pn diode", "p n junction": "pn diode",
+    "pn junction": "pn diode", "junction diode": "pn diode", "p n diode": "pn diode",
+    "semiconductor diode": "pn diode",
+    "bipolar junction transistor": "bjt", "junction field effect transistor": "jfet",
+    "metal oxide semiconductor field effect transistor": "mosfet", "field effect transistor": "fet",
+    "light amplification by stimulated emission of radiation": "laser",
+    "optical fibre": "optical fiber", "fibre optic": "optical fiber", "fiber optic": "optical fiber", "ofc": "optical fiber",
+    "bst": "binary search tree", "dll": "doubly linked list", "sll": "singly linked list",
+    "osi reference model": "osi model", "open system interconnection": "osi",
+    "am": "amplitude modulation", "fm": "frequency modulation",
+    "rk method": "runge kutta method", "rk4": "runge kutta method", "rk 4": "runge kutta method",
+    "ic engine": "internal combustion engine", "4 stroke": "four stroke", "2 stroke": "two stroke",
+    "vm": "virtual memory", "os": "operating system", "dbms": "database management system",
+    "max power transfer": "maximum power transfer", "mpt": "maximum power transfer",
+    "kvl": "kirchhoff voltage law", "kcl": "kirchhoff current law",
+    "d c": "dc", "a c": "ac",
+    # tab7 hamesha working principle deta hai; akela "principle" (Pascal's principle) topic ka hissa hai
+    "working principle": "working",
+}
+# Chhote abbreviations jo aam English / doosre matlab me bhi aate hain ("I am confused", "write a C program"):
+# sirf tab expand jab poori query wahi ho ya saath me us field ka koi word ho
+_SIGNALS = {"modulation", "demodulation", "signal", "wave", "carrier", "radio", "transmitter", "receiver",
+            "sideband", "index", "am", "fm", "broadcast", "bandwidth"}
+_MACHINES = {"motor", "generator", "circuit", "supply", "current", "voltage", "machine", "power", "bridge",
+             "source", "series", "shunt", "ac", "dc"}
+SYNONYM_CONTEXT = {
+    "am": _SIGNALS, "fm": _SIGNALS,
+    "os": {"process", "scheduling", "kernel", "deadlock", "paging", "memory", "thread", "linux", "windows", "file"},
+    "vm": {"paging", "page", "memory", "segmentation", "thrashing", "os", "swap", "operating"},
+    "ofc": {"fiber", "fibre", "optical", "cable", "mode", "attenuation", "light", "communication"},
+    "a c": _MACHINES, "d c": _MACHINES,
+}
+# tab7 hamesha definition + breakdown + working deta hai, toh intent wale words key me noise hain
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "and", "or", "is", "are", "what", "explain", "explanation",
+    "define", "definition", "describe", "working", "work", "works", "concept", "notes", "note",
+    "short", "about", "with", "its", "it", "how", "does", "do", "detail", "details", "brief", "briefly",
+    "diagram", "neat", "sketch", "topic", "question",
+}
+# Inke do taraf ke hisse aapas me swap nahi ho sakte; "to" stopword bhi hai, par beech me ho toh rehta hai
+DIRECTIONAL = {"to", "using", "from", "into"}
+NUM_HASHES = 32
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(NUM_HASHES)]
+_SYNONYM_MAX = max(len(k.split()) for k in SYNONYMS)
+
+
+def _stem(token):
+    # Halka plural: diodes -> diode, transformers -> transformer (bias / gas / process jaise chhodo)
+    if len(token) > 4 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def _in_context(tokens, i, n, phrase):
+    context = SYNONYM_CONTEXT.get(phrase)
+    if context is None or len(tokens) == n:
+        return True
+    return any(t in context for t in tokens[:i] + tokens[i + n:])
+
+
+def _apply_synonyms(tokens):
+    out, i = [], 0
+    while i < len(tokens):
+        for n in range(min(_SYNONYM_MAX, len(tokens) - i), 0, -1):
+            phrase = " ".join(tokens[i:i + n])
+            if phrase in SYNONYMS and _in_context(tokens, i, n, phrase):
+                out.extend(SYNONYMS[phrase].split())
+                i += n
+                break
+        else:
+            out.append(tokens[i])
+            i += 1
+    return out
+
+
+def topic_tokens(query):
+    # Apostrophe hatao (newton's -> newtons), baaki punctuation / hyphen = space
+    text = normalize_subject(query).replace("'", "").replace("’", "")
+    tokens = [_stem(t) for t in WORD_RE.findall(text)]
+    tokens = _apply_synonyms(tokens)
+    kept = [t for t in tokens if t not in STOPWORDS or t in DIRECTIONAL]
+    # Direction word sirf do hisson ke beech matlab rakhta hai ("how to", "convert into")
+    while kept and kept[0] in DIRECTIONAL:
+        kept.pop(0)
+    while kept and kept[-1] in DIRECTIONAL:
+        kept.pop()
+    return kept or tokens
+
+
+def topic_segments(tokens):
+    # Direction words pe tukde: ["infix", "to", "postfix"] -> [["infix"], ["to"], ["postfix"]]
+    segments, current = [], []
+    for t in tokens:
+        if t in DIRECTIONAL:
+            if current:
+                segments.append(current)
+            segments.append([t])
+            current = []
+        else:
+            current.append(t)
+    if current:
+        segments.append(current)
+    return segments
+
+
+def topic_key(query):
+    # Hisse ke andar word order aur repeat se farak nahi padta, hisson ka order rehta hai
+    return " ".join(" ".join(sorted(set(seg))) for seg in topic_segments(topic_tokens(query)))
+
+
+def topic_version(version):
+    # Cache entry ka version = prompt version + key version (pregenerate bhi yahi likhta hai)
+    return f"{version}.k{TOPIC_KEY_VERSION}"
+
+
+def minhash(shingles):
+    base = [zlib.crc32(s.encode("utf-8")) for s in shingles] or [0]
+    return tuple(min((a * x + b) % PRIME for x in base) for a, b in PERMUTATIONS)
+
+
+def _token_limit(token):
+    # Chhote tokens aur numbers (8085 vs 8086, half vs full, jfet vs fet) exact hone chahiye
+    if any(c.isdigit() for c in token) or len(token) <= 4:
+        return 0
+    return 1 if len(token) <= 8 else 2
+
+
+def tokens_agree(a, b):
+    # Har hisse ke har token ka doosri taraf usi hisse me koi typo-distance wala jodi hona chahiye, dono direction me
+    def covered(xs, ys):
+        return all(any(x == y or bounded_levenshtein(x, y, _token_limit(x)) <= _token_limit(x) for y in ys) for x in xs)
+    seg_a, seg_b = topic_segments(a), topic_segments(b)
+    return len(seg_a) == len(seg_b) and all(covered(x, y) and covered(y, x) for x, y in zip(seg_a, seg_b))
+
+
+class TopicIndex:
+    # canonical key -> stored cache subject, plus LSH buckets for fuzzy lookup
+
+    def __init__(self):
+        self.stored = {}
+        self._shingles = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, stored_subject):
+        shingles = trigrams(key)
+        sig = minhash(shingles)
+        with self._lock:
+            if key in self.stored:
+                self.stored[key] = stored_subject
+                return
+            self.stored[key] = stored_subject
+            self._shingles[key] = shingles
+            for band in range(BANDS):
+                self._buckets.setdefault((band, sig[band * ROWS:(band + 1) * ROWS]), set()).add(key)
+
+    def remove(self, key):
+        with self._lock:
+            if self.stored.pop(key, None) is None:
+                return
+            sig = minhash(self._shingles.pop(key))
+            for band in range(BANDS):
+                bucket = self._buckets.get((band, sig[band * ROWS:(band + 1) * ROWS]))
+                if bucket is not None:
+                    bucket.discard(key)
+
+    def exact(self, key):
+        return self.stored.get(key)
+
+    def nearest(self, key, threshold=0.5):
+        shingles = trigrams(key)
+        sig = minhash(shingles)
+        with self._lock:
+            candidates = set()
+            for band in range(BANDS):
+                candidates |= self._buckets.get((band, sig[band * ROWS:(band + 1) * ROWS]), set())
+            scored = []
+            for cand in candidates:
+                other = self._shingles[cand]
+                scored.append((len(shingles & other) / len(shingles | other), cand))
+        words = key.split()
+        for score, cand in sorted(scored, reverse=True):
+            if score < threshold:
+                break
+            if tokens_agree(words, cand.split()):
+                return cand, score
+        return None, 0.0
+
+
+class TopicCache:
+    # ResponseCache ke upar: research reports canonical topic key pe store hote hain
+
+    def __init__(self, cache, version, kind="research", threshold=0.5):
+        self.cache = cache
+        self.version = topic_version(version)
+        self.kind = kind
+        self.threshold = threshold
+        self.index = TopicIndex()
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        # Pehle se cached (pregenerate / purane plain keys) bhi canonical key se milne chahiye
+        for subject in cache.subjects(kind):
+            self.index.add(topic_key(subject), subject)
+
+    def _fetch(self, key):
+        stored = self.index.exact(key)
+        if stored is None:
+            # Doosre process (pregenerate / worker) ne canonical key pe likha ho sakta hai
+            value = self.cache.get(self.kind, key, "", self.version)
+            if value is not None:
+                self.index.add(key, key)
+            return value
+        value = self.cache.get(self.kind, stored, "", self.version)
+        if value is None:
+            # Evict / stale ho gaya: index se bhi hatao
+            self.index.remove(key)
+        return value
+
+    def get(self, query):
+        # Returns (report ya None, canonical key)
+        key = topic_key(query)
+        value = self._fetch(key)
+        if value is not None:
+            self.exact_hits += 1
+            METRICS.inc("topic_cache_total", result="exact")
+            return value, key
+        near, _ = self.index.nearest(key, self.threshold)
+        if near is not None:
+            value = self._fetch(near)
+            if value is not None:
+                self.fuzzy_hits += 1
+                METRICS.inc("topic_cache_total", result="fuzzy")
+                return value, key
+        self.misses += 1
+        METRICS.inc("topic_cache_total", result="miss")
+        return None, key
+
+    def put(self, query, value):
+        key = topic_key(query)
+        self.cache.put(self.kind, key, "", self.version, value)
+        self.index.add(key, key)
+        return key
+
+    def stats(self):
+        total = self.exact_hits + self.fuzzy_hits + self.misses
+        return {
+            "topics": len(self.index.stored),
+            "exact_hits": self.exact_hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.exact_hits + self.fuzzy_hits) / total, 3) if total else 0.0,
+        }